@@ -0,0 +1,135 @@
+"""
+Macros de acción: secuencias de entrada precompiladas de duración variable.
+
+Cada acción del agente es una línea de tiempo de botones pulsados
+("A durante 4 frames y después Derecha durante 8"). Al crear la macro se
+compila a una lista corta de segmentos (eventos a enviar, frames a avanzar)
+y ejecutarla cuesta una llamada a pyboy.tick(n) por segmento, no una por
+frame, así que las duraciones finas no ralentizan el entrenamiento.
+
+El espacio de acciones de MarioAgent es una lista de Macro: basta añadir
+nuevas macros a la lista (ver FINE_MACROS) para ampliarlo.
+
+USO:
+    python3 action_macros.py        # Muestra los segmentos compilados
+"""
+
+from pyboy.utils import WindowEvent
+
+# --- CONFIGURACIÓN ---
+HOLD_FRAMES = 12      # Duración clásica de cada acción de MarioAgent
+RELEASE_FRAMES = 1
+
+BUTTONS = {
+    "RIGHT": ("PRESS_ARROW_RIGHT", "RELEASE_ARROW_RIGHT"),
+    "LEFT": ("PRESS_ARROW_LEFT", "RELEASE_ARROW_LEFT"),
+    "UP": ("PRESS_ARROW_UP", "RELEASE_ARROW_UP"),
+    "DOWN": ("PRESS_ARROW_DOWN", "RELEASE_ARROW_DOWN"),
+    "A": ("PRESS_BUTTON_A", "RELEASE_BUTTON_A"),
+    "B": ("PRESS_BUTTON_B", "RELEASE_BUTTON_B"),
+    "START": ("PRESS_BUTTON_START", "RELEASE_BUTTON_START"),
+    "SELECT": ("PRESS_BUTTON_SELECT", "RELEASE_BUTTON_SELECT"),
+}
+
+
+class Macro:
+    """
+    Línea de tiempo de botones compilada a segmentos.
+
+    `holds` es una lista de (botón, frame_inicio, frame_fin): el botón se pulsa
+    en frame_inicio y se suelta en frame_fin. `length` es la duración total
+    (por defecto, el último frame_fin + RELEASE_FRAMES). ValueError si un
+    hold no dura al menos un frame o si dos holds del mismo botón se
+    solapan (o uno empieza en el frame en que se suelta el anterior).
+    """
+
+    def __init__(self, name, holds, length=None):
+        self.name = name
+        self.holds = list(holds)
+        self.validate_holds()
+        end = max((stop for _, _, stop in self.holds), default=0)
+        self.length = length if length is not None else end + RELEASE_FRAMES
+        if self.length <= end:
+            raise ValueError(f"Macro '{name}': length={self.length} debe ser mayor que el último release ({end})")
+        self.segments = self.compile()
+
+    def validate_holds(self):
+        last_stop = {}
+        for button, start, stop in sorted(self.holds, key=lambda hold: (hold[0], hold[1])):
+            if button not in BUTTONS:
+                raise ValueError(f"Macro '{self.name}': botón desconocido {button!r}")
+            if start < 0 or stop <= start:
+                raise ValueError(f"Macro '{self.name}': {button} de {start} a {stop} no dura al menos un frame")
+            if button in last_stop and start <= last_stop[button]:
+                raise ValueError(f"Macro '{self.name}': {button} se pulsa en {start} antes de soltarse "
+                                 f"en {last_stop[button]}")
+            last_stop[button] = stop
+
+    @classmethod
+    def combo(cls, name, buttons, hold=HOLD_FRAMES, release=RELEASE_FRAMES):
+        """Todos los `buttons` a la vez durante `hold` frames y `release` frames sueltos."""
+        return cls(name, [(button, 0, hold) for button in buttons], length=hold + release)
+
+    def compile(self):
+        """Convierte los holds en [(eventos, frames)] agrupando los cambios por frame."""
+        changes = {}
+        for button, start, stop in self.holds:
+            press, release = BUTTONS[button]
+            changes.setdefault(start, []).append(getattr(WindowEvent, press))
+            changes.setdefault(stop, []).append(getattr(WindowEvent, release))
+
+        boundaries = sorted(changes) + [self.length]
+        segments = []
+        if boundaries[0] > 0:
+            segments.append(((), boundaries[0]))
+        for frame, next_frame in zip(boundaries, boundaries[1:]):
+            segments.append((tuple(changes[frame]), next_frame - frame))
+        return segments
+
+    def run(self, pyboy):
+        """Ejecuta la macro completa: una llamada a tick por segmento."""
+        last = len(self.segments) - 1
+        for i, (events, frames) in enumerate(self.segments):
+            for event in events:
+                pyboy.send_input(event)
+            # Solo se renderiza el último frame (el que ven la pantalla y las observaciones)
+            pyboy.tick(frames, i == last)
+
+    def __repr__(self):
+        return f"Macro({self.name!r}, {self.length} frames)"
+
+
+# Las seis acciones originales de MarioAgent (12 frames pulsado + 1 suelto)
+DEFAULT_MACROS = [
+    Macro.combo("right", ["RIGHT"]),
+    Macro.combo("sprint", ["RIGHT", "B"]),               # Sprint
+    Macro.combo("long_jump", ["RIGHT", "A"]),            # Salto largo
+    Macro.combo("high_jump", ["A"]),                     # Salto alto
+    Macro.combo("sprint_jump", ["RIGHT", "A", "B"]),
+    Macro("idle", [], length=HOLD_FRAMES + RELEASE_FRAMES),  # Idle
+]
+
+# Espacio de acciones ampliado: saltos cortos (la altura depende de cuánto se mantiene A)
+FINE_MACROS = DEFAULT_MACROS + [
+    Macro("short_hop", [("A", 0, 4), ("RIGHT", 0, 12)], length=13),
+    Macro("hop_then_run", [("A", 0, 4), ("RIGHT", 4, 12)], length=13),
+    Macro("medium_jump", [("A", 0, 8), ("RIGHT", 0, 12)], length=13),
+    Macro("sprint_hop", [("A", 0, 4), ("RIGHT", 0, 12), ("B", 0, 12)], length=13),
+    Macro("full_jump", [("A", 0, 24), ("RIGHT", 0, 24)], length=25),
+]
+
+
+def main():
+    event_names = {getattr(WindowEvent, name): name for name in dir(WindowEvent) if name.isupper()}
+    print("=" * 70)
+    print("MACROS DE ACCIÓN")
+    print("=" * 70)
+    for i, macro in enumerate(FINE_MACROS):
+        plan = " | ".join(
+            f"{'+'.join(event_names[e] for e in events) or '-'} x{frames}" for events, frames in macro.segments
+        )
+        print(f"{i:2d} {macro.name:13s} ({macro.length:2d} frames, {len(macro.segments)} ticks): {plan}")
+
+
+if __name__ == "__main__":
+    main()
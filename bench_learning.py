@@ -0,0 +1,406 @@
+"""
+Benchmark de eficiencia de aprendizaje con semillas fijas.
+
+Los micro-benchmarks no dicen si un cambio hace que el agente llegue antes
+al final del 1-1. Este script entrena MarioAgent headless con `random` y
+NumPy sembrados y un presupuesto fijo de frames emulados, y registra para
+cada semilla la curva "récord de distancia" frente a frames emulados y
+frente a tiempo real. Las curvas se guardan en JSON como línea base y se
+comparan con una ejecución anterior: si los frames (o el tiempo) necesarios
+para alcanzar cada umbral de distancia empeoran más de la tolerancia, se
+marca como regresión y el script sale con código 1.
+
+Las semillas se ejecutan una detrás de otra para que el tiempo real sea
+comparable entre ejecuciones.
+
+`sweep` entrena varias configuraciones con las mismas semillas (p. ej.
+--lam 0,0.9 o --planning-steps 0,5,20; el primer valor es la línea base) y
+tabula los frames hasta cada umbral frente a la base. Con --synthetic se usa
+SyntheticGame en lugar de la ROM: un pasillo con fosos que imita la física
+básica del 1-1 (correr, sprint con B, la altura del salto depende de cuánto
+se mantiene A) y escribe la distancia y el estado en las mismas direcciones
+de RAM. Sirve para medir el algoritmo de aprendizaje de forma reproducible
+sin la ROM; los números del juego real hay que medirlos con la ROM.
+Con --air-state (solo sintético) el estado del agente incluye además los
+frames que le quedan en el aire: sirve para separar lo que aporta un
+algoritmo de lo que pierde porque get_state() no ve si Mario está saltando.
+
+USO:
+    python3 bench_learning.py run --out bench/baseline.json
+    python3 bench_learning.py run --out bench/actual.json --baseline bench/baseline.json
+    python3 bench_learning.py compare bench/baseline.json bench/actual.json
+    python3 bench_learning.py sweep --lam 0,0.9 [--synthetic]
+    python3 bench_learning.py sweep --planning-steps 0,5,20 [--synthetic [--air-state]]
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import random
+import argparse
+
+import numpy as np
+from pyboy.utils import WindowEvent
+
+from main import MarioAgent, ROM_PATH, ADDR_SCROLL_X, ADDR_SCROLL_PAGE, ADDR_STATUS
+
+# --- CONFIGURACIÓN ---
+SEEDS = [0, 1, 2]
+FRAME_BUDGET = 200000
+THRESHOLDS = [500, 1000, 1500, 2000, 2500]
+FRAMES_TOLERANCE = 0.10     # +10% de frames hasta un umbral = regresión
+WALL_TOLERANCE = 0.20       # El tiempo real es más ruidoso
+
+# --- JUEGO SINTÉTICO (--synthetic) ---
+SYNTHETIC_LENGTH = 2600     # Píxeles hasta la meta (por encima del último umbral)
+SYNTHETIC_PITS = [(140, 8), (310, 12), (470, 16), (620, 8), (790, 20), (960, 12), (1130, 16), (1290, 20),
+                  (1450, 8), (1600, 16), (1780, 20), (1950, 12), (2120, 16), (2300, 20), (2460, 12)]
+TAKEOFF_AIR = 6             # Frames en el aire de un salto con toque corto de A
+MAX_BOOST = 18              # Frames extra de vuelo manteniendo A
+AIR_STATES = 8              # --air-state: estado = estado normal * AIR_STATES + frames en el aire
+
+
+class SyntheticGame:
+    """
+    Pasillo con fosos con la interfaz de PyBoy que usa MarioAgent (tick,
+    send_input, memory, frame_count, save_state/load_state).
+
+    Derecha avanza 1 px por frame y 2 con B; A despega desde el suelo y
+    mientras se mantiene alarga el vuelo hasta MAX_BOOST frames. Tocar el
+    suelo dentro de un foso pone ADDR_STATUS a 1 (muriendo) hasta el soft
+    reset (A+B+Start+Select), que vuelve al inicio.
+    """
+
+    PRESS = {WindowEvent.PRESS_ARROW_RIGHT: "RIGHT", WindowEvent.PRESS_ARROW_LEFT: "LEFT",
+             WindowEvent.PRESS_BUTTON_A: "A", WindowEvent.PRESS_BUTTON_B: "B",
+             WindowEvent.PRESS_BUTTON_START: "START", WindowEvent.PRESS_BUTTON_SELECT: "SELECT"}
+    RELEASE = {WindowEvent.RELEASE_ARROW_RIGHT: "RIGHT", WindowEvent.RELEASE_ARROW_LEFT: "LEFT",
+               WindowEvent.RELEASE_BUTTON_A: "A", WindowEvent.RELEASE_BUTTON_B: "B",
+               WindowEvent.RELEASE_BUTTON_START: "START", WindowEvent.RELEASE_BUTTON_SELECT: "SELECT"}
+
+    def __init__(self, pits=SYNTHETIC_PITS, length=SYNTHETIC_LENGTH):
+        self.pits = pits
+        self.length = length
+        self.memory = bytearray(0x10000)
+        self.frame_count = 0
+        self.held = set()
+        self._restart()
+
+    def _restart(self):
+        self.x = 0
+        self.air = 0
+        self.boost = 0
+        self.a_was_held = False
+        self.dying = False
+        self._write()
+
+    def _write(self):
+        self.memory[ADDR_SCROLL_X] = self.x % 256
+        self.memory[ADDR_SCROLL_PAGE] = self.x // 256
+        self.memory[ADDR_STATUS] = 1 if self.dying else 0
+
+    def set_emulation_speed(self, speed):
+        pass
+
+    def send_input(self, event):
+        if event in self.PRESS:
+            self.held.add(self.PRESS[event])
+        elif event in self.RELEASE:
+            self.held.discard(self.RELEASE[event])
+
+    def _frame(self):
+        held = self.held
+        if {"A", "B", "START", "SELECT"} <= held:
+            self._restart()
+            return
+        if self.dying:
+            return
+        a_held = "A" in held
+        if self.air == 0 and a_held and not self.a_was_held:
+            self.air, self.boost = TAKEOFF_AIR, 0
+        elif self.air:
+            if a_held and self.boost < MAX_BOOST:
+                self.boost += 1
+            else:
+                self.air -= 1
+        self.a_was_held = a_held
+        if "RIGHT" in held:
+            self.x = min(self.length, self.x + (2 if "B" in held else 1))
+        elif "LEFT" in held:
+            self.x = max(0, self.x - 1)
+        if self.air == 0 and any(start <= self.x < start + width for start, width in self.pits):
+            self.dying = True
+
+    def tick(self, count=1, render=True):
+        for _ in range(count):
+            self._frame()
+            self.frame_count += 1
+        self._write()
+        return True
+
+    def save_state(self, f):
+        pickle.dump((self.x, self.air, self.boost, self.a_was_held, self.dying), f)
+
+    def load_state(self, f):
+        self.x, self.air, self.boost, self.a_was_held, self.dying = pickle.load(f)
+        self._write()
+
+    def stop(self, save=False):
+        pass
+
+
+class BenchAgent(MarioAgent):
+    """
+    MarioAgent que anota (frames, segundos, récord) cada vez que mejora su
+    récord. Con air_state (solo SyntheticGame) el estado incluye los frames
+    que quedan en el aire.
+    """
+
+    def __init__(self, *args, air_state=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.air_state = air_state
+        self.curve = []
+        self.start_time = time.perf_counter()
+
+    def get_state(self):
+        state = super().get_state()
+        if self.air_state:
+            state = state * AIR_STATES + min(self.pyboy.air, AIR_STATES - 1)
+        return state
+
+    def step(self, action_idx):
+        previous_best = self.best_distance
+        result = super().step(action_idx)
+        if self.best_distance > previous_best:
+            elapsed = time.perf_counter() - self.start_time
+            self.curve.append((self.pyboy.frame_count, elapsed, self.best_distance))
+        return result
+
+
+def run_seed(seed, frame_budget, rom_path, agent_kwargs, synthetic=False):
+    """Entrena con una semilla y un presupuesto de frames; devuelve la curva."""
+    random.seed(seed)
+    np.random.seed(seed)
+    emulator = SyntheticGame() if synthetic else None
+    agent = BenchAgent(rom_path, window="null", verbose=False, emulator=emulator, **agent_kwargs)
+    agent.start_time = time.perf_counter()
+    agent.run(max_frames=frame_budget)
+    wall = time.perf_counter() - agent.start_time
+    agent.pyboy.stop(save=False)
+    return {
+        "seed": seed,
+        "frames": agent.pyboy.frame_count,
+        "wall": wall,
+        "generations": agent.generation,
+        "best_distance": agent.best_distance,
+        "curve": agent.curve,
+    }
+
+
+def time_to_threshold(curve, threshold):
+    """(frames, segundos) del primer punto de la curva que alcanza `threshold`, o (None, None)."""
+    for frames, wall, distance in curve:
+        if distance >= threshold:
+            return frames, wall
+    return None, None
+
+
+def summarize(runs, thresholds):
+    """Mediana entre semillas de frames y segundos hasta cada umbral (None si alguna no llega)."""
+    summary = {}
+    for threshold in thresholds:
+        hits = [time_to_threshold(run["curve"], threshold) for run in runs]
+        if any(frames is None for frames, _ in hits):
+            summary[str(threshold)] = {"frames": None, "wall": None, "reached": sum(f is not None for f, _ in hits)}
+        else:
+            summary[str(threshold)] = {
+                "frames": float(np.median([f for f, _ in hits])),
+                "wall": float(np.median([w for _, w in hits])),
+                "reached": len(hits),
+            }
+    return summary
+
+
+def compare(baseline, current):
+    """Lista de regresiones (texto) de `current` respecto a `baseline`."""
+    regressions = []
+    for threshold, base in baseline["summary"].items():
+        now = current["summary"].get(threshold)
+        if base["frames"] is None or now is None:
+            continue
+        if now["frames"] is None:
+            regressions.append(f"Umbral {threshold}: ya no se alcanza en todas las semillas "
+                               f"({now['reached']}/{len(current['runs'])})")
+            continue
+        if now["frames"] > base["frames"] * (1 + FRAMES_TOLERANCE):
+            regressions.append(f"Umbral {threshold}: frames {base['frames']:.0f} -> {now['frames']:.0f}")
+        if now["wall"] > base["wall"] * (1 + WALL_TOLERANCE):
+            regressions.append(f"Umbral {threshold}: tiempo {base['wall']:.1f}s -> {now['wall']:.1f}s")
+    return regressions
+
+
+def print_summary(result):
+    print("Umbral | Frames (mediana) | Tiempo (mediana) | Semillas")
+    print("-" * 70)
+    for threshold, row in result["summary"].items():
+        frames = f"{row['frames']:16,.0f}" if row["frames"] is not None else f"{'-':>16s}"
+        wall = f"{row['wall']:15.1f}s" if row["wall"] is not None else f"{'-':>16s}"
+        print(f"{threshold:>6s} | {frames} | {wall} | {row['reached']}/{len(result['runs'])}")
+
+
+def sweep(param, values, seeds, frame_budget, rom_path, agent_kwargs, synthetic=False):
+    """Una ejecución por valor de `param` con las mismas semillas; la primera es la base."""
+    results = []
+    for value in values:
+        runs = [run_seed(seed, frame_budget, rom_path, dict(agent_kwargs, **{param: value}), synthetic)
+                for seed in seeds]
+        results.append({"value": value, "runs": runs, "summary": summarize(runs, THRESHOLDS)})
+        print(f"{param}={value}: récord mediano {np.median([r['best_distance'] for r in runs]):.0f} | "
+              f"{np.median([r['wall'] for r in runs]):.1f}s por semilla")
+    return results
+
+
+def print_sweep(param, results):
+    """Tabla de frames (mediana entre semillas) hasta cada umbral frente a la base."""
+    base = results[0]["summary"]
+    header = [f"{param}={results[0]['value']} (base)"] + [f"{param}={r['value']}" for r in results[1:]]
+    print("Umbral | " + " | ".join(f"{h:>24s}" for h in header))
+    print("-" * 70)
+    for threshold in base:
+        cells = []
+        for result in results:
+            row = result["summary"][threshold]
+            if row["frames"] is None:
+                cells.append(f"{'-':>18s} ({row['reached']}/{len(result['runs'])})")
+            elif result is results[0] or base[threshold]["frames"] is None:
+                cells.append(f"{row['frames']:24,.0f}")
+            else:
+                change = row["frames"] / base[threshold]["frames"] - 1
+                cells.append(f"{row['frames']:16,.0f} ({change:+5.0%})")
+        print(f"{threshold:>6s} | " + " | ".join(cells))
+
+
+def report(baseline_path, result):
+    """Compara con la línea base y devuelve el código de salida."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, result)
+    if regressions:
+        print("\n🚨 REGRESIONES RESPECTO A", baseline_path)
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print(f"\n✅ Sin regresiones respecto a {baseline_path}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de eficiencia de aprendizaje")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Entrenar con semillas fijas y guardar las curvas")
+    run.add_argument("--rom", default=ROM_PATH)
+    run.add_argument("--seeds", default=",".join(map(str, SEEDS)))
+    run.add_argument("--frames", type=int, default=FRAME_BUDGET)
+    run.add_argument("--out", default="bench/actual.json")
+    run.add_argument("--baseline", help="JSON de una ejecución anterior con la que comparar")
+    run.add_argument("--fine-actions", action="store_true", help="Usar action_macros.FINE_MACROS")
+    run.add_argument("--enemy-aware", action="store_true")
+    run.add_argument("--planning-steps", type=int, default=0, help="Actualizaciones Dyna-Q por paso real")
+    run.add_argument("--lam", type=float, default=0.0, help="Lambda de Watkins Q(λ) (0 = un paso)")
+    run.add_argument("--synthetic", action="store_true", help="Usar SyntheticGame en lugar de la ROM")
+
+    cmp_parser = sub.add_parser("compare", help="Comparar dos ejecuciones guardadas")
+    cmp_parser.add_argument("baseline")
+    cmp_parser.add_argument("current")
+
+    sweep_parser = sub.add_parser("sweep", help="Comparar valores de un parámetro con las mismas semillas")
+    group = sweep_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--lam", help="Valores de lambda separados por comas (el primero es la base)")
+    group.add_argument("--planning-steps", help="Valores de planning_steps separados por comas")
+    sweep_parser.add_argument("--rom", default=ROM_PATH)
+    sweep_parser.add_argument("--seeds", default=",".join(map(str, SEEDS)))
+    sweep_parser.add_argument("--frames", type=int, default=FRAME_BUDGET)
+    sweep_parser.add_argument("--out", default=None, help="JSON con todas las curvas")
+    sweep_parser.add_argument("--synthetic", action="store_true", help="Usar SyntheticGame en lugar de la ROM")
+    sweep_parser.add_argument("--air-state", action="store_true",
+                              help="Incluir los frames en el aire en el estado (requiere --synthetic)")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        with open(args.current) as f:
+            current = json.load(f)
+        print_summary(current)
+        return report(args.baseline, current)
+
+    if not args.synthetic and not os.path.exists(args.rom):
+        print(f"⚠️  ROM no encontrada en {args.rom} (--synthetic para medir sin ROM)")
+        return 1
+
+    if args.command == "sweep":
+        if args.air_state and not args.synthetic:
+            print("⚠️  --air-state solo existe en el juego sintético (--synthetic)")
+            return 1
+        param, raw = ("lam", args.lam) if args.lam is not None else ("planning_steps", args.planning_steps)
+        cast = float if param == "lam" else int
+        values = [cast(v) for v in raw.split(",")]
+        seeds = [int(s) for s in args.seeds.split(",")]
+        print("=" * 70)
+        print(f"SWEEP {param} = {values} - semillas {seeds}, {args.frames:,} frames por semilla"
+              f"{' (juego sintético)' if args.synthetic else ''}{' con estado de salto' if args.air_state else ''}")
+        print("=" * 70)
+        agent_kwargs = {"air_state": True} if args.air_state else {}
+        results = sweep(param, values, seeds, args.frames, args.rom, agent_kwargs, args.synthetic)
+        print()
+        print_sweep(param, results)
+        if args.out:
+            os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+            with open(args.out, "w") as f:
+                json.dump({"config": {"param": param, "frames": args.frames, "seeds": seeds,
+                                      "synthetic": args.synthetic, "air_state": args.air_state},
+                           "results": results}, f, indent=1)
+            print(f"\n📝 Curvas guardadas en {args.out}")
+        return 0
+
+    options = {"fine_actions": args.fine_actions, "enemy_aware": args.enemy_aware,
+               "planning_steps": args.planning_steps, "lam": args.lam, "synthetic": args.synthetic}
+    agent_kwargs = {"enemy_aware": args.enemy_aware, "planning_steps": args.planning_steps,
+                    "lam": args.lam}
+    if args.fine_actions:
+        from action_macros import FINE_MACROS
+        agent_kwargs["actions"] = FINE_MACROS
+
+    seeds = [int(s) for s in args.seeds.split(",")]
+    print("=" * 70)
+    print(f"BENCHMARK DE APRENDIZAJE - semillas {seeds}, {args.frames:,} frames por semilla")
+    print("=" * 70)
+
+    runs = []
+    for seed in seeds:
+        run_result = run_seed(seed, args.frames, args.rom, agent_kwargs, args.synthetic)
+        runs.append(run_result)
+        print(f"Semilla {seed}: récord {run_result['best_distance']} | {run_result['generations']} gens | "
+              f"{run_result['frames'] / run_result['wall']:,.0f} frames/s")
+
+    result = {
+        "config": {"frames": args.frames, "seeds": seeds, "agent": options},
+        "runs": runs,
+        "summary": summarize(runs, THRESHOLDS),
+    }
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(result, f, indent=1)
+
+    print()
+    print_summary(result)
+    print(f"\n📝 Curvas guardadas en {args.out}")
+    if args.baseline:
+        return report(args.baseline, result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
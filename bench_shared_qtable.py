@@ -0,0 +1,100 @@
+"""
+Benchmark de la Q-table compartida (shared_qtable.py) al añadir workers.
+
+Mide dos cosas:
+1. Throughput de actualizaciones: N procesos aplicando actualizaciones de
+   Bellman sintéticas (sin emulador) sobre la misma SharedQTable, con locks
+   a rayas y sin locks.
+2. Velocidad de aprendizaje: si existe la ROM, N workers MarioAgent headless
+   entrenando un número fijo de pasos; se reporta el récord de distancia y el
+   tiempo real empleado.
+
+USO:
+    python3 bench_shared_qtable.py [max_workers]
+"""
+
+import os
+import sys
+import time
+import random
+import multiprocessing as mp
+
+import numpy as np
+
+from shared_qtable import SharedQTable, N_STATES, N_ACTIONS, ROM_PATH, train_parallel
+
+# --- CONFIGURACIÓN ---
+SYNTHETIC_SECONDS = 2.0   # Duración de cada medición sintética
+LEARNING_STEPS = 3000     # Pasos por worker en la medición con emulador
+ALPHA = 0.2
+GAMMA = 0.9
+
+
+def synthetic_worker(q_table, seconds, results):
+    """Aplica actualizaciones de Bellman sobre estados aleatorios durante `seconds`."""
+    rng = random.Random(os.getpid())
+    updates = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(1000):
+            state = rng.randrange(N_STATES - 1)
+            action = rng.randrange(N_ACTIONS)
+            next_state = state + 1
+            with q_table.lock(state):
+                old_value = q_table[state][action]
+                next_max = np.max(q_table[next_state])
+                q_table[state][action] = old_value + ALPHA * (1.0 + GAMMA * next_max - old_value)
+        updates += 1000
+    results.put(updates)
+    q_table.close()
+
+
+def bench_updates(n_workers, striped):
+    q_table = SharedQTable(striped=striped)
+    results = mp.Queue()
+    procs = [mp.Process(target=synthetic_worker, args=(q_table, SYNTHETIC_SECONDS, results))
+             for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    total = sum(results.get() for _ in procs)
+    for p in procs:
+        p.join()
+    q_table.close()
+    return total / SYNTHETIC_SECONDS
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    worker_counts = [n for n in (1, 2, 4, 8, 16) if n <= max_workers] or [1]
+
+    print("=" * 70)
+    print("THROUGHPUT DE ACTUALIZACIONES (sintético, sin emulador)")
+    print("=" * 70)
+    print("Workers | Striped (upd/s) | Lockfree (upd/s)")
+    print("-" * 70)
+    for n in worker_counts:
+        striped = bench_updates(n, striped=True)
+        lockfree = bench_updates(n, striped=False)
+        print(f"{n:7d} | {striped:15,.0f} | {lockfree:16,.0f}")
+
+    if not os.path.exists(ROM_PATH):
+        print(f"\n⚠️  ROM no encontrada en {ROM_PATH}: se omite la medición de aprendizaje")
+        return
+
+    print(f"\n{'=' * 70}")
+    print(f"VELOCIDAD DE APRENDIZAJE ({LEARNING_STEPS} pasos por worker)")
+    print("=" * 70)
+    print("Workers | Tiempo (s) | Pasos/s totales | Estados | Record")
+    print("-" * 70)
+    for n in worker_counts:
+        start = time.perf_counter()
+        q_table, stats = train_parallel(n, LEARNING_STEPS)
+        elapsed = time.perf_counter() - start
+        total_steps = sum(r["steps"] for r in stats)
+        best = max(r["best_distance"] for r in stats)
+        print(f"{n:7d} | {elapsed:10.1f} | {total_steps / elapsed:15,.0f} | {len(q_table):7d} | {best}")
+        q_table.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Panel de terminal con redibujado incremental para los scripts de memoria.
+
+Los scripts de diagnóstico imprimían tablas enteras cada 30-60 frames y la
+terminal acababa frenando al emulador. Con este panel:
+
+- El bucle de emulación solo escribe valores en `dashboard.values` (un array
+  NumPy) y, si quiere, líneas de texto en `dashboard.status`. Nunca toca la
+  terminal.
+- Un hilo de fondo redibuja a una tasa fija (REFRESH_HZ), independiente de la
+  velocidad de emulación, y solo reescribe las celdas que han cambiado,
+  posicionando el cursor con secuencias ANSI.
+- Las celdas que acaban de cambiar se resaltan y el resaltado se apaga con el
+  tiempo (HIGHLIGHT_DECAY), así se ve a simple vista qué se mueve.
+
+USO:
+    dash = Dashboard("MI PANEL", [f"0x{a:04X} " for a in addrs], columns=4)
+    dash.start()
+    while True:
+        pyboy.tick()
+        dash.values[:] = pyboy.memory[start:end]
+"""
+
+import sys
+import time
+import threading
+
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+REFRESH_HZ = 10
+HIGHLIGHT_DECAY = (0.3, 1.5)    # Segundos con resaltado fuerte / suave tras un cambio
+
+# Estilos ANSI por nivel de resaltado: 0 = normal, 1 = suave, 2 = fuerte
+STYLES = ["\x1b[0m", "\x1b[33m", "\x1b[1;30;43m"]
+RESET = "\x1b[0m"
+HEADER_LINES = 3
+
+
+class Dashboard:
+    """Rejilla de celdas etiqueta + valor redibujada solo donde cambia."""
+
+    def __init__(self, title, labels, columns=1, fmt="{:3d}", row_labels=None, status_lines=4):
+        self.title = title
+        self.labels = list(labels)
+        self.columns = columns
+        self.fmt = fmt
+        self.row_labels = row_labels
+        self.values = np.zeros(len(self.labels), dtype=np.int64)
+        self.status = [""] * status_lines
+
+        value_width = len(fmt.format(0))
+        label_width = max((len(label) for label in self.labels), default=0)
+        self.cell_width = label_width + value_width + (2 if label_width else 1)
+        self.margin = max((len(label) for label in row_labels), default=0) + 1 if row_labels else 0
+        self.rows = (len(self.labels) + columns - 1) // columns
+
+        self.shown = None                                       # Valores dibujados
+        self.shown_level = np.zeros(len(self.labels), dtype=np.int8)
+        self.changed_at = np.full(len(self.labels), -np.inf)
+        self.shown_status = [None] * status_lines
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        """Dibuja el marco completo y arranca el hilo de refresco."""
+        self.shown = self.values.copy()
+        out = ["\x1b[2J\x1b[?25l", self._move(1, 1), "=" * 70,
+               self._move(2, 1), self.title, self._move(3, 1), "=" * 70]
+        if self.row_labels:
+            for row, label in enumerate(self.row_labels):
+                out.append(self._move(HEADER_LINES + 1 + row, 1) + label)
+        for i in range(len(self.labels)):
+            out.append(self._cell(i, self.shown[i], 0))
+        self._write(out)
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        """Para el refresco y deja el cursor debajo del panel."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self._write([RESET, self._move(HEADER_LINES + self.rows + len(self.status) + 2, 1), "\x1b[?25h\n"])
+
+    def _loop(self):
+        period = 1.0 / REFRESH_HZ
+        while not self.stop_event.wait(period):
+            self.redraw()
+
+    def redraw(self):
+        """Reescribe solo las celdas cuyo valor o nivel de resaltado cambió."""
+        now = time.perf_counter()
+        current = self.values.copy()
+        changed = current != self.shown
+        self.changed_at[changed] = now
+
+        age = now - self.changed_at
+        level = np.where(age < HIGHLIGHT_DECAY[0], 2, np.where(age < HIGHLIGHT_DECAY[1], 1, 0)).astype(np.int8)
+        dirty = np.flatnonzero(changed | (level != self.shown_level))
+
+        out = [self._cell(i, current[i], level[i]) for i in dirty]
+        self.shown = current
+        self.shown_level = level
+
+        base = HEADER_LINES + self.rows + 2
+        for line, text in enumerate(list(self.status)):
+            if text != self.shown_status[line]:
+                out.append(self._move(base + line, 1) + "\x1b[2K" + text)
+                self.shown_status[line] = text
+
+        if out:
+            self._write(out)
+
+    def _cell(self, i, value, level):
+        row, column = divmod(i, self.columns)
+        text = f"{self.labels[i]}{self.fmt.format(value)}".ljust(self.cell_width - 1)
+        return self._move(HEADER_LINES + 1 + row, 1 + self.margin + column * self.cell_width) + \
+            STYLES[level] + text + RESET
+
+    @staticmethod
+    def _move(row, column):
+        return f"\x1b[{row};{column}H"
+
+    def _write(self, parts):
+        sys.stdout.write("".join(parts))
+        sys.stdout.flush()
+
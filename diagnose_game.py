@@ -1,13 +1,14 @@
-import time
 from pyboy import PyBoy
 
+from pacing import PacedEmulator, print_stats
+
 ROM_PATH = "roms/snow-bros.gb"
 ADDR_LIVES = 0xC699
 
 def main():
     print("Initializing PyBoy...")
     pyboy = PyBoy(ROM_PATH, window="SDL2")
-    pyboy.set_emulation_speed(1)
+    paced = PacedEmulator(pyboy, speed=1)
     
     print("\n--- DIAGNOSTIC MODE ---")
     print("1. Play the game.")
@@ -20,29 +21,33 @@ def main():
     watched_addresses = list(range(0xC600, 0xC700)) + list(range(0xC000, 0xC100))
     previous_memory = {addr: pyboy.memory[addr] for addr in watched_addresses}
     
-    while True:
-        pyboy.tick()
+    def analyze(snapshot):
+        # Runs on its own thread with a copy of C000-C6FF: never slows the game
+        lives = snapshot.memory[ADDR_LIVES]
+        print(f"Current Lives Value: {lives}")
+        
+        # Check for changes in watched addresses
+        changes = []
+        for addr in watched_addresses:
+            val = snapshot.memory[addr]
+            if val != previous_memory[addr]:
+                changes.append((addr, val))
+                previous_memory[addr] = val
         
-        if pyboy.frame_count % 60 == 0: # Every 1 second approx
-            lives = pyboy.memory[ADDR_LIVES]
-            print(f"Current Lives Value: {lives}")
-            
-            # Check for changes in watched addresses
-            changes = []
-            for addr in watched_addresses:
-                val = pyboy.memory[addr]
-                if val != previous_memory[addr]:
-                    changes.append((addr, val))
-                    previous_memory[addr] = val
-            
-            if changes:
-                print("Memory Changes (Potential Score?):")
-                for addr, val in changes[:10]: # Show first 10 changes
-                    print(f"  0x{addr:04X}: {val}")
-                if len(changes) > 10:
-                    print(f"  ... and {len(changes)-10} more.")
-                    
-        time.sleep(0.001)
+        if changes:
+            print("Memory Changes (Potential Score?):")
+            for addr, val in changes[:10]: # Show first 10 changes
+                print(f"  0x{addr:04X}: {val}")
+            if len(changes) > 10:
+                print(f"  ... and {len(changes)-10} more.")
+    
+    paced.add_consumer(analyze, 0xC000, 0xC700, every=60) # Every 1 second approx
+    try:
+        paced.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print_stats(paced.close())
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,8 @@
-import time
 from pyboy import PyBoy
 
+from pacing import PacedEmulator
+from rewind import RewindBuffer, inspect_console
+
 ROM_PATH = "roms/snow-bros.gb"
 WINDOW_TYPE = "SDL2"
 
@@ -15,21 +17,29 @@ def main():
     print("2. Juega normal hasta perder todas las vidas.")
     print("3. Cuando salga la pantalla de 'CONTINUE' (cuenta atrás), observa los valores en la terminal.")
     print("4. Copia y pega esos valores en el chat.")
+    print("5. ¿Se te pasó el momento? Pulsa Ctrl+C para rebobinar e inspeccionar cualquier frame de los últimos 3 minutos.")
     
     pyboy = PyBoy(ROM_PATH, window=WINDOW_TYPE)
-    pyboy.set_emulation_speed(1)
+    paced = PacedEmulator(pyboy, speed=1)
+    
+    rewind = RewindBuffer(pyboy)
+    paced.add_hook(rewind.capture)
+    
+    def show(source):
+        # `source` es un snapshot de la cola o el propio emulador (consola de rebobinado)
+        lives = source.memory[ADDR_LIVES]
+        px = source.memory[ADDR_PLAYER_X]
+        py = source.memory[ADDR_PLAYER_Y]
+        print(f"Vidas: {lives} | PosX: {px} | PosY: {py}")
     
+    paced.add_consumer(show, ADDR_PLAYER_X, ADDR_LIVES + 1, every=30) # Cada 0.5 segundos
     while True:
-        pyboy.tick()
-        
-        if pyboy.frame_count % 30 == 0: # Cada 0.5 segundos
-            lives = pyboy.memory[ADDR_LIVES]
-            px = pyboy.memory[ADDR_PLAYER_X]
-            py = pyboy.memory[ADDR_PLAYER_Y]
-            
-            print(f"Vidas: {lives} | PosX: {px} | PosY: {py}")
-            
-        time.sleep(0.001)
+        try:
+            paced.run()
+            break  # Ventana cerrada
+        except KeyboardInterrupt:
+            inspect_console(pyboy, rewind, show)
+    paced.close()
 
 if __name__ == "__main__":
     main()
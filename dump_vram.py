@@ -9,9 +9,11 @@ INSTRUCCIONES:
    Por ejemplo, si ves una secuencia que se mantiene constante cuando dice GAME OVER, esos son los IDs.
 """
 
-import time
 from pyboy import PyBoy
 
+from pacing import PacedEmulator, Snapshot
+from rewind import RewindBuffer, inspect_console
+
 ROM_PATH = "roms/super-mario-land.gb"
 WINDOW_TYPE = "SDL2"
 
@@ -31,15 +33,15 @@ def main():
     print("   (Controles: Flechas, A=Z, B=X, Start=Enter)\n")
     
     pyboy = PyBoy(ROM_PATH, window=WINDOW_TYPE)
-    pyboy.set_emulation_speed(1)
+    paced = PacedEmulator(pyboy, speed=1)
     
     print("⏳ Iniciando juego (pulsando START)...")
     # Secuencia de inicio
-    for _ in range(100): pyboy.tick()
+    paced.run(max_frames=100)
     pyboy.send_input(WindowEvent.PRESS_BUTTON_START)
-    for _ in range(10): pyboy.tick()
+    paced.run(max_frames=10)
     pyboy.send_input(WindowEvent.RELEASE_BUTTON_START)
-    for _ in range(50): pyboy.tick()
+    paced.run(max_frames=50)
     
     print("✅ Juego iniciado. Esperando Game Over...")
     print("📝 El log se guardará en 'vram_log.txt'")
@@ -48,40 +50,50 @@ def main():
     with open("vram_log.txt", "w") as f:
         f.write("VRAM DUMP LOG\n")
     
-    while True:
-        # Permitir que el juego corra
-        pyboy.tick()
+    rewind = RewindBuffer(pyboy)
+    paced.add_hook(rewind.capture)
+    
+    def dump(snapshot):
+        # Chequear posible flag de Game Over en RAM
+        game_over_flag = snapshot.memory[0xC0A4]
         
-        # Cada 5 segundos (300 frames) para no saturar
-        if pyboy.frame_count % 300 == 0:
-            # Chequear posible flag de Game Over en RAM
-            game_over_flag = pyboy.memory[0xC0A4]
-            
-            output = []
-            output.append(f"\n{'='*70}")
-            output.append(f"Frame: {pyboy.frame_count} | Flag Game Over (0xC0A4): {game_over_flag:02X}")
-            output.append(f"{'='*70}")
-            
-            # Leer VRAM
-            vram_data = [pyboy.memory[addr] for addr in range(VRAM_START, VRAM_END + 1)]
-            
-            # Mostrar como matriz de texto
-            for y in range(18):
-                row_data = vram_data[y*WIDTH : (y+1)*WIDTH]
-                
-                if any(tile > 0 and tile != 0xFF for tile in row_data):
-                    hex_str = " ".join([f"{tile:02X}" for tile in row_data[:20]])
-                    output.append(f"Fila {y:2d}: {hex_str}")
-            
-            output.append("\n")
-            final_text = "\n".join(output)
+        output = []
+        output.append(f"\n{'='*70}")
+        output.append(f"Frame: {snapshot.frame_count} | Flag Game Over (0xC0A4): {game_over_flag:02X}")
+        output.append(f"{'='*70}")
+        
+        # Leer VRAM
+        vram_data = snapshot.memory[VRAM_START:VRAM_END + 1]
+        
+        # Mostrar como matriz de texto
+        for y in range(18):
+            row_data = vram_data[y*WIDTH : (y+1)*WIDTH]
             
-            # Imprimir en pantalla y guardar en archivo
-            print(final_text)
-            with open("vram_log.txt", "a") as f:
-                f.write(final_text)
+            if any(tile > 0 and tile != 0xFF for tile in row_data):
+                hex_str = " ".join([f"{tile:02X}" for tile in row_data[:20]])
+                output.append(f"Fila {y:2d}: {hex_str}")
+        
+        output.append("\n")
+        final_text = "\n".join(output)
         
-        time.sleep(0.001)
+        # Imprimir en pantalla y guardar en archivo
+        print(final_text)
+        with open("vram_log.txt", "a") as f:
+            f.write(final_text)
+    
+    def dump_rewound(pyboy):
+        # En la consola de rebobinado el frame es el reloj del buffer, no frame_count
+        dump(Snapshot(rewind.frame, pyboy.memory, None))
+    
+    # Cada 5 segundos (300 frames) para no saturar; el volcado va en su propio hilo
+    paced.add_consumer(dump, VRAM_START, 0xC0A5, every=300)
+    while True:
+        try:
+            paced.run()
+            break  # Ventana cerrada
+        except KeyboardInterrupt:
+            inspect_console(pyboy, rewind, dump_rewound)
+    paced.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,117 @@
+"""
+Dyna-Q con barrido priorizado (prioritized sweeping) para MarioAgent.
+
+Los frames del emulador son el recurso caro; las actualizaciones de la
+Q-table son baratas. El agente aprende un modelo tabular a partir de las
+transiciones reales observadas, con conteos (estado, acción) -> siguiente
+estado y la recompensa media, y después de cada paso real hace
+`planning_steps` actualizaciones simuladas contra ese modelo.
+
+El orden de esas actualizaciones lo decide una cola de prioridad por error
+de Bellman: primero los pares (s, a) cuyo valor más va a cambiar y, al
+actualizar uno, se encolan sus predecesores. Así, p. ej., la penalización por
+muerte se propaga hacia atrás sin tener que volver a morir en el mismo foso.
+
+Desactivado por defecto (planning_steps=0): con el estado actual NO ayuda.
+get_state() es solo la posición, y desde la misma posición la misma acción
+acaba bien o en el foso según si Mario ya estaba en el aire. El modelo
+promedia esos resultados como si fueran azar y la planificación propaga ese
+promedio a todo el pasillo. En bench/planning_synthetic.txt, con el estado
+de posición, planificar tarda más frames en llegar a casi todos los
+umbrales. Con --air-state (el estado incluye los frames en el aire) sí
+llega antes, y todas las semillas llegan a 2500. No volver a activarlo
+hasta que get_state() distinga si Mario está saltando.
+"""
+
+import heapq
+import itertools
+import contextlib
+
+# --- CONFIGURACIÓN ---
+PRIORITY_THRESHOLD = 0.01   # Errores de Bellman menores no se encolan
+
+NULL_LOCK = contextlib.nullcontext()
+
+
+class DynaModel:
+    """Modelo tabular: conteos de siguiente estado y recompensa media por (s, a)."""
+
+    def __init__(self):
+        self.next_counts = {}     # (s, a) -> {s': veces}
+        self.reward_sum = {}      # (s, a) -> suma de recompensas
+        self.visits = {}          # (s, a) -> veces
+        self.predecessors = {}    # s' -> {(s, a)}
+
+    def observe(self, state, action, reward, next_state):
+        key = (state, action)
+        counts = self.next_counts.setdefault(key, {})
+        counts[next_state] = counts.get(next_state, 0) + 1
+        self.reward_sum[key] = self.reward_sum.get(key, 0.0) + reward
+        self.visits[key] = self.visits.get(key, 0) + 1
+        self.predecessors.setdefault(next_state, set()).add(key)
+
+    def expected_target(self, q_table, state, action, gamma):
+        """r medio + gamma * E[max Q(s')] según los conteos observados."""
+        key = (state, action)
+        visits = self.visits[key]
+        future = 0.0
+        for next_state, count in self.next_counts[key].items():
+            future += count * max(q_table[next_state])
+        return (self.reward_sum[key] + gamma * future) / visits
+
+
+class PrioritizedSweeping:
+    """Planificador: cola de prioridad por |error de Bellman| sobre el DynaModel."""
+
+    def __init__(self, q_table, alpha, gamma, threshold=PRIORITY_THRESHOLD):
+        self.q_table = q_table
+        self.alpha = alpha
+        self.gamma = gamma
+        self.threshold = threshold
+        self.model = DynaModel()
+        self.heap = []
+        self.queued = {}               # (s, a) -> prioridad con la que está en la cola
+        self.counter = itertools.count()
+        self.updates = 0
+
+    def _lock(self, state):
+        """Lock de la fila `state` en tablas compartidas (ver shared_qtable.py); nada en un dict."""
+        lock = getattr(self.q_table, "lock", None)
+        return lock(state) if lock is not None else NULL_LOCK
+
+    def _priority(self, state, action):
+        target = self.model.expected_target(self.q_table, state, action, self.gamma)
+        return abs(target - self.q_table[state][action])
+
+    def _push(self, state, action):
+        priority = self._priority(state, action)
+        key = (state, action)
+        if priority > self.threshold and priority > self.queued.get(key, 0.0):
+            self.queued[key] = priority
+            heapq.heappush(self.heap, (-priority, next(self.counter), key))
+
+    def observe(self, state, action, reward, next_state):
+        """Registra una transición real y encola (s, a) si su error es grande."""
+        self.model.observe(state, action, reward, next_state)
+        self._push(state, action)
+
+    def plan(self, steps):
+        """Hasta `steps` actualizaciones simuladas, de mayor a menor prioridad."""
+        done = 0
+        while self.heap and done < steps:
+            neg_priority, _, key = heapq.heappop(self.heap)
+            if self.queued.get(key) != -neg_priority:
+                continue  # Entrada obsoleta: se volvió a encolar con otra prioridad
+            del self.queued[key]
+
+            state, action = key
+            target = self.model.expected_target(self.q_table, state, action, self.gamma)
+            with self._lock(state):
+                row = self.q_table[state]
+                row[action] += self.alpha * (target - row[action])
+            done += 1
+
+            for pred_state, pred_action in self.model.predecessors.get(state, ()):
+                self._push(pred_state, pred_action)
+        self.updates += done
+        return done
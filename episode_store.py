@@ -0,0 +1,207 @@
+"""
+Almacén columnar (append-only) del historial de episodios del agente.
+
+Cada generación terminada se guarda como una fila con las columnas de
+EPISODE_DTYPE. Las filas se acumulan en un lote NumPy preasignado y un hilo
+escritor vuelca cada lote lleno al final de un fichero binario por columna
+(<dir>/<columna>.bin), de modo que el bucle de entrenamiento nunca espera al
+disco. Las consultas leen solo las columnas que necesitan vía np.memmap.
+
+Tras escribir todas las columnas de un lote, el hilo guarda (atómicamente)
+el número de filas confirmadas en <dir>/rows.count. Si el proceso muere a
+mitad de un volcado las columnas pueden quedar con longitudes distintas: al
+abrir el almacén se truncan todas a ese número. Si el hilo escritor falla,
+su excepción se relanza en el siguiente append/flush/close.
+
+USO:
+    python3 episode_store.py [directorio]     # Resumen de una noche de entrenamiento
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+STORE_DIR = "episodes"
+BATCH_SIZE = 4096
+ROWS_FILE = "rows.count"   # Filas confirmadas (todas las columnas completas)
+DEATH_BIN = 16    # Ancho (en píxeles de distancia) del histograma de muertes
+
+EPISODE_DTYPE = np.dtype([
+    ("generation", np.int64),
+    ("worker", np.int16),
+    ("max_distance", np.int32),
+    ("total_reward", np.float64),
+    ("epsilon", np.float32),
+    ("dead", np.bool_),
+    ("death_x", np.int32),       # -1 si el episodio terminó por estar atascado
+    ("frames", np.int64),        # Frames emulados en el episodio
+    ("steps", np.int32),         # Pasos del agente en el episodio
+    ("timestamp", np.float64),
+])
+
+
+class EpisodeStore:
+    """Historial de episodios append-only, un fichero binario por columna."""
+
+    def __init__(self, path=STORE_DIR, batch_size=BATCH_SIZE):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.rows = self._recover()
+        self.batch = np.zeros(batch_size, dtype=EPISODE_DTYPE)
+        self.pending = 0
+        self.error = None
+        self.queue = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, daemon=True)
+        self.writer.start()
+
+    def append(self, **row):
+        """Añade un episodio. Solo copia al lote en memoria; el disco lo escribe el hilo."""
+        self._check_writer()
+        record = self.batch[self.pending]
+        for name in EPISODE_DTYPE.names:
+            record[name] = row.get(name, 0)
+        if "timestamp" not in row:
+            record["timestamp"] = time.time()
+        self.pending += 1
+        if self.pending == len(self.batch):
+            self.flush()
+
+    def flush(self):
+        """Entrega el lote actual al hilo escritor."""
+        self._check_writer()
+        if self.pending:
+            self.queue.put(self.batch[:self.pending].copy())
+            self.pending = 0
+
+    def close(self):
+        """Vuelca lo pendiente y espera a que el hilo escritor termine."""
+        if self.writer.is_alive():
+            self.flush()
+            self.queue.put(None)
+            self.writer.join()
+        self._check_writer()
+
+    def _check_writer(self):
+        """Relanza en el hilo del llamador la excepción con la que murió el hilo escritor."""
+        if self.error is not None:
+            raise RuntimeError(f"El hilo escritor de {self.path} falló: {self.error!r}") from self.error
+
+    def _write_loop(self):
+        try:
+            while True:
+                batch = self.queue.get()
+                if batch is None:
+                    return
+                for name in EPISODE_DTYPE.names:
+                    with open(self._column_path(name), "ab") as f:
+                        f.write(np.ascontiguousarray(batch[name]).tobytes())
+                self.rows += len(batch)
+                self._commit(self.rows)
+        except BaseException as error:
+            self.error = error
+
+    def _commit(self, rows):
+        """Guarda el número de filas confirmadas (atómico: nunca se lee a medias)."""
+        path = os.path.join(self.path, ROWS_FILE)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(f"{rows}\n")
+        os.replace(tmp, path)
+
+    def _committed(self):
+        """Filas confirmadas según rows.count (None si el fichero no existe)."""
+        try:
+            with open(os.path.join(self.path, ROWS_FILE)) as f:
+                return int(f.read())
+        except FileNotFoundError:
+            return None
+
+    def _recover(self):
+        """Trunca todas las columnas a las filas confirmadas (un volcado interrumpido deja colas sueltas)."""
+        sizes = {}
+        for name in EPISODE_DTYPE.names:
+            path = self._column_path(name)
+            sizes[name] = os.path.getsize(path) // EPISODE_DTYPE[name].itemsize if os.path.exists(path) else 0
+        committed = self._committed()
+        # Sin rows.count (almacén anterior) vale la columna más corta; nunca más filas de las que hay
+        rows = min(sizes.values()) if committed is None else min(committed, *sizes.values())
+        for name, size in sizes.items():
+            if size > rows:
+                with open(self._column_path(name), "r+b") as f:
+                    f.truncate(rows * EPISODE_DTYPE[name].itemsize)
+        if rows != committed:
+            self._commit(rows)
+        return rows
+
+    def _column_path(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    # --- CONSULTAS ---
+
+    def __len__(self):
+        # Solo filas confirmadas: las columnas del lote en curso pueden ir por delante
+        return self._committed() or 0
+
+    def column(self, name):
+        """Columna completa como np.memmap de solo lectura (vacía si aún no hay datos)."""
+        n = len(self)
+        if n == 0:
+            return np.zeros(0, dtype=EPISODE_DTYPE[name])
+        return np.memmap(self._column_path(name), dtype=EPISODE_DTYPE[name], mode="r", shape=(n,))
+
+    def best_distance_per(self, bucket=1000):
+        """Mejor distancia por bloque de `bucket` generaciones: (inicio_bloque, distancia)."""
+        generation = self.column("generation")
+        if len(generation) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32)
+        keys = generation // bucket
+        best = np.full(int(keys.max()) + 1, -1, dtype=np.int32)
+        np.maximum.at(best, keys, self.column("max_distance"))
+        blocks = np.flatnonzero(best >= 0)
+        return blocks * bucket, best[blocks]
+
+    def death_histogram(self, bin_width=DEATH_BIN):
+        """Histograma de posiciones de muerte: (inicio_bin, muertes)."""
+        death_x = self.column("death_x")
+        death_x = death_x[self.column("dead")]
+        counts = np.bincount(death_x // bin_width)
+        bins = np.flatnonzero(counts)
+        return bins * bin_width, counts[bins]
+
+    def frames_per_episode(self):
+        """Frames emulados de cada episodio, en orden de inserción."""
+        return self.column("frames")
+
+
+def main():
+    store = EpisodeStore(sys.argv[1] if len(sys.argv) > 1 else STORE_DIR)
+    n = len(store)
+    print("=" * 70)
+    print(f"HISTORIAL DE EPISODIOS - {store.path} ({n} episodios)")
+    print("=" * 70)
+    if n == 0:
+        store.close()
+        return
+
+    frames = store.frames_per_episode()
+    print(f"Frames por episodio: media {frames.mean():.0f} | mediana {np.median(frames):.0f} | max {frames.max()}")
+    print(f"Muertes: {int(store.column('dead').sum())} | Atascos: {n - int(store.column('dead').sum())}")
+
+    print("\nMejor distancia por 1000 generaciones:")
+    for start, best in zip(*store.best_distance_per(1000)):
+        print(f"  Gen {start:8d}: {best}")
+
+    print("\nPosiciones de muerte (top 10):")
+    bins, counts = store.death_histogram()
+    for i in np.argsort(counts)[::-1][:10]:
+        print(f"  x={bins[i]:5d}-{bins[i] + DEATH_BIN - 1:5d}: {counts[i]} muertes")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
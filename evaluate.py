@@ -0,0 +1,257 @@
+"""
+Evaluación greedy de una Q-table, separada del entrenamiento.
+
+`run` siempre entrena con exploración epsilon, así que su distancia es
+ruidosa. Aquí se carga un snapshot de la Q-table y se juegan episodios
+greedy (epsilon = 0, sin actualizar la tabla) en un pool de emuladores
+headless. Cada episodio empieza con un número aleatorio de frames sin
+pulsar nada para perturbar el inicio. Cada proceso del pool crea su
+emulador una sola vez y vuelve al inicio del 1-1 cargando un save-state.
+
+El agente del pool se construye con los mismos `agent_kwargs` que el que
+entrena (enemy_aware, level_aware, actions...): si no, los estados o el
+número de acciones no coincidirían con los de la tabla. El snapshot de la
+tabla se copia UNA vez por evaluación a un bloque de shared_memory; las
+tareas solo llevan su nombre y cada worker lo lee una vez.
+
+Desde el entrenamiento se usa Evaluator.submit(), que devuelve enseguida;
+el resultado se consulta con .ready() / .get() sin bloquear el bucle.
+
+USO:
+    python3 evaluate.py [q_table.npz] [episodios]
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import multiprocessing as mp
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+EPISODES = 16
+MAX_NOOP_FRAMES = 30          # Perturbación del inicio: 0..30 frames sin entrada
+MAX_EPISODE_FRAMES = 60 * 400 # Tope por episodio (el reloj del 1-1 es de 400)
+STUCK_LIMIT = 100             # Igual que MarioAgent.run
+
+# Estado por proceso del pool (se inicializa una vez en cada worker)
+_agent = None
+_ready_state = None
+_snapshot = (None, None)   # (nombre del bloque, dict) de la última tabla leída
+
+
+def _init_worker(rom_path, agent_kwargs):
+    """Crea el emulador del worker y guarda el estado 'listo para jugar'."""
+    global _agent, _ready_state
+    from main import MarioAgent
+    _agent = MarioAgent(rom_path, window="null", verbose=False, **agent_kwargs)
+    _agent.start_sequence()
+    buffer = io.BytesIO()
+    _agent.pyboy.save_state(buffer)
+    _ready_state = buffer.getvalue()
+
+
+def _snapshot_arrays(buf, shape):
+    """Vistas (estados, Q-values) sobre el bloque de un TableSnapshot."""
+    n, n_actions = shape
+    states = np.ndarray((n,), dtype=np.int64, buffer=buf)
+    values = np.ndarray((n, n_actions), dtype=np.float64, buffer=buf, offset=states.nbytes)
+    return states, values
+
+
+class TableSnapshot:
+    """Copia de una Q-table en shared_memory: estados (int64) + Q-values (float64)."""
+
+    def __init__(self, q_table):
+        items = q_table.to_dict() if hasattr(q_table, "to_dict") else q_table
+        states = np.array(list(items.keys()), dtype=np.int64)
+        values = np.array([list(v) for v in items.values()], dtype=np.float64)
+        values = values.reshape(len(states), -1) if len(states) else np.zeros((0, 0))
+        self.shape = values.shape
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, states.nbytes + values.nbytes))
+        shared_states, shared_values = _snapshot_arrays(self.shm.buf, self.shape)
+        shared_states[:] = states
+        shared_values[:] = values
+        del shared_states, shared_values   # Sin vistas vivas el bloque se puede cerrar
+
+    @property
+    def n_actions(self):
+        return self.shape[1]
+
+    def task(self, noop_frames):
+        """Lo que viaja con cada tarea: nombre y forma del bloque, no los datos."""
+        return (self.shm.name, self.shape, noop_frames)
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _load_snapshot(name, shape):
+    """dict {estado: [q_values]} del bloque `name`, leído una vez por worker y evaluación."""
+    global _snapshot
+    if _snapshot[0] != name:
+        shm = shared_memory.SharedMemory(name=name)
+        # Adjuntar lo registra en el resource_tracker, que lo intentaría liberar otra vez
+        resource_tracker.unregister(shm._name, "shared_memory")
+        states, values = _snapshot_arrays(shm.buf, shape)
+        table = {int(s): row for s, row in zip(states.tolist(), values.tolist())}
+        del states, values
+        shm.close()
+        _snapshot = (name, table)
+    return _snapshot[1]
+
+
+def _run_episode(task):
+    """Un episodio greedy. task = (bloque del snapshot, forma, frames_noop)."""
+    name, shape, noop_frames = task
+    return play_episode(_agent, _ready_state, _load_snapshot(name, shape), noop_frames)
+
+
+def play_episode(agent, ready_state, q_table, noop_frames):
+    """
+    Juega un episodio greedy desde `ready_state`. Completar el nivel se cuenta
+    con MarioAgent.check_level, igual que al entrenar: un valor de mundo/nivel
+    no válido (transiciones, resets) no es un nivel superado.
+    """
+    agent.pyboy.load_state(io.BytesIO(ready_state))
+    agent.q_table = q_table
+    agent.epsilon = 0.0
+    agent.reset_episode_state()
+    agent.pyboy.tick(noop_frames, False)
+
+    start_frame = agent.pyboy.frame_count
+    agent.current_level = agent.get_level()
+    agent.level_completions = {}
+    dead = completed = False
+    while agent.pyboy.frame_count - start_frame < MAX_EPISODE_FRAMES:
+        action_idx = agent.choose_action(agent.get_state())
+        _, _, dead = agent.step(action_idx)
+        if dead:
+            break
+        if agent.current_level is not None:
+            agent.check_level()
+        if agent.level_completions:
+            completed = True
+            break
+        if agent.stuck_frames > STUCK_LIMIT:
+            break
+
+    return {
+        "distance": agent.max_distance,
+        "completed": completed,
+        "dead": dead,
+        "frames": agent.pyboy.frame_count - start_frame,
+    }
+
+
+def summarize(results):
+    """Resumen de una lista de resultados de episodio."""
+    distances = [r["distance"] for r in results]
+    deaths = [r["frames"] for r in results if r["dead"]]
+    return {
+        "episodes": len(results),
+        "mean_distance": float(np.mean(distances)),
+        "max_distance": int(max(distances)),
+        "completion_rate": sum(r["completed"] for r in results) / len(results),
+        "death_rate": len(deaths) / len(results),
+        "mean_frames_to_death": float(np.mean(deaths)) if deaths else 0.0,
+    }
+
+
+class PendingEvaluation:
+    """Evaluación en curso: .ready() no bloquea, .get() devuelve el resumen."""
+
+    def __init__(self, async_result, snapshot):
+        self.async_result = async_result
+        self.snapshot = snapshot
+
+    def ready(self):
+        return self.async_result.ready()
+
+    def get(self, timeout=None):
+        try:
+            return summarize(self.async_result.get(timeout))
+        finally:
+            self.release()
+
+    def release(self):
+        """Libera el bloque del snapshot (los workers ya tienen su copia o no la necesitan)."""
+        if self.snapshot is not None and self.async_result.ready():
+            self.snapshot.close()
+            self.snapshot = None
+
+
+class Evaluator:
+    """
+    Pool persistente de emuladores headless para evaluar Q-tables.
+
+    `agent_kwargs` son los argumentos de MarioAgent que definen estados y
+    acciones (enemy_aware, level_aware, actions...) y deben coincidir con
+    los del agente que entrena la tabla.
+    """
+
+    def __init__(self, rom_path, processes=None, seed=None, agent_kwargs=None):
+        from action_macros import DEFAULT_MACROS
+        agent_kwargs = dict(agent_kwargs or {})
+        self.n_actions = len(agent_kwargs.get("actions") or DEFAULT_MACROS)
+        processes = processes or max(1, (os.cpu_count() or 2) - 1)
+        self.pool = mp.Pool(processes, initializer=_init_worker, initargs=(rom_path, agent_kwargs))
+        self.rng = random.Random(seed)
+        self.pending = []
+
+    def submit(self, q_table, episodes=EPISODES):
+        """Lanza la evaluación de una copia de `q_table` y devuelve sin esperar."""
+        snapshot = TableSnapshot(q_table)
+        if snapshot.shape[0] and snapshot.n_actions != self.n_actions:
+            snapshot.close()
+            raise ValueError(f"La Q-table tiene {snapshot.n_actions} acciones y el agente del evaluador "
+                             f"{self.n_actions}: pasa los mismos agent_kwargs que al entrenar")
+        tasks = [snapshot.task(self.rng.randint(0, MAX_NOOP_FRAMES)) for _ in range(episodes)]
+        pending = PendingEvaluation(self.pool.map_async(_run_episode, tasks), snapshot)
+        for old in self.pending:
+            old.release()
+        self.pending = [p for p in self.pending if p.snapshot is not None] + [pending]
+        return pending
+
+    def evaluate(self, q_table, episodes=EPISODES):
+        """Versión bloqueante de submit()."""
+        return self.submit(q_table, episodes).get()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+        for pending in self.pending:
+            if pending.snapshot is not None:
+                pending.snapshot.close()
+                pending.snapshot = None
+
+
+def main():
+    from main import ROM_PATH, Q_TABLE_PATH, load_q_table
+
+    path = sys.argv[1] if len(sys.argv) > 1 else Q_TABLE_PATH
+    episodes = int(sys.argv[2]) if len(sys.argv) > 2 else EPISODES
+    q_table = load_q_table(path)
+
+    print("=" * 70)
+    print(f"EVALUACIÓN GREEDY - {path} ({len(q_table)} estados, {episodes} episodios)")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    evaluator = Evaluator(ROM_PATH)
+    summary = evaluator.evaluate(q_table, episodes)
+    evaluator.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Distancia media: {summary['mean_distance']:.0f} | Máxima: {summary['max_distance']}")
+    print(f"Completado: {summary['completion_rate']:.0%} | Muertes: {summary['death_rate']:.0%} | "
+          f"Frames hasta morir: {summary['mean_frames_to_death']:.0f}")
+    print(f"Tiempo: {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
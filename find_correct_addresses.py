@@ -9,9 +9,12 @@ INSTRUCCIONES:
 5. Anota la dirección correcta
 """
 
-import time
+import numpy as np
 from pyboy import PyBoy
 
+from dashboard import Dashboard
+from pacing import PacedEmulator, print_stats
+
 ROM_PATH = "roms/super-mario-land.gb"
 WINDOW_TYPE = "SDL2"
 
@@ -25,12 +28,11 @@ def main():
     print("   Buscaremos direcciones que contengan el valor 2\n")
     
     pyboy = PyBoy(ROM_PATH, window=WINDOW_TYPE)
-    pyboy.set_emulation_speed(1)
+    paced = PacedEmulator(pyboy, speed=1)
     
     # Esperar a que cargue el juego
     print("Esperando a que cargue el juego...")
-    for _ in range(300):
-        pyboy.tick()
+    paced.run(max_frames=300)
     
     print("\n🎮 JUEGA MANUALMENTE Y OBSERVA:")
     print("   1. Cuando veas MARIO×02 (2 vidas), anota qué direcciones tienen valor 2")
@@ -47,72 +49,54 @@ def main():
         (0xDB00, 0xDBFF, "WRAM Bank 2"),
     ]
     
-    # Diccionario para trackear valores
-    memory_snapshot = {}
+    # Volcado hexadecimal de todos los rangos, 32 direcciones por fila.
+    # El bucle de emulación solo copia la memoria al panel; la terminal se
+    # redibuja en su propio hilo y solo en las celdas que cambian.
+    addresses = [addr for start, end, _ in ranges for addr in range(start, end + 1)]
+    row_labels = [f"0x{addr:04X}:" for addr in addresses[::32]]
+    dash = Dashboard("BUSCADOR DE DIRECCIONES - celdas resaltadas = cambiaron hace poco",
+                     [""] * len(addresses), columns=32, fmt="{:02X}", row_labels=row_labels)
     
-    # Tomar snapshot inicial
-    for start, end, _ in ranges:
-        for addr in range(start, end + 1):
-            memory_snapshot[addr] = pyboy.memory[addr]
+    def read_all(source):
+        values = []
+        for start, end, _ in ranges:
+            values.extend(source.memory[start:end + 1])
+        return values
     
-    step_count = 0
+    dash.values[:] = read_all(pyboy)
+    dash.start()
     
-    while True:
-        pyboy.tick()
-        step_count += 1
-        
-        if step_count % 60 == 0:  # Cada ~1 segundo
-            print(f"\n{'='*70}")
-            print(f"Frame: {pyboy.frame_count} - Buscando direcciones con valores pequeños (0-10)")
-            print(f"{'='*70}")
-            
-            # Buscar direcciones con valores pequeños (0-10) que puedan ser vidas
-            candidates = []
-            
-            for start, end, range_name in ranges:
-                range_candidates = []
-                
-                for addr in range(start, end + 1):
-                    val = pyboy.memory[addr]
-                    old_val = memory_snapshot[addr]
-                    
-                    # Buscar valores pequeños (típicos de vidas/niveles)
-                    if 0 <= val <= 10:
-                        changed = "***CAMBIÓ***" if val != old_val else ""
-                        range_candidates.append({
-                            'addr': addr,
-                            'val': val,
-                            'old': old_val,
-                            'changed': changed
-                        })
-                    
-                    memory_snapshot[addr] = val
-                
-                if range_candidates:
-                    candidates.append((range_name, range_candidates))
-            
-            # Mostrar candidatos agrupados
-            for range_name, range_candidates in candidates:
-                print(f"\n📍 [{range_name}]:")
-                
-                # Mostrar solo los primeros 10 de cada rango
-                for i, cand in enumerate(range_candidates[:10]):
-                    addr = cand['addr']
-                    val = cand['val']
-                    old = cand['old']
-                    changed = cand['changed']
-                    
-                    print(f"   0x{addr:04X} = {val:2d} (era {old:2d}) {changed}")
-                
-                if len(range_candidates) > 10:
-                    print(f"   ... y {len(range_candidates) - 10} más")
-            
-            print(f"\n💡 PISTA: Busca una dirección que:")
-            print(f"   - Tenga valor 2 cuando veas MARIO×02")
-            print(f"   - Cambie a 1 cuando veas MARIO×01")
-            print(f"   - Cambie a 0 cuando veas GAME OVER")
+    # Foto cada ~1 segundo para detectar transiciones de vidas (2 -> 1 -> 0)
+    previous = dash.values.copy()
+    previous_frame = pyboy.frame_count
+    
+    def analyze(snapshot):
+        # Hilo propio: el emulador solo copia C000-DBFF a la cola (si se
+        # descarta algún snapshot, el siguiente ya trae la memoria al día)
+        nonlocal previous, previous_frame
+        dash.values[:] = read_all(snapshot)
         
-        time.sleep(0.001)
+        if snapshot.frame_count - previous_frame >= 60:  # Cada ~1 segundo
+            current = dash.values.copy()
+            lost_life = np.flatnonzero((current == previous - 1) & (previous <= 10))
+            candidates = " ".join(f"0x{addresses[i]:04X}({previous[i]}->{current[i]})" for i in lost_life[:8])
+            dash.status[0] = f"Frame: {snapshot.frame_count}"
+            if len(lost_life):
+                dash.status[1] = f"💡 Bajaron 1 (valores 0-10) en el último segundo: {candidates}"
+            else:
+                dash.status[1] = ""   # Sin bajadas en este segundo: no dejar el aviso anterior
+            previous = current
+            previous_frame = snapshot.frame_count
+    
+    paced.add_consumer(analyze, 0xC000, 0xDC00)
+    try:
+        paced.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = paced.close()
+        dash.close()
+        print_stats(stats)
 
 if __name__ == "__main__":
     main()
@@ -9,16 +9,19 @@ INSTRUCCIONES:
 5. Anota las direcciones que veas cambiar consistentemente
 """
 
-import time
 from pyboy import PyBoy
 
+from oam import OAM_END, OAMReader
+from pacing import PacedEmulator, print_stats
+
 ROM_PATH = "roms/snow-bros.gb"
 WINDOW_TYPE = "SDL2"
 
 # Addresses conocidas
 ADDR_LIVES = 0xC699
-ADDR_PLAYER_X = 0xC1A0
+ADDR_PLAYER_X = 0xC1A0       # Coordenadas de juego en WRAM: NO están en el espacio de la OAM
 ADDR_PLAYER_Y = 0xC1A2
+PLAYER_SLOTS = (0, 1, 2, 3)  # Slots OAM del jugador (comprobar en el listado moviéndose)
 
 def main():
     print("="*70)
@@ -28,7 +31,7 @@ def main():
     print("🎮 JUEGA NORMALMENTE y observa cuando aparezcan/mueran enemigos\n")
     
     pyboy = PyBoy(ROM_PATH, window=WINDOW_TYPE)
-    pyboy.set_emulation_speed(1)
+    paced = PacedEmulator(pyboy, speed=1)
     
     # Monitorear área amplia donde podrían estar los enemigos
     # Típicamente los enemigos están cerca del player en memoria
@@ -45,73 +48,93 @@ def main():
         for addr in range(start, end + 1):
             previous_memory[addr] = pyboy.memory[addr]
     
-    step_count = 0
     significant_changes = []
     
-    while True:
-        pyboy.tick()
-        step_count += 1
+    def analyze(snapshot):
+        # Hilo propio con una copia de C180-FE9F (incluye la OAM): el análisis no frena al juego
+        wram_x = snapshot.memory[ADDR_PLAYER_X]
+        wram_y = snapshot.memory[ADDR_PLAYER_Y]
+        lives = snapshot.memory[ADDR_LIVES]
         
-        if step_count % 30 == 0:  # Cada ~0.5 segundos
-            px = pyboy.memory[ADDR_PLAYER_X]
-            py = pyboy.memory[ADDR_PLAYER_Y]
-            lives = pyboy.memory[ADDR_LIVES]
-            
-            print(f"\n{'='*70}")
-            print(f"Player: ({px:3d}, {py:3d}) | Lives: {lives}")
-            print(f"{'='*70}")
-            
-            all_changes = []
+        # Las distancias a enemigos se miden en el espacio de la OAM: la posición
+        # del jugador sale de sus propios sprites, no de WRAM
+        oam = OAMReader(snapshot)
+        player = oam.player_position(PLAYER_SLOTS)
+        
+        print(f"\n{'='*70}")
+        position = f"({player[0]:3d}, {player[1]:3d})" if player else "(no visible)"
+        print(f"Player OAM: {position} | WRAM: ({wram_x:3d}, {wram_y:3d}) | Lives: {lives}")
+        print(f"{'='*70}")
+        
+        # Sprites por hardware: posición real de todo lo que se dibuja en pantalla
+        # (visibles en la OAM, excluyendo los del jugador)
+        if player is not None:
+            px, py = player
+            others = oam.others(px, py)
+            print(f"\n👾 SPRITES EN OAM ({len(others)} fuera del jugador):")
+            for sprite in others[:8]:
+                print(f"    Slot {sprite['slot']:2d}: X={sprite['x']:3d} Y={sprite['y']:3d} Tile=0x{sprite['tile']:02X} Flags=0x{sprite['flags']:02X}")
+            enemy = oam.nearest_enemy_ahead(px, py)
+            if enemy:
+                print(f"    ➡️  Más cercano por delante: dx={enemy[0]}, dy={enemy[1]}")
+        
+        all_changes = []
+        
+        for start, end, range_name in watch_ranges:
+            changes_in_range = []
             
-            for start, end, range_name in watch_ranges:
-                changes_in_range = []
+            for addr in range(start, end + 1):
+                val = snapshot.memory[addr]
                 
-                for addr in range(start, end + 1):
-                    val = pyboy.memory[addr]
-                    
-                    if val != previous_memory[addr]:
-                        old_val = previous_memory[addr]
-                        changes_in_range.append({
-                            'addr': addr,
-                            'old': old_val,
-                            'new': val,
-                            'diff': abs(val - old_val)
-                        })
-                        previous_memory[addr] = val
-                
-                if changes_in_range:
-                    all_changes.append((range_name, changes_in_range))
+                if val != previous_memory[addr]:
+                    old_val = previous_memory[addr]
+                    changes_in_range.append({
+                        'addr': addr,
+                        'old': old_val,
+                        'new': val,
+                        'diff': abs(val - old_val)
+                    })
+                    previous_memory[addr] = val
             
-            # Mostrar cambios agrupados por rango
-            if all_changes:
-                print(f"\n🔔 CAMBIOS DETECTADOS:")
-                for range_name, changes in all_changes:
-                    print(f"\n  [{range_name}] - {len(changes)} cambios:")
+            if changes_in_range:
+                all_changes.append((range_name, changes_in_range))
+        
+        # Mostrar cambios agrupados por rango
+        if all_changes:
+            print(f"\n🔔 CAMBIOS DETECTADOS:")
+            for range_name, changes in all_changes:
+                print(f"\n  [{range_name}] - {len(changes)} cambios:")
+                
+                # Mostrar los primeros 5 cambios de cada rango
+                for change in changes[:5]:
+                    addr = change['addr']
+                    old = change['old']
+                    new = change['new']
                     
-                    # Mostrar los primeros 5 cambios de cada rango
-                    for change in changes[:5]:
-                        addr = change['addr']
-                        old = change['old']
-                        new = change['new']
-                        
-                        # Resaltar cambios significativos (podrían ser posiciones)
-                        if 0 < new < 200 and abs(new - old) < 50:
-                            marker = "⭐ POSIBLE COORD"
-                        else:
-                            marker = ""
-                        
-                        print(f"    0x{addr:04X}: {old:3d} → {new:3d}  {marker}")
+                    # Resaltar cambios significativos (podrían ser posiciones)
+                    if 0 < new < 200 and abs(new - old) < 50:
+                        marker = "⭐ POSIBLE COORD"
+                    else:
+                        marker = ""
                     
-                    if len(changes) > 5:
-                        print(f"    ... y {len(changes) - 5} cambios más")
-            else:
-                print("  (sin cambios)")
-            
-            # Buscar patrones que parezcan coordenadas (valores 0-255, cambios pequeños)
-            if step_count % 90 == 0:  # Cada ~1.5 segundos
-                print(f"\n💡 SUGERENCIA: Intenta matar un enemigo para ver cambios claros")
+                    print(f"    0x{addr:04X}: {old:3d} → {new:3d}  {marker}")
+                
+                if len(changes) > 5:
+                    print(f"    ... y {len(changes) - 5} cambios más")
+        else:
+            print("  (sin cambios)")
         
-        time.sleep(0.001)
+        # Buscar patrones que parezcan coordenadas (valores 0-255, cambios pequeños)
+        if snapshot.frame_count % 90 == 0:  # Cada ~1.5 segundos
+            print(f"\n💡 SUGERENCIA: Intenta matar un enemigo para ver cambios claros")
+    
+    paced.add_consumer(analyze, 0xC180, OAM_END, every=30)  # Cada ~0.5 segundos
+    try:
+        paced.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print_stats(paced.close())
 
 if __name__ == "__main__":
     main()
@@ -9,9 +9,11 @@ INSTRUCCIONES:
 5. Copia y pega los valores que veas en la terminal
 """
 
-import time
 from pyboy import PyBoy
 
+from dashboard import Dashboard
+from pacing import PacedEmulator, print_stats
+
 ROM_PATH = "roms/snow-bros.gb"
 WINDOW_TYPE = "SDL2"
 
@@ -28,77 +30,54 @@ def main():
     print("🎮 JUEGA NORMALMENTE y observa la terminal\n")
     
     pyboy = PyBoy(ROM_PATH, window=WINDOW_TYPE)
-    pyboy.set_emulation_speed(1)
+    paced = PacedEmulator(pyboy, speed=1)
     
     # Monitorear área alrededor de Lives
     # Lives está en 0xC699, score debería estar cerca "a la derecha"
     watch_start = 0xC698  # Un poco antes de Lives
     watch_end = 0xC6A5    # Bastante después de Lives
     
-    previous_memory = {}
+    # Panel con redibujado incremental: el bucle solo escribe valores,
+    # la terminal se refresca en su propio hilo
+    labels = []
     for addr in range(watch_start, watch_end + 1):
-        previous_memory[addr] = pyboy.memory[addr]
-    
-    step_count = 0
+        offset = addr - ADDR_LIVES
+        if offset == 0:
+            label = "LIVES -->"
+        elif offset > 0:
+            label = f"+{offset:2d}"
+        else:
+            label = f"{offset:3d}"
+        labels.append(f"0x{addr:04X} {label:9s} | ")
+    dash = Dashboard("DIAGNÓSTICO DE MEMORIA - SNOW BROS (celdas resaltadas = cambiaron)",
+                     labels, fmt="{0:8d} | 0x{0:02X}")
+    dash.values[:] = pyboy.memory[watch_start:watch_end + 1]
+    dash.start()
     
-    while True:
-        pyboy.tick()
-        step_count += 1
+    def analyze(snapshot):
+        # Hilo propio: el emulador solo copia las 14 direcciones vigiladas
+        dash.values[:] = snapshot.memory[watch_start:watch_end + 1]
         
-        if step_count % 30 == 0:  # Cada ~0.5 segundos
-            lives = pyboy.memory[ADDR_LIVES]
-            
-            # Mostrar área de memoria completa
-            print(f"\n{'='*70}")
-            print(f"Lives = {lives:3d} (0x{lives:02X})")
-            print(f"{'='*70}")
-            print("Dirección | Valor Dec | Valor Hex | Estado")
-            print("-"*70)
-            
-            changes = []
-            for addr in range(watch_start, watch_end + 1):
-                val = pyboy.memory[addr]
-                changed = "*** CAMBIÓ ***" if val != previous_memory[addr] else ""
-                
-                # Marcar Lives claramente
-                if addr == ADDR_LIVES:
-                    label = "LIVES -->"
-                else:
-                    offset = addr - ADDR_LIVES
-                    if offset > 0:
-                        label = f"+{offset:2d}    "
-                    else:
-                        label = f"{offset:3d}    "
-                
-                print(f"0x{addr:04X} {label} | {val:8d} | 0x{val:02X}      | {changed}")
-                
-                if val != previous_memory[addr]:
-                    changes.append((addr, previous_memory[addr], val))
-                
-                previous_memory[addr] = val
-            
-            # Resumen de cambios
-            if changes:
-                print(f"\n🔔 CAMBIOS DETECTADOS:")
-                for addr, old_val, new_val in changes:
-                    offset = addr - ADDR_LIVES
-                    if offset == 0:
-                        pos = "Lives"
-                    elif offset > 0:
-                        pos = f"Lives+{offset}"
-                    else:
-                        pos = f"Lives{offset}"
-                    print(f"   0x{addr:04X} ({pos}): {old_val} -> {new_val}")
-            
-            # Alertas especiales
-            if lives == 0:
-                print(f"\n⚠️  Lives = 0 detectado")
-            elif lives == 255:
-                print(f"\n⚠️  Lives = 255 (0xFF) detectado")
-            elif lives > 10:
-                print(f"\n⚠️  Lives = {lives} (valor inusual)")
-                
-        time.sleep(0.001)
+        lives = snapshot.memory[ADDR_LIVES]
+        dash.status[0] = f"Lives = {lives:3d} (0x{lives:02X}) | Frame: {snapshot.frame_count}"
+        
+        # Alertas especiales
+        if lives == 0:
+            dash.status[1] = f"⚠️  Lives = 0 detectado (frame {snapshot.frame_count})"
+        elif lives == 255:
+            dash.status[1] = f"⚠️  Lives = 255 (0xFF) detectado (frame {snapshot.frame_count})"
+        elif lives > 10:
+            dash.status[1] = f"⚠️  Lives = {lives} (valor inusual)"
+    
+    paced.add_consumer(analyze, watch_start, watch_end + 1)
+    try:
+        paced.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = paced.close()
+        dash.close()
+        print_stats(stats)
 
 if __name__ == "__main__":
     main()
@@ -12,9 +12,10 @@ INSTRUCCIONES:
 4. Anota las direcciones que funcionan correctamente
 """
 
-import time
 from pyboy import PyBoy
 
+from pacing import PacedEmulator, print_stats
+
 ROM_PATH = "roms/super-mario-land.gb"
 WINDOW_TYPE = "SDL2"
 
@@ -56,7 +57,7 @@ def main():
     print("\n🎮 JUEGA NORMALMENTE y observa la terminal\n")
     
     pyboy = PyBoy(ROM_PATH, window=WINDOW_TYPE)
-    pyboy.set_emulation_speed(1)
+    paced = PacedEmulator(pyboy, speed=1)
     
     previous_values = {
         'lives': 0,
@@ -67,57 +68,58 @@ def main():
         'level': 0,
     }
     
-    step_count = 0
-    
-    while True:
-        pyboy.tick()
-        step_count += 1
+    def analyze(snapshot):
+        # Hilo propio con una copia de C0A0-DA15: imprimir no frena al juego
+        lives = snapshot.memory[ADDR_LIVES]
+        score = read_score_bcd(snapshot.memory)
+        px = snapshot.memory[ADDR_PLAYER_X]
+        py = snapshot.memory[ADDR_PLAYER_Y]
+        world = snapshot.memory[ADDR_WORLD]
+        level = snapshot.memory[ADDR_LEVEL]
+        
+        # Mostrar estado actual
+        print(f"\n{'='*70}")
+        print(f"Frame: {snapshot.frame_count}")
+        print(f"{'='*70}")
+        print(f"Lives:     {lives:3d} (0x{lives:02X})", end="")
+        if lives != previous_values['lives']:
+            print(f"  *** CAMBIÓ de {previous_values['lives']} ***", end="")
+        print()
+        
+        print(f"Score:     {score:6d}", end="")
+        if score != previous_values['score']:
+            print(f"  *** CAMBIÓ +{score - previous_values['score']} ***", end="")
+        print()
         
-        if step_count % 30 == 0:  # Cada ~0.5 segundos
-            lives = pyboy.memory[ADDR_LIVES]
-            score = read_score_bcd(pyboy.memory)
-            px = pyboy.memory[ADDR_PLAYER_X]
-            py = pyboy.memory[ADDR_PLAYER_Y]
-            world = pyboy.memory[ADDR_WORLD]
-            level = pyboy.memory[ADDR_LEVEL]
-            
-            # Mostrar estado actual
-            print(f"\n{'='*70}")
-            print(f"Frame: {pyboy.frame_count}")
-            print(f"{'='*70}")
-            print(f"Lives:     {lives:3d} (0x{lives:02X})", end="")
-            if lives != previous_values['lives']:
-                print(f"  *** CAMBIÓ de {previous_values['lives']} ***", end="")
-            print()
-            
-            print(f"Score:     {score:6d}", end="")
-            if score != previous_values['score']:
-                print(f"  *** CAMBIÓ +{score - previous_values['score']} ***", end="")
-            print()
-            
-            print(f"Position:  X={px:3d} (0x{px:02X}), Y={py:3d} (0x{py:02X})", end="")
-            if px != previous_values['x'] or py != previous_values['y']:
-                print(f"  *** MOVIMIENTO ***", end="")
-            print()
-            
-            print(f"World-Level: {world}-{level}", end="")
-            if world != previous_values['world'] or level != previous_values['level']:
-                print(f"  *** CAMBIÓ DE NIVEL ***", end="")
-            print()
-            
-            # Actualizar valores previos
-            previous_values['lives'] = lives
-            previous_values['score'] = score
-            previous_values['x'] = px
-            previous_values['y'] = py
-            previous_values['world'] = world
-            previous_values['level'] = level
-            
-            # Alertas
-            if lives == 0:
-                print(f"\n⚠️  Lives = 0 (GAME OVER?)")
+        print(f"Position:  X={px:3d} (0x{px:02X}), Y={py:3d} (0x{py:02X})", end="")
+        if px != previous_values['x'] or py != previous_values['y']:
+            print(f"  *** MOVIMIENTO ***", end="")
+        print()
         
-        time.sleep(0.001)
+        print(f"World-Level: {world}-{level}", end="")
+        if world != previous_values['world'] or level != previous_values['level']:
+            print(f"  *** CAMBIÓ DE NIVEL ***", end="")
+        print()
+        
+        # Actualizar valores previos
+        previous_values['lives'] = lives
+        previous_values['score'] = score
+        previous_values['x'] = px
+        previous_values['y'] = py
+        previous_values['world'] = world
+        previous_values['level'] = level
+        
+        # Alertas
+        if lives == 0:
+            print(f"\n⚠️  Lives = 0 (GAME OVER?)")
+    
+    paced.add_consumer(analyze, ADDR_SCORE_START, ADDR_LIVES + 1, every=30)  # Cada ~0.5 segundos
+    try:
+        paced.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print_stats(paced.close())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,250 @@
+"""
+Fork-server: workers de emulador listos en milisegundos.
+
+Arrancar un worker normal cuesta importar pyboy y numpy, cargar la ROM y
+jugar la intro de start_sequence (~250 frames): segundos por proceso antes
+de aprender nada, que dominan en barridos cortos y evaluaciones.
+
+El fork-server hace todo eso UNA vez en un proceso plantilla ("zygote"):
+importa los módulos, crea un MarioAgent headless, llega al inicio del 1-1 y
+guarda ese estado como start_state (así cada reset del worker es cargar un
+save-state, no repetir la intro). Después escucha en un socket Unix y, por
+cada petición, hace os.fork(): el hijo hereda el emulador ya listo
+compartiendo sus páginas copy-on-write, ejecuta la tarea pedida y devuelve
+el resultado por la misma conexión.
+
+La plantilla se lanza con fork antes de que el proceso principal cree hilos
+(telemetría, pools...), y ella misma nunca los crea: hacer fork de un
+proceso con hilos puede heredar locks tomados. Por la misma herencia, una
+SharedQTable con locks se pasa al crear el ForkServer (q_table=...), no en
+cada spawn: los locks de multiprocessing no viajan por un socket. Sin ella
+la tabla de cada hijo es una copia privada, así que train_task se niega a
+entrenar (ValueError). Un hijo que falla o muere sin responder se notifica
+como RuntimeError en WorkerHandle.result().
+
+USO:
+    server = ForkServer(ROM_PATH, q_table=SharedQTable())
+    server.start()
+    handle = server.spawn(train_task, 0.3, 5000)
+    stats = handle.result()
+    server.close()
+
+    python3 fork_server.py [workers] [rom]     # latencia de spawn vs arranque en frío
+"""
+
+import io
+import os
+import sys
+import time
+import random
+import shutil
+import signal
+import tempfile
+import traceback
+import multiprocessing as mp
+from multiprocessing.connection import Listener, Client
+
+import numpy as np
+
+from main import MarioAgent, ROM_PATH
+from shared_qtable import SharedQTable, make_shared_agent
+
+# --- CONFIGURACIÓN ---
+BENCH_WORKERS = 16
+COLD_STARTS = 3
+
+
+def _serve(address, rom_path, agent_kwargs, ready):
+    """Proceso plantilla: prepara el agente y hace fork por cada petición."""
+    start = time.perf_counter()
+    agent_kwargs = dict(agent_kwargs, window="null", verbose=False)
+    if agent_kwargs.get("q_table") is not None:
+        agent = make_shared_agent(rom_path, **agent_kwargs)   # Actualiza bajo el lock de la tabla
+    else:
+        agent = MarioAgent(rom_path, **agent_kwargs)
+    agent.start_sequence()
+    buffer = io.BytesIO()
+    agent.pyboy.save_state(buffer)
+    agent.start_state = buffer.getvalue()
+
+    listener = Listener(address, family="AF_UNIX")
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)   # Los hijos se recogen solos
+    ready.send(time.perf_counter() - start)
+    ready.close()
+
+    while True:
+        conn = listener.accept()
+        request = conn.recv()
+        if request is None:
+            conn.close()
+            break
+        if os.fork() == 0:
+            listener.close()
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            _run_child(agent, conn, *request)
+        conn.close()
+    listener.close()
+
+
+def _run_child(agent, conn, fn, args, seed):
+    """Hijo recién creado: avisa de que está listo, ejecuta fn(agent, *args) y sale."""
+    status = 0
+    try:
+        # Sin resembrar, todos los hijos explorarían exactamente igual
+        random.seed(seed)
+        np.random.seed(seed if seed is None else seed % 2**32)
+        conn.send(("ready", os.getpid()))
+        conn.send(("result", fn(agent, *args)))
+    except BaseException:
+        conn.send(("error", traceback.format_exc()))
+        status = 1
+    finally:
+        conn.close()
+        os._exit(status)
+
+
+class WorkerHandle:
+    """Worker creado por el fork-server: pid, latencia de spawn y resultado."""
+
+    def __init__(self, conn, pid, latency):
+        self.conn = conn
+        self.pid = pid
+        self.latency = latency
+
+    def result(self, timeout=None):
+        """Espera el valor devuelto por la tarea (RuntimeError si falló)."""
+        if timeout is not None and not self.conn.poll(timeout):
+            raise TimeoutError(f"El worker {self.pid} no terminó en {timeout}s")
+        try:
+            kind, value = self.conn.recv()
+        except EOFError:
+            raise RuntimeError(f"El worker {self.pid} terminó sin devolver resultado") from None
+        finally:
+            self.conn.close()
+        if kind == "error":
+            raise RuntimeError(f"El worker {self.pid} falló:\n{value}")
+        return value
+
+
+class ForkServer:
+    """Proceso plantilla con el emulador listo que crea workers con os.fork."""
+
+    def __init__(self, rom_path=ROM_PATH, **agent_kwargs):
+        self.rom_path = rom_path
+        self.agent_kwargs = agent_kwargs
+        self.tmpdir = tempfile.mkdtemp(prefix="fork_server_")
+        self.address = os.path.join(self.tmpdir, "server.sock")
+        self.process = None
+        self.boot_time = None
+
+    def start(self):
+        """Lanza la plantilla y espera a que esté lista. Devuelve su tiempo de arranque."""
+        ctx = mp.get_context("fork")
+        ready_recv, ready_send = ctx.Pipe(duplex=False)
+        self.process = ctx.Process(target=_serve, args=(self.address, self.rom_path, self.agent_kwargs, ready_send),
+                                   daemon=True)
+        self.process.start()
+        ready_send.close()
+        self.boot_time = ready_recv.recv()
+        ready_recv.close()
+        return self.boot_time
+
+    def spawn(self, fn, *args, seed=None):
+        """
+        Crea un worker que ejecuta fn(agent, *args) sobre una copia del agente
+        listo. `fn` debe ser una función de módulo (se envía por referencia).
+        """
+        start = time.perf_counter()
+        conn = Client(self.address, family="AF_UNIX")
+        conn.send((fn, args, seed))
+        kind, pid = conn.recv()
+        return WorkerHandle(conn, pid, time.perf_counter() - start)
+
+    def close(self):
+        if self.process is not None and self.process.is_alive():
+            conn = Client(self.address, family="AF_UNIX")
+            conn.send(None)
+            conn.close()
+            self.process.join(5)
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+# --- TAREAS (funciones de módulo: se envían al fork-server por referencia) ---
+
+def ping_task(agent):
+    """No hace nada: mide solo el coste de crear el worker."""
+    return agent.pyboy.frame_count
+
+
+def train_task(agent, epsilon, max_steps):
+    """
+    Entrena `max_steps` pasos sobre la Q-table del agente (la q_table del ForkServer).
+    ValueError si el ForkServer no tiene una SharedQTable: la tabla del hijo es
+    una copia copy-on-write y todo lo aprendido se perdería al salir.
+    """
+    if not isinstance(agent.q_table, SharedQTable):
+        raise ValueError("train_task necesita un ForkServer creado con q_table=SharedQTable(...): "
+                         "sin ella cada worker entrena una copia privada que se pierde al terminar")
+    agent.epsilon = epsilon
+    agent.epsilon_min = min(agent.epsilon_min, epsilon)
+    start = time.perf_counter()
+    agent.run(max_steps=max_steps)
+    return {
+        "steps": agent.total_steps,
+        "generations": agent.generation,
+        "best_distance": agent.best_distance,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def _cold_worker(rom_path, conn):
+    """Arranque en frío, como un worker normal: imports + ROM + intro."""
+    import main
+    agent = main.MarioAgent(rom_path, window="null", verbose=False)
+    agent.start_sequence()
+    conn.send(agent.pyboy.frame_count)
+    agent.pyboy.stop(save=False)
+
+
+def cold_start_latency(rom_path):
+    """Segundos hasta tener un worker listo con un proceso 'spawn' nuevo."""
+    ctx = mp.get_context("spawn")
+    recv, send = ctx.Pipe(duplex=False)
+    start = time.perf_counter()
+    p = ctx.Process(target=_cold_worker, args=(rom_path, send))
+    p.start()
+    recv.recv()
+    latency = time.perf_counter() - start
+    p.join()
+    return latency
+
+
+def main():
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else BENCH_WORKERS
+    rom_path = sys.argv[2] if len(sys.argv) > 2 else ROM_PATH
+    if not os.path.exists(rom_path):
+        print(f"❌ ROM no encontrada en {rom_path}")
+        sys.exit(1)
+
+    print("=" * 70)
+    print(f"FORK-SERVER - latencia de spawn ({n_workers} workers) vs arranque en frío")
+    print("=" * 70)
+
+    server = ForkServer(rom_path)
+    print(f"Plantilla lista en {server.start():.2f}s (una sola vez)")
+    handles = [server.spawn(ping_task, seed=i) for i in range(n_workers)]
+    for handle in handles:
+        handle.result()
+    server.close()
+    latencies = np.array([h.latency for h in handles]) * 1000
+
+    cold = np.array([cold_start_latency(rom_path) for _ in range(COLD_STARTS)]) * 1000
+
+    print(f"\nFork-server: mediana {np.median(latencies):.1f} ms | p95 {np.percentile(latencies, 95):.1f} ms | "
+          f"máx {latencies.max():.1f} ms")
+    print(f"En frío:     mediana {np.median(cold):.0f} ms ({COLD_STARTS} procesos spawn)")
+    print(f"⚡ {np.median(cold) / np.median(latencies):.0f}x más rápido por worker")
+
+
+if __name__ == "__main__":
+    main()
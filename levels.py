@@ -0,0 +1,278 @@
+"""
+Entrenamiento por niveles en paralelo con una biblioteca de save-states.
+
+El agente solo entrenaba en el 1-1: para practicar el 2-1 había que jugar
+(y superar) todo lo anterior. Aquí:
+
+- LevelLibrary guarda un save-state al inicio de cada nivel (levels/1-1.state,
+  levels/1-2.state...). Los propios agentes la van llenando: al arrancar
+  desde cero guardan el 1-1 y, cuando MarioAgent.check_level confirma el
+  paso al nivel siguiente (mundo/nivel válidos, distancia recorrida y el
+  cambio mantenido unos pasos), guardan el comienzo del nivel nuevo. Un
+  save-state que al cargarlo no está en su nivel se borra de la biblioteca.
+- Los workers (headless, uno por proceso) comparten una SharedQTable con un
+  rango de estados por nivel (MarioAgent level_aware) y cargan el save-state
+  del nivel que les toca como start_state: cada reset vuelve a ese nivel.
+- El planificador reparte tramos de CHUNK_STEPS pasos entre los niveles ya
+  descubiertos, con probabilidad proporcional a (1 - tasa de completado):
+  la CPU va a los niveles que peor se dan. MIN_WEIGHT evita abandonar del
+  todo los niveles ya dominados.
+
+USO:
+    python3 levels.py [--workers 4] [--steps 100000] [--chunk 2000]
+"""
+
+import os
+import sys
+import io
+import time
+import random
+import argparse
+import multiprocessing as mp
+
+from main import ROM_PATH, N_LEVELS, LEVELS_PER_WORLD, save_q_table
+from shared_qtable import SharedQTable, WORKER_EPSILONS, make_shared_agent, table_shape
+
+# --- CONFIGURACIÓN ---
+LEVEL_DIR = "levels"
+LEVELS_Q_TABLE_PATH = "q_table_levels.npz"
+CHUNK_STEPS = 2000      # Pasos de cada tramo asignado a un worker
+MIN_WEIGHT = 0.05       # Peso mínimo de un nivel con 100% de completado
+
+
+def level_name(level):
+    """Índice de nivel -> "mundo-nivel" (0 -> "1-1"; None -> "inicio", el arranque desde cero)."""
+    if level is None:
+        return "inicio"
+    return f"{level // LEVELS_PER_WORLD + 1}-{level % LEVELS_PER_WORLD + 1}"
+
+
+class LevelLibrary:
+    """Directorio con un save-state por nivel, compartido entre procesos."""
+
+    def __init__(self, path=LEVEL_DIR):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, level):
+        return os.path.join(self.path, f"{level_name(level)}.state")
+
+    def capture(self, pyboy, level):
+        """Guarda el estado actual como inicio de `level` si aún no existe."""
+        if os.path.exists(self._file(level)):
+            return False
+        buffer = io.BytesIO()
+        pyboy.save_state(buffer)
+        return self.store(level, buffer.getvalue())
+
+    def store(self, level, state):
+        """Guarda `state` (bytes de save_state) como inicio de `level` si aún no existe."""
+        path = self._file(level)
+        if os.path.exists(path):
+            return False
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(state)
+        os.replace(tmp, path)   # Atómico: otro worker nunca lee un estado a medias
+        return True
+
+    def discard(self, level):
+        """Borra el save-state de `level` (no es el nivel que dice ser)."""
+        try:
+            os.remove(self._file(level))
+        except FileNotFoundError:
+            pass
+
+    def levels(self):
+        """Índices de los niveles con save-state, ordenados."""
+        return [level for level in range(N_LEVELS) if os.path.exists(self._file(level))]
+
+    def load(self, level):
+        with open(self._file(level), "rb") as f:
+            return f.read()
+
+
+def level_weights(stats, available):
+    """Peso de cada nivel disponible: 1 - tasa de completado (1 si nunca se intentó)."""
+    weights = {}
+    for level in available:
+        attempts = stats[level]["attempts"]
+        rate = stats[level]["completions"] / attempts if attempts else 0.0
+        weights[level] = max(MIN_WEIGHT, 1.0 - rate)
+    return weights
+
+
+def pick_level(stats, library, rng):
+    """Siguiente nivel a entrenar (None = arrancar desde cero si la biblioteca está vacía)."""
+    available = library.levels()
+    if not available:
+        return None
+    weights = level_weights(stats, available)
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def level_worker(q_table, worker_id, epsilon, rom_path, library_path, agent_kwargs, tasks, results):
+    """Proceso worker: un emulador propio que entrena los niveles que le asignan."""
+    library = LevelLibrary(library_path)
+    agent = make_shared_agent(rom_path, q_table, level_aware=True, level_library=library, **agent_kwargs)
+    agent.worker_id = worker_id
+    agent.epsilon = epsilon
+    agent.epsilon_min = min(agent.epsilon_min, epsilon)
+    # Estado de encendido: los tramos de arranque vuelven aquí. Sin él, start_sequence
+    # pulsaría START sobre la partida del tramo anterior y la dejaría en pausa.
+    buffer = io.BytesIO()
+    agent.pyboy.save_state(buffer)
+    power_on = buffer.getvalue()
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        level, steps = task
+        agent.start_state = library.load(level) if level is not None else None
+        if level is None:
+            agent.pyboy.load_state(io.BytesIO(power_on))
+        agent.level_attempts = {}
+        agent.level_completions = {}
+        start = time.perf_counter()
+        if level is not None and not state_matches_level(agent, level):
+            library.discard(level)
+            results.put({"worker": worker_id, "level": level, "steps": 0, "elapsed": time.perf_counter() - start,
+                         "attempts": {}, "completions": {}, "best_distance": agent.best_distance, "discarded": True})
+            continue
+        agent.run(max_steps=steps)
+        # El tramo corta un episodio: registrarlo y no arrastrar su estado al siguiente nivel
+        agent.abandon_episode()
+        results.put({
+            "worker": worker_id,
+            "level": level,
+            "steps": agent.total_steps,
+            "elapsed": time.perf_counter() - start,
+            "attempts": agent.level_attempts,
+            "completions": agent.level_completions,
+            "best_distance": agent.best_distance,
+        })
+    agent.pyboy.stop(save=False)
+    q_table.close()
+
+
+def state_matches_level(agent, level):
+    """Carga el save-state del agente y comprueba que la RAM dice que es `level`."""
+    agent.pyboy.load_state(io.BytesIO(agent.start_state))
+    return agent.get_level() == level
+
+
+def train_levels(n_workers, total_steps, chunk_steps=CHUNK_STEPS, rom_path=ROM_PATH,
+                 library_path=LEVEL_DIR, agent_kwargs=None, seed=None, verbose=True):
+    """
+    Reparte `total_steps` pasos en tramos entre `n_workers` procesos,
+    priorizando los niveles con menor tasa de completado.
+
+    Devuelve (q_table, estadísticas_por_nivel); el llamador cierra la q_table.
+    """
+    rng = random.Random(seed)
+    library = LevelLibrary(library_path)
+    q_table = SharedQTable(*table_shape(level_aware=True, **(agent_kwargs or {})))
+    # None = arranque desde cero (título + 1-1 hasta tener el primer save-state)
+    stats = {level: {"attempts": 0, "completions": 0, "steps": 0} for level in [None, *range(N_LEVELS)]}
+
+    tasks, results = mp.Queue(), mp.Queue()
+    procs = []
+    for worker_id in range(n_workers):
+        epsilon = WORKER_EPSILONS[worker_id % len(WORKER_EPSILONS)]
+        args = (q_table, worker_id, epsilon, rom_path, library_path, agent_kwargs or {}, tasks, results)
+        p = mp.Process(target=level_worker, args=args)
+        p.start()
+        procs.append(p)
+
+    dispatched = in_flight = 0
+    bootstrapping = False
+    for _ in range(n_workers):
+        level = pick_level(stats, library, rng)
+        if level is None and bootstrapping:
+            break   # Un solo worker arranca desde cero; el resto espera a tener el 1-1
+        bootstrapping = bootstrapping or level is None
+        tasks.put((level, chunk_steps))
+        dispatched += chunk_steps
+        in_flight += 1
+
+    while in_flight:
+        result = results.get()
+        in_flight -= 1
+        for level, count in result["attempts"].items():
+            stats[level]["attempts"] += count
+        for level, count in result["completions"].items():
+            stats[level]["completions"] += count
+        stats[result["level"]]["steps"] += result["steps"]
+        if verbose:
+            if result.get("discarded"):
+                print(f"⚠️  Worker {result['worker']} | {level_name(result['level'])}.state no es ese nivel: borrado")
+            print(f"Worker {result['worker']} | Nivel {level_name(result['level'])} | {result['steps']} pasos en "
+                  f"{result['elapsed']:.1f}s | Niveles descubiertos: {', '.join(level_name(l) for l in library.levels())}")
+
+        # Reponer tramos: el que termina y, tras el arranque, los workers que esperaban
+        idle = n_workers - in_flight
+        while idle and dispatched < total_steps:
+            level = pick_level(stats, library, rng)
+            if level is None and in_flight:
+                break
+            tasks.put((level, chunk_steps))
+            dispatched += chunk_steps
+            in_flight += 1
+            idle -= 1
+
+    for _ in procs:
+        tasks.put(None)
+    for p in procs:
+        p.join()
+    return q_table, stats
+
+
+def print_level_stats(stats):
+    total = sum(s["steps"] for s in stats.values()) or 1
+    print("Nivel | Intentos | Completados | Tasa  | % CPU")
+    print("-" * 70)
+    for level, s in stats.items():
+        if not s["attempts"] and not s["steps"]:
+            continue
+        rate = s["completions"] / s["attempts"] if s["attempts"] else 0.0
+        print(f"{level_name(level):>5} | {s['attempts']:8d} | {s['completions']:11d} | {rate:5.0%} | {s['steps'] / total:5.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrenamiento por niveles en paralelo")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=100000, help="Pasos totales entre todos los workers")
+    parser.add_argument("--chunk", type=int, default=CHUNK_STEPS)
+    parser.add_argument("--rom", default=ROM_PATH)
+    parser.add_argument("--library", default=LEVEL_DIR)
+    parser.add_argument("--enemy-aware", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.rom):
+        print(f"❌ ROM no encontrada en {args.rom}")
+        sys.exit(1)
+
+    library = LevelLibrary(args.library)
+    print("=" * 70)
+    print(f"ENTRENAMIENTO POR NIVELES - {args.workers} workers, {args.steps} pasos en tramos de {args.chunk}")
+    print(f"Biblioteca: {args.library}/ ({', '.join(level_name(l) for l in library.levels()) or 'vacía'})")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    q_table, stats = train_levels(args.workers, args.steps, args.chunk, args.rom, args.library,
+                                  {"enemy_aware": args.enemy_aware}, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{'=' * 70}")
+    print(f"RESUMEN ({elapsed:.1f}s, {len(q_table)} estados visitados)")
+    print("=" * 70)
+    print_level_stats(stats)
+    save_q_table(q_table, LEVELS_Q_TABLE_PATH)
+    print(f"💾 Q-table guardada en {LEVELS_Q_TABLE_PATH}")
+    q_table.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+import io
 import sys
 import random
 import time
@@ -5,10 +6,14 @@ import numpy as np
 from pyboy import PyBoy
 from pyboy.utils import WindowEvent
 
+from action_macros import DEFAULT_MACROS
+
 # --- CONFIGURACIÓN ---
 ROM_PATH = "roms/super-mario-land.gb"
 EMULATION_SPEED = 0  # Velocidad máxima para aprendizaje
 WINDOW_TYPE = "SDL2" 
+Q_TABLE_PATH = "q_table.npz" # Snapshot de la Q-table al salir (ver evaluate.py)
+EVAL_EVERY = 50              # Generaciones entre evaluaciones greedy (si hay Evaluator)
 
 # --- DIRECCIONES DE MEMORIA (SUPER MARIO LAND) ---
 ADDR_SCROLL_X = 0xC0A1       # Posición de cámara
@@ -16,13 +21,72 @@ ADDR_SCROLL_PAGE = 0xC0A2    # Multiplicador de página para distancia total
 ADDR_STATUS = 0xFF99          # 00=Vivo, 01=Muriendo
 ADDR_LIVES = 0xDA15          # Vidas reales
 ADDR_SCORE_BCD = range(0xC0A0, 0xC0A3) # Marcador en formato BCD
+ADDR_PLAYER_X = 0xC202       # Posición X en pantalla (coordenadas OAM)
+ADDR_PLAYER_Y = 0xC201       # Posición Y en pantalla (coordenadas OAM)
+ADDR_WORLD = 0xC0A4          # Mundo actual
+ADDR_LEVEL = 0xC0A5          # Nivel actual
+
+# --- ESTADO CON ENEMIGOS (ver oam.py) ---
+ENEMY_RANGE = 80             # Enemigos más lejos que esto no cuentan
+ENEMY_BUCKET_WIDTH = 16
+ENEMY_BUCKETS = 1 + ENEMY_RANGE // ENEMY_BUCKET_WIDTH  # 0 = ningún enemigo cerca
+
+# --- ESTADO POR NIVEL (ver levels.py) ---
+MAX_WORLDS = 4
+LEVELS_PER_WORLD = 3
+N_LEVELS = MAX_WORLDS * LEVELS_PER_WORLD
+STATES_PER_LEVEL = ((256 * 256) // 10 + 1) * ENEMY_BUCKETS  # Rango de get_state() dentro de un nivel
+LEVEL_MIN_DISTANCE = 256     # Distancia mínima recorrida en un nivel antes de darlo por superado
+LEVEL_CONFIRM_STEPS = 10     # Pasos seguidos que el nivel nuevo debe mantenerse para contar
+
+def level_index(world, level):
+    """
+    Índice 0..N_LEVELS-1 del nivel a partir de ADDR_WORLD / ADDR_LEVEL (1-1 = 0),
+    o None si los valores no son un mundo/nivel válido (0xC0A4 también se ha
+    visto usado como flag de Game Over, ver dump_vram.py).
+    """
+    if not (1 <= world <= MAX_WORLDS and 1 <= level <= LEVELS_PER_WORLD):
+        return None
+    return (world - 1) * LEVELS_PER_WORLD + (level - 1)
+
+def save_q_table(q_table, path=Q_TABLE_PATH):
+    """Guarda la Q-table (dict o DenseQTable) como .npz con los estados y sus Q-values."""
+    items = q_table.to_dict() if hasattr(q_table, "to_dict") else q_table
+    states = np.array(list(items.keys()), dtype=np.int64)
+    values = np.array(list(items.values()), dtype=np.float64).reshape(len(states), -1)
+    np.savez(path, states=states, values=values)
+
+def load_q_table(path=Q_TABLE_PATH):
+    """Carga un snapshot de save_q_table como dict {estado: [q_values]}."""
+    data = np.load(path)
+    return {int(s): v.tolist() for s, v in zip(data["states"], data["values"])}
 
 class MarioAgent:
-    def __init__(self, rom_path):
-        print(f"--- INICIANDO MARIO PRO AGENT ---")
-        self.pyboy = PyBoy(rom_path, window=WINDOW_TYPE)
+    def __init__(self, rom_path, window=WINDOW_TYPE, q_table=None, verbose=True, episode_store=None,
+                 observe_pixels=False, enemy_aware=False, actions=None, evaluator=None,
+                 telemetry=None, planning_steps=0, lam=0.0, level_aware=False, start_state=None,
+                 level_library=None, emulator=None):
+        self.verbose = verbose
+        self.telemetry = telemetry # Fila de contadores en vivo (ver telemetry.py)
+        self.evaluator = evaluator # Evaluación greedy en paralelo (ver evaluate.py)
+        self.pending_eval = None
+        self.episode_store = episode_store # Historial de episodios (ver episode_store.py)
+        self.worker_id = 0
+        self.log(f"--- INICIANDO MARIO PRO AGENT ---")
+        # `emulator`: objeto ya creado con la interfaz de PyBoy (p. ej. SyntheticGame de bench_learning.py)
+        self.pyboy = emulator if emulator is not None else PyBoy(rom_path, window=window)
         self.pyboy.set_emulation_speed(EMULATION_SPEED)
         self.memory = self.pyboy.memory
+        # Pila de frames en gris para aprender de píxeles (ver screen_obs.py)
+        self.observation = None
+        if observe_pixels:
+            from screen_obs import ScreenObservation
+            self.observation = ScreenObservation(self.pyboy.screen.ndarray)
+        # Sprites de la OAM para incluir el enemigo más cercano en el estado
+        self.oam = None
+        if enemy_aware:
+            from oam import OAMReader
+            self.oam = OAMReader(self.pyboy)
         
         # Estado de la IA
         self.max_distance = 0
@@ -30,9 +94,22 @@ class MarioAgent:
         self.stuck_frames = 0
         self.last_x = 0
         self.previous_score = 0
+        self.best_distance = 0 # Record entre generaciones
+        self.episode_start_frame = 0
+        
+        # Niveles: estado por nivel, save-state de inicio y biblioteca de niveles (ver levels.py)
+        self.level_aware = level_aware
+        self.start_state = start_state      # bytes de save_state: cada reset vuelve aquí
+        self.level_library = level_library
+        self.current_level = None
+        self.level_attempts = {}            # nivel -> episodios empezados en él
+        self.level_completions = {}         # nivel -> veces que se pasó al siguiente
+        self.pending_level = None           # Cambio de nivel aún sin confirmar: (nivel, pasos, save-state)
+        self.level_max_x = 0                # Distancia máxima dentro del nivel actual
         
         # Q-Learning Parameters
-        self.q_table = {} # state: [q_values]
+        # state: [q_values]. Admite cualquier tabla con la misma interfaz (ver shared_qtable.py)
+        self.q_table = q_table if q_table is not None else {}
         self.epsilon = 1.0
         self.epsilon_min = 0.1
         self.epsilon_decay = 0.005
@@ -40,20 +117,54 @@ class MarioAgent:
         self.gamma = 0.9 # Discount Factor
         self.generation = 1
         
-        # Acciones: Solo las necesarias para ganar (sin 'Izquierda')
-        self.actions = [
-            [WindowEvent.PRESS_ARROW_RIGHT],
-            [WindowEvent.PRESS_ARROW_RIGHT, WindowEvent.PRESS_BUTTON_B], # Sprint
-            [WindowEvent.PRESS_ARROW_RIGHT, WindowEvent.PRESS_BUTTON_A], # Salto largo
-            [WindowEvent.PRESS_BUTTON_A],                                # Salto alto
-            [WindowEvent.PRESS_ARROW_RIGHT, WindowEvent.PRESS_BUTTON_A, WindowEvent.PRESS_BUTTON_B],
-            [] # Idle
-        ]
-        self.event_map = {getattr(WindowEvent, x): x for x in dir(WindowEvent) if x.startswith("PRESS_")}
+        # Dyna-Q: actualizaciones simuladas por cada paso real (ver dyna.py)
+        self.planning_steps = planning_steps
+        self.planner = None
+        if planning_steps > 0:
+            from dyna import PrioritizedSweeping
+            self.planner = PrioritizedSweeping(self.q_table, self.alpha, self.gamma)
+        # Watkins Q(λ): trazas de elegibilidad dispersas (ver traces.py)
+        self.traces = None
+        if lam > 0:
+            from traces import EligibilityTraces
+            self.traces = EligibilityTraces(lam, self.gamma)
+        
+        # Acciones: Solo las necesarias para ganar (sin 'Izquierda'), como macros
+        # de entrada precompiladas (ver action_macros.py; FINE_MACROS añade saltos cortos)
+        self.actions = list(actions) if actions is not None else list(DEFAULT_MACROS)
+
+    def log(self, message):
+        """Imprime solo en modo verbose (los workers headless van en silencio)."""
+        if self.verbose:
+            print(message)
 
     def get_state(self):
-        """Define el estado como la posición global discretizada."""
-        return self.get_global_x() // 10
+        """
+        Define el estado como la posición global discretizada.
+        Con enemy_aware se combina con la distancia al enemigo más cercano
+        (estado entero: posición * ENEMY_BUCKETS + bucket) y con level_aware
+        cada nivel usa su propio rango (+ nivel * STATES_PER_LEVEL).
+        """
+        state = self.get_global_x() // 10
+        if self.oam is not None:
+            state = state * ENEMY_BUCKETS + self.get_enemy_bucket()
+        if self.level_aware:
+            level = self.get_level()
+            if level is None:
+                level = self.current_level or 0   # Lectura no válida: se queda en el nivel conocido
+            state += level * STATES_PER_LEVEL
+        return state
+
+    def get_level(self):
+        """Índice del nivel actual (ver level_index), o None si la RAM no tiene un nivel válido."""
+        return level_index(self.memory[ADDR_WORLD], self.memory[ADDR_LEVEL])
+
+    def get_enemy_bucket(self):
+        """Distancia discretizada al enemigo más cercano por delante (0 = ninguno)."""
+        enemy = self.oam.nearest_enemy_ahead(self.memory[ADDR_PLAYER_X], self.memory[ADDR_PLAYER_Y])
+        if enemy is None or enemy[0] >= ENEMY_RANGE:
+            return 0
+        return 1 + enemy[0] // ENEMY_BUCKET_WIDTH
 
     def choose_action(self, state):
         """Estrategia Epsilon-Greedy."""
@@ -61,7 +172,10 @@ class MarioAgent:
             self.q_table[state] = [0.0] * len(self.actions)
 
         if random.random() < self.epsilon:
-            return random.randint(0, len(self.actions) - 1)
+            action = random.randint(0, len(self.actions) - 1)
+            if self.traces is not None and action != np.argmax(self.q_table[state]):
+                self.traces.clear()  # Corte de Watkins: acción exploratoria
+            return action
         else:
             return np.argmax(self.q_table[state])
 
@@ -75,6 +189,14 @@ class MarioAgent:
         old_value = self.q_table[state][action]
         next_max = np.max(self.q_table[next_state])
         
+        if self.traces is not None:
+            # Q(λ): el mismo error se reparte entre los pares recientes según su traza
+            delta = reward + self.gamma * next_max - old_value
+            self.traces.visit(state, action)
+            self.traces.apply(self.q_table, delta, self.alpha)
+            self.traces.decay()
+            return
+        
         # Q(s,a) = Q(s,a) + alpha * (reward + gamma * max(Q(s')) - Q(s,a))
         new_value = old_value + self.alpha * (reward + self.gamma * next_max - old_value)
         self.q_table[state][action] = new_value
@@ -92,16 +214,10 @@ class MarioAgent:
         return self.memory[ADDR_SCROLL_X] + (self.memory[ADDR_SCROLL_PAGE] * 256)
 
     def step(self, action_idx):
-        selected = self.actions[action_idx]
-        for key in selected: self.pyboy.send_input(key)
-        
-        for _ in range(12): self.pyboy.tick() # Avance físico
-            
-        for key in selected:
-            if key in self.event_map:
-                rel = getattr(WindowEvent, self.event_map[key].replace("PRESS", "RELEASE"))
-                self.pyboy.send_input(rel)
-        self.pyboy.tick()
+        # Avance físico: la macro entera (pulsar, mantener, soltar) en una sola llamada
+        self.actions[action_idx].run(self.pyboy)
+        if self.observation is not None:
+            self.observation.push()
 
         # --- SISTEMA DE RECOMPENSAS (Q-LEARNING) ---
         curr_x = self.get_global_x()
@@ -119,17 +235,19 @@ class MarioAgent:
         # Actualizar max distance para registro
         if curr_x > self.max_distance:
             self.max_distance = curr_x
+        if curr_x > self.best_distance:
+            self.best_distance = curr_x
 
         # 2. Recompensa por Puntos
         if curr_score > self.previous_score:
-            print(f"  [+] PUNTOS: {curr_score - self.previous_score}")
+            self.log(f"  [+] PUNTOS: {curr_score - self.previous_score}")
             reward += 50
             self.previous_score = curr_score
 
         # 3. Penalización por Muerte
         if is_dead:
             reward -= 500
-            print(f"  [💀] MUERTE DETECTADA")
+            self.log(f"  [💀] MUERTE DETECTADA")
             
         # 4. Penalización por Stuck (se maneja el reset fuera, pero aquí el reward)
         if self.stuck_frames > 100:
@@ -141,64 +259,163 @@ class MarioAgent:
         next_state = self.get_state()
         return next_state, reward, is_dead
 
-    def run(self):
+    def run(self, max_steps=None, max_frames=None):
+        """
+        Bucle de entrenamiento. Con max_steps se detiene tras ese número de pasos
+        y con max_frames al superar ese número de frames emulados.
+        """
         self.start_sequence()
         step = 0
+        self.total_steps = 0
+        self.episode_steps = 0
         
-        while True:
+        while (max_steps is None or self.total_steps < max_steps) and \
+                (max_frames is None or self.pyboy.frame_count < max_frames):
             state = self.get_state()
             action_idx = self.choose_action(state)
             
             next_state, reward, dead = self.step(action_idx)
+            self.episode_steps += 1
+            if self.current_level is not None:
+                self.check_level()
             
             self.update_q_table(state, action_idx, reward, next_state)
+            if self.planner is not None:
+                self.planner.observe(state, action_idx, reward, next_state)
+                self.planner.plan(self.planning_steps)
+            if self.telemetry is not None:
+                self.telemetry.record_step(self.pyboy.frame_count)
             
             if step % 30 == 0:
-                print(f"Gen: {self.generation} | Paso: {step} | Epsilon: {self.epsilon:.3f} | Dist: {self.last_x} | Reward: {self.total_reward:.1f}")
+                self.log(f"Gen: {self.generation} | Paso: {step} | Epsilon: {self.epsilon:.3f} | Dist: {self.last_x} | Reward: {self.total_reward:.1f}")
 
             # REINICIO: Si muere o se queda 100 pasos quieto
             if dead or self.stuck_frames > 100:
-                print(f"\n--- [RESET] Gen {self.generation} terminada. Record: {self.max_distance} ---")
+                self.log(f"\n--- [RESET] Gen {self.generation} terminada. Record: {self.max_distance} ---")
+                self.end_episode(dead, self.episode_steps)
                 self.reset_agent()
+                self.episode_steps = 0
                 step = 0
             step += 1
+            self.total_steps += 1
+
+    def check_level(self):
+        """
+        Cuenta el nivel superado y guarda el inicio del nuevo en la biblioteca.
+
+        Solo vale el paso al nivel SIGUIENTE, tras recorrer LEVEL_MIN_DISTANCE
+        en el actual, sin estar muriendo y manteniéndose LEVEL_CONFIRM_STEPS
+        pasos: cualquier otro cambio de ADDR_WORLD / ADDR_LEVEL se ignora. El
+        save-state se toma al detectar el cambio pero solo se escribe en la
+        biblioteca cuando se confirma.
+        """
+        level = self.get_level()
+        if level == self.current_level:
+            self.pending_level = None
+            self.level_max_x = max(self.level_max_x, self.get_global_x())
+            return
+        valid = (level is not None and level == self.current_level + 1
+                 and self.level_max_x >= LEVEL_MIN_DISTANCE and self.memory[ADDR_STATUS] == 0)
+        if not valid:
+            self.pending_level = None
+            return
+        if self.pending_level is None or self.pending_level[0] != level:
+            state = None
+            if self.level_library is not None:
+                buffer = io.BytesIO()
+                self.pyboy.save_state(buffer)
+                state = buffer.getvalue()
+            self.pending_level = (level, 1, state)
+            self.last_x = self.get_global_x()   # El scroll vuelve a 0: no es quedarse quieto
+            return
+        _, steps, state = self.pending_level
+        if steps + 1 < LEVEL_CONFIRM_STEPS:
+            self.pending_level = (level, steps + 1, state)
+            return
+
+        self.pending_level = None
+        self.level_completions[self.current_level] = self.level_completions.get(self.current_level, 0) + 1
+        self.log(f"  [🏁] NIVEL SUPERADO -> índice {level}")
+        self.current_level = level
+        self.level_max_x = 0
+        if self.level_library is not None:
+            self.level_library.store(level, state)
+
+    def end_episode(self, dead, steps):
+        """Registra la generación terminada y lanza/recoge evaluaciones sin bloquear."""
+        if self.telemetry is not None:
+            self.telemetry.record_episode(self.epsilon, len(self.q_table), self.best_distance, self.generation)
+        if self.evaluator is not None:
+            self.poll_evaluation()
+        if self.episode_store is None:
+            return
+        self.episode_store.append(
+            generation=self.generation,
+            worker=self.worker_id,
+            max_distance=self.max_distance,
+            total_reward=self.total_reward,
+            epsilon=self.epsilon,
+            dead=dead,
+            death_x=self.last_x if dead else -1,
+            frames=self.pyboy.frame_count - self.episode_start_frame,
+            steps=steps,
+        )
+
+    def poll_evaluation(self):
+        """Muestra el resultado de la evaluación pendiente si ya terminó y lanza la siguiente."""
+        if self.pending_eval is not None and self.pending_eval.ready():
+            summary = self.pending_eval.get()
+            self.log(f"  [EVAL] Dist media: {summary['mean_distance']:.0f} | Max: {summary['max_distance']} | "
+                     f"Completado: {summary['completion_rate']:.0%} | Frames hasta muerte: {summary['mean_frames_to_death']:.0f}")
+            self.pending_eval = None
+        if self.pending_eval is None and self.generation % EVAL_EVERY == 0:
+            self.pending_eval = self.evaluator.submit(self.q_table)
 
     def start_sequence(self):
-        """Pulsar Start para entrar al nivel 1-1."""
-        print("--- ESPERANDO LOGOS (3s) ---")
-        for _ in range(180): self.pyboy.tick()
-        
-        print("--- PULSANDO START ---")
-        self.pyboy.send_input(WindowEvent.PRESS_BUTTON_START)
-        for _ in range(10): self.pyboy.tick()
-        self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_START)
-        for _ in range(60): self.pyboy.tick()
+        """Pulsar Start para entrar al nivel 1-1 (o cargar start_state si hay)."""
+        if self.start_state is not None:
+            self.pyboy.load_state(io.BytesIO(self.start_state))
+            self.previous_score = self.get_score()
+            self.last_x = self.get_global_x()
+        else:
+            self.log("--- ESPERANDO LOGOS (3s) ---")
+            for _ in range(180): self.pyboy.tick()
+            
+            self.log("--- PULSANDO START ---")
+            self.pyboy.send_input(WindowEvent.PRESS_BUTTON_START)
+            for _ in range(10): self.pyboy.tick()
+            self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_START)
+            for _ in range(60): self.pyboy.tick()
+        self.episode_start_frame = self.pyboy.frame_count
+        if self.level_aware or self.level_library is not None:
+            self.current_level = self.get_level()
+            self.level_attempts[self.current_level] = self.level_attempts.get(self.current_level, 0) + 1
+            if self.level_library is not None and self.start_state is None and self.current_level == 0:
+                self.level_library.capture(self.pyboy, self.current_level)
+        if self.observation is not None:
+            self.observation.reset()
 
     def reset_agent(self):
-        """Reinicia el juego usando Soft Reset (A+B+Start+Select)."""
-        print("--- SOFT RESET (A+B+Start+Select) ---")
-        # Soft Reset: A + B + Start + Select
-        self.pyboy.send_input(WindowEvent.PRESS_BUTTON_A)
-        self.pyboy.send_input(WindowEvent.PRESS_BUTTON_B)
-        self.pyboy.send_input(WindowEvent.PRESS_BUTTON_SELECT)
-        self.pyboy.send_input(WindowEvent.PRESS_BUTTON_START)
-        
-        for _ in range(10): self.pyboy.tick()
-        
-        self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_A)
-        self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_B)
-        self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_SELECT)
-        self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_START)
+        """Reinicia el juego usando Soft Reset (A+B+Start+Select) o recargando start_state."""
+        if self.start_state is None:
+            self.log("--- SOFT RESET (A+B+Start+Select) ---")
+            # Soft Reset: A + B + Start + Select
+            self.pyboy.send_input(WindowEvent.PRESS_BUTTON_A)
+            self.pyboy.send_input(WindowEvent.PRESS_BUTTON_B)
+            self.pyboy.send_input(WindowEvent.PRESS_BUTTON_SELECT)
+            self.pyboy.send_input(WindowEvent.PRESS_BUTTON_START)
+            
+            for _ in range(10): self.pyboy.tick()
+            
+            self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_A)
+            self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_B)
+            self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_SELECT)
+            self.pyboy.send_input(WindowEvent.RELEASE_BUTTON_START)
+            
+            # Esperar a que reinicie
+            for _ in range(60): self.pyboy.tick()
         
-        # Esperar a que reinicie
-        for _ in range(60): self.pyboy.tick()
-        
-        # Reiniciar estado interno
-        self.max_distance = 0
-        self.total_reward = 0
-        self.stuck_frames = 0
-        self.last_x = 0
-        self.previous_score = 0
+        self.reset_episode_state()
         
         # Decaimiento de Epsilon y aumento de generación
         if self.epsilon > self.epsilon_min:
@@ -207,6 +424,64 @@ class MarioAgent:
         
         self.start_sequence()
 
+    def abandon_episode(self):
+        """
+        Cierra el episodio que run() dejó a medias (al agotar max_steps o
+        max_frames): lo registra sin muerte y deja el agente listo para otro run().
+        """
+        if self.episode_steps:
+            self.end_episode(False, self.episode_steps)
+            self.generation += 1
+        self.episode_steps = 0
+        self.reset_episode_state()
+
+    def reset_episode_state(self):
+        """Reiniciar estado interno del episodio."""
+        self.max_distance = 0
+        self.total_reward = 0
+        self.stuck_frames = 0
+        self.last_x = 0
+        self.previous_score = 0
+        self.pending_level = None
+        self.level_max_x = 0
+        if self.traces is not None:
+            self.traces.clear()
+
 if __name__ == "__main__":
-    agent = MarioAgent(ROM_PATH)
-    agent.run()
\ No newline at end of file
+    import os
+    import argparse
+    from episode_store import EpisodeStore
+    from telemetry import Telemetry
+    parser = argparse.ArgumentParser(description="Entrenamiento de Mario con Q-learning")
+    parser.add_argument("--eval-workers", type=int, default=0,
+                        help="Procesos del pool de evaluación greedy (0 = sin evaluación, ver evaluate.py)")
+    parser.add_argument("--telemetry-port", type=int, default=os.environ.get("MARIO_TELEMETRY_PORT"),
+                        help="Servir telemetría en 127.0.0.1:PUERTO (o MARIO_TELEMETRY_PORT; sin él, desactivada)")
+    args = parser.parse_args()
+
+    agent_kwargs = {}   # Configuración de estados/acciones: la misma para el agente y el evaluador
+    store = EpisodeStore()
+    evaluator = None
+    if args.eval_workers > 0:
+        from evaluate import Evaluator
+        evaluator = Evaluator(ROM_PATH, processes=args.eval_workers, agent_kwargs=agent_kwargs)
+    telemetry = None
+    if args.telemetry_port is not None:
+        telemetry = Telemetry()
+        address = telemetry.serve(port=int(args.telemetry_port))
+        if address is None:
+            telemetry.close()
+            telemetry = None
+        else:
+            print(f"--- TELEMETRÍA EN http://{address[0]}:{address[1]}/metrics ---")
+    agent = MarioAgent(ROM_PATH, episode_store=store, evaluator=evaluator,
+                       telemetry=telemetry.slot(0) if telemetry is not None else None, **agent_kwargs)
+    try:
+        agent.run()
+    finally:
+        save_q_table(agent.q_table)
+        if evaluator is not None:
+            evaluator.close()
+        if telemetry is not None:
+            telemetry.close()
+        store.close()
@@ -5,9 +5,10 @@ Ejecuta este script y JUEGA MANUALMENTE.
 Verás en tiempo real los valores de varias direcciones candidatas.
 """
 
-import time
 from pyboy import PyBoy
 
+from pacing import PacedEmulator, print_stats
+
 ROM_PATH = "roms/super-mario-land.gb"
 WINDOW_TYPE = "SDL2"
 
@@ -38,37 +39,40 @@ def main():
     print("   3. Anota la dirección correcta\n")
     
     pyboy = PyBoy(ROM_PATH, window=WINDOW_TYPE)
-    pyboy.set_emulation_speed(1)
+    paced = PacedEmulator(pyboy, speed=1)
     
     # Esperar inicio
-    for _ in range(300):
-        pyboy.tick()
+    paced.run(max_frames=300)
     
     previous_values = {addr: 0 for addr in CANDIDATES}
     
-    while True:
-        pyboy.tick()
+    def analyze(snapshot):
+        # Hilo propio con una copia de 9806-FFB4: el análisis no frena al juego
+        print(f"\n{'='*70}")
+        print(f"Frame: {snapshot.frame_count}")
+        print(f"Mira la pantalla - ¿Cuántas vidas ves? (MARIO×??)")
+        print(f"{'='*70}")
         
-        if pyboy.frame_count % 60 == 0:
-            print(f"\n{'='*70}")
-            print(f"Frame: {pyboy.frame_count}")
-            print(f"Mira la pantalla - ¿Cuántas vidas ves? (MARIO×??)")
-            print(f"{'='*70}")
+        for addr in CANDIDATES:
+            val = snapshot.memory[addr]
+            old = previous_values[addr]
             
-            for addr in CANDIDATES:
-                val = pyboy.memory[addr]
-                old = previous_values[addr]
-                
-                changed = " *** CAMBIÓ ***" if val != old else ""
-                
-                # Resaltar si el valor parece razonable para vidas (0-10)
-                marker = "  ⭐ CANDIDATO" if 0 <= val <= 10 else ""
-                
-                print(f"0x{addr:04X} = {val:3d} (0x{val:02X}) (era {old:3d}){changed}{marker}")
-                
-                previous_values[addr] = val
-        
-        time.sleep(0.001)
+            changed = " *** CAMBIÓ ***" if val != old else ""
+            
+            # Resaltar si el valor parece razonable para vidas (0-10)
+            marker = "  ⭐ CANDIDATO" if 0 <= val <= 10 else ""
+            
+            print(f"0x{addr:04X} = {val:3d} (0x{val:02X}) (era {old:3d}){changed}{marker}")
+            
+            previous_values[addr] = val
+    
+    paced.add_consumer(analyze, min(CANDIDATES), max(CANDIDATES) + 1, every=60)
+    try:
+        paced.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print_stats(paced.close())
 
 if __name__ == "__main__":
     main()
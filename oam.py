@@ -0,0 +1,99 @@
+"""
+Decodificador de la tabla de sprites por hardware (OAM, 0xFE00-0xFE9F).
+
+La OAM guarda los 40 objetos que el Game Boy dibuja en pantalla, 4 bytes
+cada uno: Y, X, tile y flags. En vez de vigilar a ojo rangos de WRAM como
+find_enemies.py, aquí se lee la OAM completa con UNA sola lectura por paso
+y se devuelve un array estructurado NumPy con los sprites activos.
+
+Las coordenadas son las de la OAM (pantalla + 8 en X, + 16 en Y). Mario las
+guarda así en WRAM (0xC201/0xC202), pero no todos los juegos: en Snow Bros
+0xC1A0/0xC1A2 van en otro espacio, así que allí la posición del jugador se
+saca de sus propios sprites con player_position().
+
+USO (desde un agente o un script de diagnóstico):
+    oam = OAMReader(pyboy)
+    sprites = oam.sprites()                           # x, y, tile, flags, slot
+    enemy = oam.nearest_enemy_ahead(mario_x, mario_y) # (dx, dy) o None
+"""
+
+import numpy as np
+
+# --- DIRECCIONES / CONSTANTES ---
+OAM_START = 0xFE00
+OAM_END = 0xFEA0
+OAM_ENTRIES = 40
+MARIO_BOX = 16        # Sprites a menos de esto del jugador se consideran parte de él
+
+OAM_RAW_DTYPE = np.dtype([("y", np.uint8), ("x", np.uint8), ("tile", np.uint8), ("flags", np.uint8)])
+
+SPRITE_DTYPE = np.dtype([
+    ("x", np.int16),
+    ("y", np.int16),
+    ("tile", np.uint8),
+    ("flags", np.uint8),
+    ("slot", np.uint8),
+])
+
+
+def decode_oam(raw):
+    """Convierte los 160 bytes de la OAM en un array SPRITE_DTYPE de sprites visibles."""
+    entries = np.asarray(raw, dtype=np.uint8).view(OAM_RAW_DTYPE)
+    # Un sprite está fuera de pantalla con Y en {0, >=160} o X en {0, >=168}
+    visible = (entries["y"] > 0) & (entries["y"] < 160) & (entries["x"] > 0) & (entries["x"] < 168)
+    slots = np.flatnonzero(visible)
+
+    sprites = np.empty(len(slots), dtype=SPRITE_DTYPE)
+    sprites["x"] = entries["x"][slots]
+    sprites["y"] = entries["y"][slots]
+    sprites["tile"] = entries["tile"][slots]
+    sprites["flags"] = entries["flags"][slots]
+    sprites["slot"] = slots
+    return sprites
+
+
+class OAMReader:
+    """Lee y decodifica la OAM como mucho una vez por frame emulado."""
+
+    def __init__(self, pyboy):
+        self.pyboy = pyboy
+        self.frame = -1
+        self.cached_sprites = None
+        self.cached_queries = {}
+
+    def sprites(self):
+        """Sprites visibles del frame actual (cacheado por frame)."""
+        frame = self.pyboy.frame_count
+        if frame != self.frame:
+            self.frame = frame
+            self.cached_sprites = decode_oam(self.pyboy.memory[OAM_START:OAM_END])
+            self.cached_queries = {}
+        return self.cached_sprites
+
+    def player_position(self, slots):
+        """(x, y) de la esquina superior izquierda de los sprites `slots` del jugador, o None."""
+        sprites = self.sprites()
+        mine = sprites[np.isin(sprites["slot"], slots)]
+        if len(mine) == 0:
+            return None
+        return int(mine["x"].min()), int(mine["y"].min())
+
+    def others(self, player_x, player_y):
+        """Sprites que no pertenecen al jugador (fuera de su caja de MARIO_BOX píxeles)."""
+        sprites = self.sprites()
+        far = (np.abs(sprites["x"] - player_x) >= MARIO_BOX) | (np.abs(sprites["y"] - player_y) >= MARIO_BOX)
+        return sprites[far]
+
+    def nearest_enemy_ahead(self, player_x, player_y):
+        """(dx, dy) del sprite más cercano a la derecha del jugador, o None."""
+        self.sprites()   # Invalida la caché de consultas si cambió el frame
+        key = ("ahead", player_x, player_y)
+        if key not in self.cached_queries:
+            others = self.others(player_x, player_y)
+            ahead = others[others["x"] > player_x]
+            if len(ahead) == 0:
+                self.cached_queries[key] = None
+            else:
+                i = np.argmin(ahead["x"])
+                self.cached_queries[key] = (int(ahead["x"][i]) - player_x, int(ahead["y"][i]) - player_y)
+        return self.cached_queries[key]
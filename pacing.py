@@ -0,0 +1,304 @@
+"""
+Emulación a ritmo fijo desacoplada del análisis.
+
+Los scripts de diagnóstico hacían `pyboy.tick()`, el análisis en línea y un
+`time.sleep(0.001)` bajo `set_emulation_speed(1)`: el coste del análisis y
+el sleep se sumaban a cada frame y el juego iba a tirones o perdía frames.
+
+Con PacedEmulator:
+
+- El bucle de emulación (run) marca el ritmo con plazos absolutos sobre
+  perf_counter: tiempo real exacto (speed=1, 59.73 fps del Game Boy), un
+  múltiplo, o sin límite (speed=0). No acumula deriva; si se queda atrás lo
+  cuenta como frame tardío y se resincroniza.
+- En cada frame: llama a los hooks y, para cada consumidor al que le toque
+  ese frame, copia la región de memoria que pidió a un Snapshot y lo mete en
+  su cola acotada. Los hooks corren EN el bucle de emulación porque
+  necesitan el emulador (p. ej. rewind.capture hace un save_state de 20-40 ms
+  cada 30 frames): NO son baratos, su coste cuenta contra el plazo del
+  frame y aparece como frames tardíos y en `hook_time`. Tras un hook lento
+  los frames siguientes van sin sleep hasta recuperar el plazo, así que el
+  tiempo de juego medio sigue siendo exacto.
+- Cada consumidor corre en su propio hilo y lee Snapshots de su cola. Si
+  su función lanza una excepción se registra (traceback la primera vez) y
+  se cuenta en `errors`, y el consumidor sigue vaciando la cola: un fallo
+  del análisis nunca deja al emulador esperando con la política "block". Con
+  la cola llena se aplica su política: "drop_oldest" (se descarta el más
+  viejo, el análisis ve siempre lo más reciente), "drop_newest" (se
+  descarta el nuevo) o "block" (contrapresión: el emulador espera; solo
+  tiene sentido sin ventana, cuando no se puede perder ningún frame).
+
+Un Snapshot tiene `frame_count` y `memory[...]` como PyBoy, así que una
+función de análisis escrita contra el snapshot sirve también contra el
+emulador (p. ej. para inspect_console de rewind.py).
+
+run() se llama desde el hilo principal: SDL2 quiere su ventana en el hilo
+que la creó, y Ctrl+C llega como KeyboardInterrupt para poder rebobinar y
+volver a llamar a run(). Para modo headless, start() lo lanza en un hilo.
+
+USO:
+    paced = PacedEmulator(pyboy, speed=1)
+    paced.add_consumer(analizar, 0xC000, 0xC100, every=30)
+    paced.run()
+"""
+
+import sys
+import time
+import threading
+import traceback
+from collections import deque
+
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+GB_FPS = 4194304 / 70224   # 59.7275 frames por segundo
+MAX_LAG = 0.25             # Segundos de retraso tras los que se deja de intentar recuperar
+QUEUE_SIZE = 8
+POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class MemoryRegion:
+    """Copia de un rango de memoria indexable con direcciones absolutas."""
+
+    def __init__(self, start, data):
+        self.start = start
+        self.data = data
+
+    def __getitem__(self, addr):
+        if isinstance(addr, slice):
+            return self.data[addr.start - self.start:addr.stop - self.start].tolist()
+        if not self.start <= addr < self.start + len(self.data):
+            raise IndexError(f"0x{addr:04X} fuera de la región capturada")
+        return int(self.data[addr - self.start])
+
+
+class Snapshot:
+    """Estado de un frame entregado a un consumidor."""
+
+    def __init__(self, frame_count, memory, timestamp):
+        self.frame_count = frame_count
+        self.memory = memory
+        self.timestamp = timestamp
+
+
+class FrameQueue:
+    """Cola acotada con política de descarte o contrapresión."""
+
+    def __init__(self, maxsize=QUEUE_SIZE, policy="drop_oldest"):
+        if policy not in POLICIES:
+            raise ValueError(f"Política desconocida: {policy} (usa {', '.join(POLICIES)})")
+        self.items = deque()
+        self.maxsize = maxsize
+        self.policy = policy
+        self.condition = threading.Condition()
+        self.dropped = 0
+        self.high_water = 0
+        self.closed = False
+
+    def put(self, item):
+        with self.condition:
+            if len(self.items) >= self.maxsize:
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    return
+                if self.policy == "drop_oldest":
+                    self.items.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self.items) >= self.maxsize and not self.closed:
+                        self.condition.wait()
+            self.items.append(item)
+            self.high_water = max(self.high_water, len(self.items))
+            self.condition.notify_all()
+
+    def get(self):
+        """Siguiente elemento, o None si la cola está cerrada y vacía."""
+        with self.condition:
+            while not self.items and not self.closed:
+                self.condition.wait()
+            if not self.items:
+                return None
+            item = self.items.popleft()
+            self.condition.notify_all()
+            return item
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class Consumer:
+    """Hilo de análisis: llama a fn(snapshot) con cada Snapshot de su cola."""
+
+    def __init__(self, fn, start, stop, every=1, maxsize=QUEUE_SIZE, policy="drop_oldest"):
+        self.fn = fn
+        self.start = start
+        self.stop = stop
+        self.every = every
+        self.queue = FrameQueue(maxsize, policy)
+        self.processed = 0
+        self.errors = 0
+        self.busy = 0.0          # Segundos dentro de fn
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+
+    def _loop(self):
+        while True:
+            snapshot = self.queue.get()
+            if snapshot is None:
+                return
+            start = time.perf_counter()
+            try:
+                self.fn(snapshot)
+            except Exception as error:
+                self.errors += 1
+                if self.errors == 1:
+                    traceback.print_exc()
+                print(f"⚠️  Consumidor {getattr(self.fn, '__name__', self.fn)} falló en el frame "
+                      f"{snapshot.frame_count}: {error!r} ({self.errors} errores)", file=sys.stderr)
+            self.busy += time.perf_counter() - start
+            self.processed += 1
+
+
+class PacedEmulator:
+    """Bucle de emulación a ritmo fijo que reparte Snapshots a consumidores."""
+
+    def __init__(self, pyboy, speed=1, render=True):
+        self.pyboy = pyboy
+        self.speed = speed
+        self.render = render
+        self.consumers = []
+        self.hooks = []
+        self.frames = 0
+        self.late_frames = 0
+        self.hook_time = 0.0     # Segundos dentro de los hooks (cuentan contra el plazo)
+        self.stop_event = threading.Event()
+        self.thread = None
+        pyboy.set_emulation_speed(0)   # El ritmo lo marca este bucle, no PyBoy
+
+    def add_hook(self, fn):
+        """
+        fn() se llama en el bucle de emulación tras cada frame. Su coste se
+        suma al frame: lo que no necesite el emulador debe ser un consumidor.
+        """
+        self.hooks.append(fn)
+
+    def add_consumer(self, fn, start, stop, every=1, maxsize=QUEUE_SIZE, policy="drop_oldest"):
+        """
+        fn(snapshot) se llama en un hilo propio con la memoria [start, stop)
+        de cada frame múltiplo de `every`.
+        """
+        consumer = Consumer(fn, start, stop, every, maxsize, policy)
+        consumer.thread.start()
+        self.consumers.append(consumer)
+        return consumer
+
+    def run(self, max_frames=None):
+        """
+        Emula hasta stop(), hasta cerrar la ventana o durante `max_frames`.
+        Se puede volver a llamar después de un KeyboardInterrupt.
+        """
+        pyboy = self.pyboy
+        period = 1.0 / (GB_FPS * self.speed) if self.speed else 0.0
+        deadline = time.perf_counter()
+        end = None if max_frames is None else self.frames + max_frames
+        self.stop_event.clear()
+
+        while not self.stop_event.is_set() and (end is None or self.frames < end):
+            if not pyboy.tick(1, self.render):
+                break
+            self.frames += 1
+            if self.hooks:
+                start = time.perf_counter()
+                for hook in self.hooks:
+                    hook()
+                self.hook_time += time.perf_counter() - start
+
+            frame = pyboy.frame_count
+            for consumer in self.consumers:
+                if frame % consumer.every == 0:
+                    data = np.array(pyboy.memory[consumer.start:consumer.stop], dtype=np.uint8)
+                    consumer.queue.put(Snapshot(frame, MemoryRegion(consumer.start, data), time.perf_counter()))
+
+            if period:
+                deadline += period
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                elif delay < 0:
+                    self.late_frames += 1
+                    if delay < -MAX_LAG:
+                        deadline = time.perf_counter()   # Resincronizar en vez de acelerar
+
+    def start(self, max_frames=None):
+        """run() en un hilo de fondo (solo sin ventana)."""
+        self.thread = threading.Thread(target=self.run, args=(max_frames,), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def close(self):
+        """Para la emulación, deja terminar a los consumidores y devuelve las estadísticas."""
+        self.stop()
+        for consumer in self.consumers:
+            consumer.queue.close()
+            consumer.thread.join()
+        return self.stats()
+
+    def stats(self):
+        return {
+            "frames": self.frames,
+            "late_frames": self.late_frames,
+            "hook_time": self.hook_time,
+            "consumers": [{
+                "every": c.every,
+                "policy": c.queue.policy,
+                "processed": c.processed,
+                "errors": c.errors,
+                "dropped": c.queue.dropped,
+                "high_water": c.queue.high_water,
+                "busy": c.busy,
+            } for c in self.consumers],
+        }
+
+
+def print_stats(stats):
+    """Resumen de frames tardíos y descartes al cerrar un script."""
+    print(f"\n⏱️  Frames: {stats['frames']} | Tardíos: {stats['late_frames']} | "
+          f"Hooks: {stats['hook_time']:.1f}s")
+    for i, c in enumerate(stats["consumers"]):
+        errors = f", ❌ {c['errors']} errores" if c["errors"] else ""
+        print(f"   Consumidor {i} (cada {c['every']}, {c['policy']}): {c['processed']} analizados, "
+              f"{c['dropped']} descartados, cola máx {c['high_water']}, {c['busy']:.1f}s de análisis{errors}")
+
+
+def main():
+    """Demo sin ventana: un análisis lento no frena la emulación en tiempo real."""
+    from pyboy import PyBoy
+
+    rom_path = sys.argv[1] if len(sys.argv) > 1 else "roms/super-mario-land.gb"
+    seconds = 3
+    pyboy = PyBoy(rom_path, window="null")
+
+    def slow_analysis(snapshot):
+        time.sleep(0.05)   # Análisis de 50 ms: 3 frames de retraso si fuera en línea
+
+    print("=" * 70)
+    print(f"PACING - {seconds}s en tiempo real con un consumidor de 50 ms por frame")
+    print("=" * 70)
+    paced = PacedEmulator(pyboy, speed=1, render=False)
+    paced.add_consumer(slow_analysis, 0xC000, 0xE000)
+    start = time.perf_counter()
+    paced.run(max_frames=int(GB_FPS * seconds))
+    elapsed = time.perf_counter() - start
+    stats = paced.close()
+    pyboy.stop(save=False)
+    print(f"{stats['frames']} frames en {elapsed:.2f}s ({stats['frames'] / elapsed:.2f} fps, objetivo {GB_FPS:.2f})")
+    print_stats(stats)
+
+
+if __name__ == "__main__":
+    main()
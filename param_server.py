@@ -0,0 +1,486 @@
+"""
+Servidor de parámetros para entrenar con workers en varias máquinas.
+
+Cuando una máquina se satura con shared_qtable.py, los workers MarioAgent de
+otras máquinas no pueden compartir memoria: cada uno entrena sobre una
+DenseQTable local y, cada SYNC_INTERVAL segundos, se sincroniza por TCP con
+un servidor que tiene la tabla maestra:
+
+1. PUSH: el worker envía solo las entradas que cambiaron desde la última
+   sincronización, como deltas (Q_local - Q_base). El servidor las SUMA a la
+   tabla maestra, así que las contribuciones de varios workers se combinan.
+2. PULL: el worker pide las filas que cambiaron desde la versión que ya
+   tiene y las sobreescribe en su tabla local (conservando lo que él mismo
+   no haya enviado todavía).
+
+Formato binario compacto: cabecera con struct (little-endian) y después los
+índices planos (estado * N_ACTIONS + acción) como uint32 seguidos de los
+valores como float32, 8 bytes por Q-value.
+
+Al conectar, el worker envía HELLO con la forma de su tabla (estados x
+acciones); si no coincide con la del servidor la conexión se rechaza con
+ValueError. El servidor también rechaza (REPLY_ERROR) los PUSH con índices
+fuera de la tabla, longitudes distintas o valores no finitos: un cliente
+mal configurado no puede corromper la tabla maestra de todos.
+
+Staleness: cada PUSH aceptado incrementa la versión del servidor. Si la
+versión del último PULL del worker tiene más de MAX_STALENESS versiones de
+retraso, el PUSH se rechaza con STALE; el worker hace PULL y lo reenvía.
+
+USO:
+    python3 param_server.py server [--host 0.0.0.0] [--port 9470]
+    python3 param_server.py worker --host 192.168.1.10 --workers 4 --steps 5000
+    python3 param_server.py bench [--workers 8] [--seconds 3]   # local, 127.0.0.1
+"""
+
+import os
+import time
+import random
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+import multiprocessing as mp
+
+import numpy as np
+
+from shared_qtable import DenseQTable, N_STATES, N_ACTIONS, ROM_PATH, WORKER_EPSILONS, table_shape
+
+# --- CONFIGURACIÓN ---
+HOST = "127.0.0.1"
+PORT = 9470
+SYNC_INTERVAL = 0.5      # Segundos entre sincronizaciones de cada worker
+MAX_STALENESS = 32       # PUSH aceptados de otros workers que se toleran sin PULL
+BENCH_SECONDS = 3.0
+LEARNING_STEPS = 3000
+ALPHA = 0.2
+GAMMA = 0.9
+
+# Protocolo: 1 byte de operación + cabecera fija + entradas
+OP_HELLO = b"H"
+OP_PUSH = b"P"
+OP_PULL = b"G"
+REPLY_OK = b"K"
+REPLY_STALE = b"S"
+REPLY_ERROR = b"E"
+HELLO = struct.Struct("<II")           # forma de la tabla: estados, acciones
+PUSH_HEADER = struct.Struct("<QI")     # versión base del worker, número de entradas
+PULL_HEADER = struct.Struct("<Q")      # versión desde la que se piden cambios
+VERSION = struct.Struct("<Q")
+PULL_REPLY = struct.Struct("<QI")      # versión del servidor, número de entradas
+ENTRY_BYTES = 8                        # uint32 índice + float32 valor
+
+
+def encode_entries(indices, values):
+    return indices.astype("<u4").tobytes() + values.astype("<f4").tobytes()
+
+
+def decode_entries(data, n):
+    indices = np.frombuffer(data, dtype="<u4", count=n)
+    values = np.frombuffer(data, dtype="<f4", count=n, offset=4 * n)
+    return indices, values
+
+
+def recv_exact(sock, n):
+    """Lee exactamente n bytes (b"" si el otro extremo cerró al empezar)."""
+    chunks = []
+    while n:
+        chunk = sock.recv(n)
+        if not chunk:
+            if chunks:
+                raise ConnectionError("Conexión cerrada a mitad de mensaje")
+            return b""
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+class ParameterServer:
+    """Tabla maestra con versión por fila, servida por TCP (un hilo por conexión)."""
+
+    def __init__(self, n_states=N_STATES, n_actions=N_ACTIONS, max_staleness=MAX_STALENESS):
+        self.table = DenseQTable(n_states, n_actions)
+        self.n_actions = n_actions
+        self.row_version = np.zeros(n_states, dtype=np.uint64)
+        self.version = 0
+        self.max_staleness = max_staleness
+        self.lock = threading.Lock()
+        self.server = None
+        self.stats = {"pushes": 0, "stale": 0, "rejected": 0, "pulls": 0, "entries": 0,
+                      "bytes_in": 0, "bytes_out": 0}
+
+    def push(self, base_version, indices, deltas):
+        """
+        Suma deltas a la tabla maestra. Devuelve (aceptado, versión actual).
+        ValueError (y la tabla sin tocar) si la entrada no es válida.
+        """
+        indices, deltas = np.asarray(indices), np.asarray(deltas)
+        size = self.table.array.size
+        error = None
+        if len(indices) != len(deltas):
+            error = f"{len(indices)} índices y {len(deltas)} deltas"
+        elif len(indices) and (indices.min() < 0 or indices.max() >= size):
+            error = f"índices fuera de la tabla (0..{size - 1})"
+        elif not np.isfinite(deltas).all():
+            error = "deltas no finitos"
+        if error is not None:
+            with self.lock:
+                self.stats["rejected"] += 1
+            raise ValueError(f"PUSH rechazado: {error}")
+        with self.lock:
+            if self.version - base_version > self.max_staleness:
+                self.stats["stale"] += 1
+                return False, self.version
+            self.version += 1
+            flat = self.table.array.reshape(-1)
+            np.add.at(flat, indices.astype(np.int64), deltas)
+            self.row_version[indices // self.n_actions] = self.version
+            self.stats["pushes"] += 1
+            self.stats["entries"] += len(indices)
+            return True, self.version
+
+    def pull(self, since):
+        """Filas modificadas después de `since`: (versión, índices planos, valores)."""
+        with self.lock:
+            rows = np.flatnonzero(self.row_version > since)
+            indices = (rows[:, None] * self.n_actions + np.arange(self.n_actions)).reshape(-1)
+            values = self.table.array[rows].reshape(-1).astype(np.float32)
+            self.stats["pulls"] += 1
+            return self.version, indices, values
+
+    def serve(self, host=HOST, port=PORT):
+        """Arranca el servidor TCP en un hilo de fondo y devuelve (host, puerto)."""
+        params = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                sock = self.request
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                try:
+                    self.serve_client(sock)
+                except ConnectionError:
+                    pass   # El cliente cerró a mitad de mensaje
+
+            def serve_client(self, sock):
+                shape = params.table.array.shape
+                op = recv_exact(sock, 1)
+                if op != OP_HELLO:
+                    return   # Sin HELLO no se sabe si la tabla del cliente es compatible
+                client_shape = HELLO.unpack(recv_exact(sock, HELLO.size))
+                sock.sendall((REPLY_OK if client_shape == shape else REPLY_ERROR) + HELLO.pack(*shape))
+                if client_shape != shape:
+                    return
+                while True:
+                    op = recv_exact(sock, 1)
+                    if not op:
+                        return
+                    if op == OP_PUSH:
+                        base_version, n = PUSH_HEADER.unpack(recv_exact(sock, PUSH_HEADER.size))
+                        indices, deltas = decode_entries(recv_exact(sock, n * ENTRY_BYTES), n)
+                        try:
+                            accepted, version = params.push(base_version, indices, deltas)
+                            reply = REPLY_OK if accepted else REPLY_STALE
+                        except ValueError:
+                            reply, version = REPLY_ERROR, params.version
+                        sock.sendall(reply + VERSION.pack(version))
+                        with params.lock:
+                            params.stats["bytes_in"] += 1 + PUSH_HEADER.size + n * ENTRY_BYTES
+                    elif op == OP_PULL:
+                        (since,) = PULL_HEADER.unpack(recv_exact(sock, PULL_HEADER.size))
+                        version, indices, values = params.pull(since)
+                        reply = PULL_REPLY.pack(version, len(indices)) + encode_entries(indices, values)
+                        sock.sendall(reply)
+                        with params.lock:
+                            params.stats["bytes_out"] += len(reply)
+                    else:
+                        return  # Operación desconocida: se cierra la conexión
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self.server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server.server_address
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+
+class ParameterClient:
+    """Tabla local de un worker que se sincroniza con el servidor cada `interval`."""
+
+    def __init__(self, host=HOST, port=PORT, n_states=N_STATES, n_actions=N_ACTIONS, interval=SYNC_INTERVAL):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.sock.sendall(OP_HELLO + HELLO.pack(n_states, n_actions))
+        reply = recv_exact(self.sock, 1 + HELLO.size)
+        if reply[:1] != REPLY_OK:
+            self.sock.close()
+            server_shape = HELLO.unpack(reply[1:]) if len(reply) == 1 + HELLO.size else None
+            raise ValueError(f"La tabla del servidor es {server_shape} y la del worker {(n_states, n_actions)} "
+                             f"(estados, acciones): usa la misma configuración de agente en ambos")
+        self.table = DenseQTable(n_states, n_actions)
+        # Valores que el servidor ya conoce, con la precisión del protocolo (float32):
+        # en float64 el redondeo de cada delta dejaría restos que se reenviarían siempre
+        self.base = self.table.array.astype(np.float32)
+        self.version = 0                       # Versión del último PULL
+        self.interval = interval
+        self.next_sync = time.perf_counter() + interval
+        self.stats = {"pushes": 0, "stale": 0, "pulls": 0, "bytes_out": 0, "bytes_in": 0}
+
+    def maybe_sync(self):
+        """Llamar desde el bucle de entrenamiento: sincroniza si ha pasado el intervalo."""
+        if time.perf_counter() >= self.next_sync:
+            self.sync()
+
+    def sync(self):
+        """PUSH de los cambios locales (reintentando tras STALE) y PULL de los ajenos."""
+        local = self.table.array.reshape(-1)
+        base = self.base.reshape(-1)
+        changed = np.flatnonzero(local.astype(np.float32) != base)
+        if len(changed):
+            sent = local[changed].astype(np.float32)
+            while not self._push(changed, sent - base[changed]):
+                self._pull()
+                sent = local[changed].astype(np.float32)   # El PULL movió local y base
+            base[changed] = sent
+        self._pull()
+        self.next_sync = time.perf_counter() + self.interval
+
+    def _push(self, indices, deltas):
+        message = OP_PUSH + PUSH_HEADER.pack(self.version, len(indices)) + encode_entries(indices, deltas)
+        self.sock.sendall(message)
+        self.stats["bytes_out"] += len(message)
+        reply = recv_exact(self.sock, 1 + VERSION.size)
+        if reply[:1] == REPLY_ERROR:
+            raise ValueError("El servidor rechazó el PUSH (índices o valores no válidos)")
+        if reply[:1] == REPLY_STALE:
+            self.stats["stale"] += 1
+            return False
+        self.stats["pushes"] += 1
+        return True
+
+    def _pull(self):
+        self.sock.sendall(OP_PULL + PULL_HEADER.pack(self.version))
+        version, n = PULL_REPLY.unpack(recv_exact(self.sock, PULL_REPLY.size))
+        data = recv_exact(self.sock, n * ENTRY_BYTES)
+        self.stats["pulls"] += 1
+        self.stats["bytes_in"] += PULL_REPLY.size + len(data)
+        if n:
+            indices, values = decode_entries(data, n)
+            indices = indices.astype(np.int64)
+            local = self.table.array.reshape(-1)
+            base = self.base.reshape(-1)
+            pending = local[indices] - base[indices]     # Cambios propios aún sin enviar
+            base[indices] = values
+            local[indices] = values + pending
+        self.version = version
+
+    def close(self):
+        self.sock.close()
+
+
+def make_remote_agent(rom_path, client, **kwargs):
+    """
+    Crea un MarioAgent headless que entrena sobre la tabla de `client` y la sincroniza.
+    ValueError si la tabla no tiene sitio para los estados/acciones del agente.
+    """
+    from main import MarioAgent
+
+    n_states, n_actions = table_shape(**kwargs)
+    shape = client.table.array.shape
+    if shape[0] < n_states or shape[1] != n_actions:
+        raise ValueError(f"La tabla del cliente es de {shape[0]}x{shape[1]} y el agente necesita "
+                         f"{n_states}x{n_actions} (estados x acciones): crea el ParameterClient y el "
+                         f"ParameterServer con table_shape(**agent_kwargs)")
+
+    class RemoteMarioAgent(MarioAgent):
+        def update_q_table(self, state, action, reward, next_state):
+            super().update_q_table(state, action, reward, next_state)
+            client.maybe_sync()
+
+    kwargs.setdefault("window", "null")
+    kwargs.setdefault("verbose", False)
+    return RemoteMarioAgent(rom_path, q_table=client.table, **kwargs)
+
+
+def remote_worker_main(host, port, worker_id, epsilon, max_steps, rom_path, results):
+    """Proceso worker: emulador propio, tabla local sincronizada con el servidor."""
+    client = ParameterClient(host, port)
+    client.sync()
+    agent = make_remote_agent(rom_path, client)
+    agent.worker_id = worker_id
+    agent.epsilon = epsilon
+    agent.epsilon_min = min(agent.epsilon_min, epsilon)
+
+    start = time.perf_counter()
+    agent.run(max_steps=max_steps)
+    client.sync()
+    elapsed = time.perf_counter() - start
+
+    results.put({
+        "worker": worker_id,
+        "epsilon": epsilon,
+        "updates": agent.total_steps,
+        "best_distance": agent.best_distance,
+        "elapsed": elapsed,
+        **client.stats,
+    })
+    agent.pyboy.stop(save=False)
+    client.close()
+
+
+def synthetic_worker_main(host, port, worker_id, seconds, results):
+    """Actualizaciones de Bellman sintéticas (sin emulador) sobre la tabla local."""
+    client = ParameterClient(host, port)
+    client.sync()
+    q_table = client.table
+    rng = random.Random(worker_id)
+    # Cada worker recorre su propia zona del nivel, con solape con los vecinos
+    low = rng.randrange(N_STATES // 2)
+    updates = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(1000):
+            state = low + rng.randrange(N_STATES // 4)
+            action = rng.randrange(N_ACTIONS)
+            old_value = q_table[state][action]
+            next_max = np.max(q_table[state + 1])
+            q_table[state][action] = old_value + ALPHA * (1.0 + GAMMA * next_max - old_value)
+            client.maybe_sync()
+        updates += 1000
+    client.sync()
+    results.put({"worker": worker_id, "updates": updates, "elapsed": time.perf_counter() - start, **client.stats})
+    client.close()
+
+
+def run_workers(host, port, n_workers, max_steps=None, rom_path=ROM_PATH, seconds=BENCH_SECONDS, first_id=0):
+    """Lanza `n_workers` procesos locales contra el servidor y espera sus resultados."""
+    results = mp.Queue()
+    procs = []
+    for i in range(n_workers):
+        worker_id = first_id + i
+        if max_steps is None:
+            args = (host, port, worker_id, seconds, results)
+            p = mp.Process(target=synthetic_worker_main, args=args)
+        else:
+            epsilon = WORKER_EPSILONS[worker_id % len(WORKER_EPSILONS)]
+            args = (host, port, worker_id, epsilon, max_steps, rom_path, results)
+            p = mp.Process(target=remote_worker_main, args=args)
+        p.start()
+        procs.append(p)
+    stats = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return sorted(stats, key=lambda r: r["worker"])
+
+
+def print_scaling(rows):
+    print("Workers | Upd/s totales | Escalado | Push | Stale | KB/push | Estados")
+    print("-" * 70)
+    base = rows[0]["rate"] if rows else 0.0
+    for r in rows:
+        print(f"{r['workers']:7d} | {r['rate']:13,.0f} | {r['rate'] / base:7.2f}x | {r['pushes']:4d} | "
+              f"{r['stale']:5d} | {r['kb_per_push']:7.1f} | {r['states']:7d}")
+
+
+def bench(max_workers, seconds=BENCH_SECONDS, rom_path=ROM_PATH, max_staleness=MAX_STALENESS):
+    """Escalado del throughput con N procesos locales contra un servidor en 127.0.0.1."""
+    worker_counts = [n for n in (1, 2, 4, 8, 16) if n <= max_workers] or [1]
+    modes = [("SINTÉTICO (sin emulador)", None)]
+    if os.path.exists(rom_path):
+        modes.append((f"MARIOAGENT ({LEARNING_STEPS} pasos por worker)", LEARNING_STEPS))
+    else:
+        print(f"⚠️  ROM no encontrada en {rom_path}: solo se mide el modo sintético")
+
+    for title, max_steps in modes:
+        print("=" * 70)
+        print(f"SERVIDOR DE PARÁMETROS - {title}, intervalo {SYNC_INTERVAL}s, staleness {max_staleness}")
+        print("=" * 70)
+        rows = []
+        for n in worker_counts:
+            server = ParameterServer(max_staleness=max_staleness)
+            host, port = server.serve(HOST, 0)
+            start = time.perf_counter()
+            stats = run_workers(host, port, n, max_steps, rom_path, seconds)
+            elapsed = time.perf_counter() - start if max_steps else seconds
+            server.close()
+            pushes = server.stats["pushes"]
+            rows.append({
+                "workers": n,
+                "rate": sum(r["updates"] for r in stats) / elapsed,
+                "pushes": pushes,
+                "stale": server.stats["stale"],
+                "kb_per_push": server.stats["bytes_in"] / max(1, pushes) / 1024,
+                "states": len(server.table),
+            })
+        print_scaling(rows)
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de parámetros para Q-Learning distribuido")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    srv = sub.add_parser("server", help="Servir la Q-table maestra")
+    srv.add_argument("--host", default=HOST, help="0.0.0.0 para aceptar workers de otras máquinas")
+    srv.add_argument("--port", type=int, default=PORT)
+    srv.add_argument("--max-staleness", type=int, default=MAX_STALENESS)
+    srv.add_argument("--out", default=None, help="Guardar la Q-table al salir (por defecto Q_TABLE_PATH)")
+
+    wrk = sub.add_parser("worker", help="Lanzar workers MarioAgent contra un servidor")
+    wrk.add_argument("--host", default=HOST)
+    wrk.add_argument("--port", type=int, default=PORT)
+    wrk.add_argument("--workers", type=int, default=4)
+    wrk.add_argument("--first-id", type=int, default=0, help="Id del primer worker (distinto en cada máquina)")
+    wrk.add_argument("--steps", type=int, default=5000)
+    wrk.add_argument("--rom", default=ROM_PATH)
+
+    bch = sub.add_parser("bench", help="Escalado local con procesos en 127.0.0.1")
+    bch.add_argument("--workers", type=int, default=os.cpu_count())
+    bch.add_argument("--seconds", type=float, default=BENCH_SECONDS)
+    bch.add_argument("--max-staleness", type=int, default=MAX_STALENESS)
+    bch.add_argument("--rom", default=ROM_PATH)
+
+    args = parser.parse_args()
+    if args.command == "bench":
+        bench(args.workers, args.seconds, args.rom, args.max_staleness)
+
+    elif args.command == "server":
+        from main import Q_TABLE_PATH, save_q_table
+        server = ParameterServer(max_staleness=args.max_staleness)
+        host, port = server.serve(args.host, args.port)
+        print("=" * 70)
+        print(f"SERVIDOR DE PARÁMETROS en {host}:{port} (staleness máx {args.max_staleness})")
+        print("=" * 70)
+        try:
+            while True:
+                time.sleep(10)
+                s = server.stats
+                print(f"Versión {server.version} | Push: {s['pushes']} | Stale: {s['stale']} | "
+                      f"Pull: {s['pulls']} | Estados: {len(server.table)} | "
+                      f"Entrada: {s['bytes_in'] / 1024:.0f} KB | Salida: {s['bytes_out'] / 1024:.0f} KB")
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+            path = args.out or Q_TABLE_PATH
+            save_q_table(server.table.to_dict(), path)
+            print(f"💾 Q-table guardada en {path}")
+
+    else:
+        print("=" * 70)
+        print(f"WORKERS REMOTOS - {args.workers} x {args.steps} pasos contra {args.host}:{args.port}")
+        print("=" * 70)
+        stats = run_workers(args.host, args.port, args.workers, args.steps, args.rom, first_id=args.first_id)
+        for r in stats:
+            print(f"Worker {r['worker']} | Epsilon: {r['epsilon']:.2f} | Pasos: {r['updates']} | "
+                  f"Record: {r['best_distance']} | Push: {r['pushes']} | Stale: {r['stale']} | "
+                  f"{r['updates'] / r['elapsed']:.0f} pasos/s")
+
+
+if __name__ == "__main__":
+    main()
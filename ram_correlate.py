@@ -0,0 +1,230 @@
+"""
+Descubrimiento offline de direcciones de RAM por correlación.
+
+En lugar de jugar y leer números en pantalla (find_correct_addresses.py,
+manual_check_lives.py, find_mario_addresses.py), este script:
+
+1. `record`: juega una sesión headless con entradas aleatorias y guarda TODA
+   la WRAM (0xC000-0xDFFF) y la HRAM (0xFF80-0xFFFE) de cada frame en un
+   array (frames x direcciones) uint8, junto con las entradas pulsadas.
+2. `rank`: ordena cada dirección, y cada par de bytes adyacentes leído como
+   BCD o como entero de 16 bits, por su correlación con una señal objetivo
+   (dirección pulsada, eventos como "vida perdida" o un score observado).
+
+USO:
+    python3 ram_correlate.py record --frames 20000 --out sesion.npz
+    python3 ram_correlate.py rank sesion.npz --target direction --mode delta
+    python3 ram_correlate.py rank sesion.npz --events 5210,9876 --mode delta
+    python3 ram_correlate.py rank sesion.npz --target-file score.npy
+"""
+
+import time
+import random
+import argparse
+
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+ROM_PATH = "roms/super-mario-land.gb"
+WRAM = (0xC000, 0xE000)
+HRAM = (0xFF80, 0xFFFF)
+ADDRESSES = np.concatenate([np.arange(*WRAM), np.arange(*HRAM)]).astype(np.uint16)
+CHUNK = 256           # Columnas procesadas a la vez (acota la memoria temporal)
+
+# Tabla BCD: byte -> decenas*10 + unidades
+BCD_LUT = ((np.arange(256) >> 4) * 10 + (np.arange(256) & 0x0F)).astype(np.float64)
+
+DIRECTION_KEYS = {1: "RIGHT", -1: "LEFT", 0: None}
+
+
+def record_session(rom_path, frames, seed=0):
+    """Juega `frames` frames con entradas aleatorias y devuelve (ram, direction, buttons)."""
+    from pyboy import PyBoy
+    from pyboy.utils import WindowEvent
+
+    rng = random.Random(seed)
+    pyboy = PyBoy(rom_path, window="null")
+    pyboy.set_emulation_speed(0)
+
+    # Secuencia de inicio, igual que MarioAgent.start_sequence
+    pyboy.tick(180, False)
+    pyboy.send_input(WindowEvent.PRESS_BUTTON_START)
+    pyboy.tick(10, False)
+    pyboy.send_input(WindowEvent.RELEASE_BUTTON_START)
+    pyboy.tick(60, False)
+
+    ram = np.empty((frames, len(ADDRESSES)), dtype=np.uint8)
+    direction = np.zeros(frames, dtype=np.int8)
+    buttons = np.zeros(frames, dtype=np.uint8)     # bit 0 = A, bit 1 = B
+
+    n_wram = WRAM[1] - WRAM[0]
+    held = []
+    current_dir, current_buttons, remaining = 0, 0, 0
+    for frame in range(frames):
+        if remaining == 0:
+            for event in held:
+                pyboy.send_input(event)
+            held = []
+            current_dir = rng.choice([1, 1, -1, 0])
+            current_buttons = rng.choice([0, 0, 1, 2, 3])
+            remaining = rng.randint(8, 60)
+            pressed = []
+            if DIRECTION_KEYS[current_dir]:
+                pressed.append(DIRECTION_KEYS[current_dir])
+            if current_buttons & 1:
+                pressed.append("A")
+            if current_buttons & 2:
+                pressed.append("B")
+            for name in pressed:
+                kind = "ARROW" if name in ("LEFT", "RIGHT") else "BUTTON"
+                pyboy.send_input(getattr(WindowEvent, f"PRESS_{kind}_{name}"))
+                held.append(getattr(WindowEvent, f"RELEASE_{kind}_{name}"))
+        remaining -= 1
+
+        pyboy.tick(1, False)
+        ram[frame, :n_wram] = pyboy.memory[WRAM[0]:WRAM[1]]
+        ram[frame, n_wram:] = pyboy.memory[HRAM[0]:HRAM[1]]
+        direction[frame] = current_dir
+        buttons[frame] = current_buttons
+
+    pyboy.stop(save=False)
+    return ram, direction, buttons
+
+
+def moments(values, target):
+    """
+    Momentos centrados de cada columna (frames x n): varianza, covarianza con
+    `target` (ya centrado) y covarianza con la columna siguiente.
+    """
+    centered = values - values.mean(axis=0)
+    var = np.einsum("ij,ij->j", centered, centered)
+    cov_target = target @ centered
+    cov_next = np.einsum("ij,ij->j", centered[:, :-1], centered[:, 1:])
+    return var, cov_target, cov_next
+
+
+def pair_correlation(stats, var_target, a, b):
+    """
+    Correlación de la combinación a*byte[i] + b*byte[i+1] usando solo los
+    momentos por byte (la covarianza y la varianza son bilineales).
+    """
+    var, cov_target, cov_next = stats
+    m = len(cov_next)
+    cov = a * cov_target[:m] + b * cov_target[1:m + 1]
+    pair_var = a * a * var[:m] + b * b * var[1:m + 1] + 2.0 * a * b * cov_next
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nan_to_num(cov / np.sqrt(pair_var * var_target))
+
+
+def rank_addresses(ram, target, mode="value", top=20):
+    """
+    Ordena direcciones y pares por |correlación| con `target`.
+
+    Los candidatos son: byte sin signo (u8), par little-endian (u16le), par
+    big-endian (u16be) y par BCD big-endian (bcd). En modo "delta" se
+    correlaciona la diferencia frame a frame de cada candidato.
+    Devuelve una lista de (correlación, dirección, tipo).
+    """
+    target = np.asarray(target, dtype=np.float64)
+    if mode == "delta":
+        target = target[1:]
+    target = target - target.mean()
+    var_target = float(target @ target)
+    # Pares solo entre direcciones realmente adyacentes (no WRAM -> HRAM)
+    adjacent = np.diff(ADDRESSES.astype(np.int32)) == 1
+
+    results = []
+    n = ram.shape[1]
+    for start in range(0, n, CHUNK):
+        stop = min(start + CHUNK, n)
+        block = ram[:, start:stop + 1]   # Una columna extra para formar el último par
+        raw = block.astype(np.float64)
+        bcd = BCD_LUT[block]
+        if mode == "delta":
+            raw = np.diff(raw, axis=0)
+            bcd = np.diff(bcd, axis=0)
+
+        raw_stats = moments(raw, target)
+        bcd_stats = moments(bcd, target)
+        m = len(raw_stats[2])
+        var, cov_target, _ = raw_stats
+        with np.errstate(invalid="ignore", divide="ignore"):
+            u8 = np.nan_to_num(cov_target / np.sqrt(var * var_target))[:stop - start]
+
+        candidates = {
+            "u8": u8,
+            "u16le": pair_correlation(raw_stats, var_target, 1.0, 256.0),
+            "u16be": pair_correlation(raw_stats, var_target, 256.0, 1.0),
+            "bcd": pair_correlation(bcd_stats, var_target, 100.0, 1.0),
+        }
+        for kind, corr in candidates.items():
+            if kind != "u8":
+                corr[~adjacent[start:start + m]] = 0.0
+            for i in np.argsort(-np.abs(corr))[:top]:
+                results.append((float(corr[i]), int(ADDRESSES[start + i]), kind))
+
+    results.sort(key=lambda r: -abs(r[0]))
+    return results[:top]
+
+
+def build_target(session, frames, args):
+    """Construye la señal objetivo por frame a partir de los argumentos."""
+    if args.target_file:
+        return np.load(args.target_file)
+    if args.events:
+        target = np.zeros(frames, dtype=np.float32)
+        target[[int(f) for f in args.events.split(",")]] = 1.0
+        return target
+    if args.target == "direction":
+        return session["direction"]
+    if args.target == "jump":
+        return session["buttons"] & 1
+    raise SystemExit(f"Objetivo desconocido: {args.target}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Descubrimiento de direcciones de RAM por correlación")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Grabar una sesión headless")
+    rec.add_argument("--rom", default=ROM_PATH)
+    rec.add_argument("--frames", type=int, default=20000)
+    rec.add_argument("--seed", type=int, default=0)
+    rec.add_argument("--out", default="sesion.npz")
+
+    rank = sub.add_parser("rank", help="Ordenar direcciones por correlación")
+    rank.add_argument("session")
+    rank.add_argument("--target", default="direction", choices=["direction", "jump"])
+    rank.add_argument("--events", help="Frames de eventos separados por comas (p.ej. vidas perdidas)")
+    rank.add_argument("--target-file", help="Señal por frame en un .npy (p.ej. score observado)")
+    rank.add_argument("--mode", default="value", choices=["value", "delta"])
+    rank.add_argument("--top", type=int, default=20)
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        print(f"Grabando {args.frames} frames de {args.rom}...")
+        start = time.perf_counter()
+        ram, direction, buttons = record_session(args.rom, args.frames, args.seed)
+        np.savez(args.out, ram=ram, direction=direction, buttons=buttons, addresses=ADDRESSES)
+        print(f"✅ {ram.shape} guardado en {args.out} ({time.perf_counter() - start:.1f}s)")
+        return
+
+    session = np.load(args.session)
+    ram = session["ram"]
+    target = build_target(session, len(ram), args)
+    start = time.perf_counter()
+    results = rank_addresses(ram, target, args.mode, args.top)
+    elapsed = time.perf_counter() - start
+
+    print("=" * 70)
+    print(f"RANKING ({len(ram)} frames, modo {args.mode}) en {elapsed:.2f}s")
+    print("=" * 70)
+    print("Dirección | Tipo  | Correlación")
+    print("-" * 70)
+    for corr, addr, kind in results:
+        print(f"0x{addr:04X}    | {kind:5s} | {corr:+.3f}")
+
+
+if __name__ == "__main__":
+    main()
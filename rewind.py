@@ -0,0 +1,190 @@
+"""
+Buffer de rebobinado en memoria para depurar "viajando en el tiempo".
+
+Cada INTERVAL frames se guarda un save-state del emulador (PyBoy tarda unos
+20 ms en serializarlo, por eso no se guarda cada frame). Uno de cada
+KEYFRAME_EVERY se guarda completo (keyframe, comprimido con zlib) y el resto
+como XOR contra el último keyframe, también comprimido: entre frames cercanos
+casi todo el estado es igual, así que el XOR es casi todo ceros y ocupa muy
+poco. Los estados viven en un anillo acotado a los últimos SECONDS segundos.
+
+Además, cada frame se guarda en el anillo la entrada del joypad (un byte,
+leído como en trace_replay.py). seek(frame) carga el estado guardado más
+cercano por debajo y reproduce los frames que falten con las mismas
+entradas, en milisegundos: la consola muestra exactamente lo que pasó en
+la partida. Si falta la entrada de algún frame intermedio (capture() no se
+llamó en todos), seek se queda en el estado capturado y lo avisa en vez de
+inventar frames sin entradas.
+
+PyBoy no restaura frame_count al cargar un estado, así que el buffer lleva
+su propio reloj (`frame`): capture() debe llamarse una vez por frame, justo
+después del tick.
+
+USO (desde un script de diagnóstico):
+    rewind = RewindBuffer(pyboy)
+    while True:
+        pyboy.tick()
+        rewind.capture()
+    ...
+    rewind.seek(frame)        # Y leer pyboy.memory[...] en ese frame
+"""
+
+import io
+import zlib
+import bisect
+import time
+from collections import deque
+
+import numpy as np
+
+from trace_replay import read_joypad, apply_joypad
+
+# --- CONFIGURACIÓN ---
+INTERVAL = 30           # Frames entre capturas (~0.5 s)
+KEYFRAME_EVERY = 20     # Capturas entre keyframes completos
+SECONDS = 180           # Historia que se conserva (~3 minutos a 60 fps)
+COMPRESSION = 1         # Nivel zlib: rápido, el XOR ya comprime muy bien
+
+
+class RewindBuffer:
+    """Anillo acotado de save-states comprimidos como deltas contra un keyframe."""
+
+    def __init__(self, pyboy, interval=INTERVAL, keyframe_every=KEYFRAME_EVERY, seconds=SECONDS):
+        self.pyboy = pyboy
+        self.interval = interval
+        self.keyframe_every = keyframe_every
+        # Cada entrada: (frame, keyframe_comprimido, delta_comprimido o None)
+        self.entries = deque(maxlen=max(1, seconds * 60 // interval))
+        # Entrada del joypad de cada frame; la última es la de `input_frame`
+        self.inputs = deque(maxlen=(self.entries.maxlen + 1) * interval)
+        self.input_frame = None
+        self.keyframe_raw = None
+        self.keyframe_blob = None
+        self.captures = 0
+        self.frame = pyboy.frame_count   # Reloj propio de la línea de tiempo
+        self.decoded = (None, None)      # Caché del último keyframe descomprimido
+
+    def capture(self, force=False):
+        """
+        Llamar una vez por frame: avanza el reloj y guarda el estado si toca
+        por intervalo. Con `force` guarda el frame actual sin avanzar el reloj.
+        """
+        if not force:
+            self.frame += 1
+            self._record_input()
+        frame = self.frame
+        if not force and frame % self.interval:
+            return
+        if self.entries and self.entries[-1][0] == frame:
+            return
+        buffer = io.BytesIO()
+        self.pyboy.save_state(buffer)
+        raw = np.frombuffer(buffer.getbuffer(), dtype=np.uint8)
+
+        if self.keyframe_raw is None or self.captures % self.keyframe_every == 0 or len(raw) != len(self.keyframe_raw):
+            self.keyframe_raw = raw.copy()
+            self.keyframe_blob = zlib.compress(raw.tobytes(), COMPRESSION)
+            self.entries.append((frame, self.keyframe_blob, None))
+        else:
+            delta = np.bitwise_xor(raw, self.keyframe_raw)
+            self.entries.append((frame, self.keyframe_blob, zlib.compress(delta.tobytes(), COMPRESSION)))
+        self.captures += 1
+
+    def _record_input(self):
+        """Guarda la entrada del frame recién emulado (la historia posterior a `frame` se descarta)."""
+        if self.input_frame is not None and self.input_frame >= self.frame:
+            # Se sigue jugando desde un frame rebobinado: la línea de tiempo cambia
+            for _ in range(min(len(self.inputs), self.input_frame - self.frame + 1)):
+                self.inputs.pop()
+            while self.entries and self.entries[-1][0] >= self.frame:
+                self.entries.pop()
+            self.keyframe_raw = None
+        elif self.input_frame is not None and self.input_frame != self.frame - 1:
+            self.inputs.clear()   # Hueco: las entradas anteriores ya no son contiguas
+        self.inputs.append(read_joypad(self.pyboy))
+        self.input_frame = self.frame
+
+    def _frame_inputs(self, first, last):
+        """Entradas de los frames [first, last], o None si alguna no está en el anillo."""
+        if self.input_frame is None or last > self.input_frame or first < self.input_frame - len(self.inputs) + 1:
+            return None
+        offset = len(self.inputs) - 1 - self.input_frame
+        return [self.inputs[frame + offset] for frame in range(first, last + 1)]
+
+    def frames(self):
+        """(primer, último) frame disponible para seek."""
+        if not self.entries:
+            return None, None
+        return self.entries[0][0], self.entries[-1][0]
+
+    def nbytes(self):
+        """Memoria aproximada ocupada por los estados comprimidos."""
+        keyframes = {id(key): len(key) for _, key, _ in self.entries}
+        return sum(keyframes.values()) + sum(len(delta) for _, _, delta in self.entries if delta)
+
+    def _state_bytes(self, index):
+        frame, key_blob, delta_blob = self.entries[index]
+        if self.decoded[0] is not key_blob:
+            self.decoded = (key_blob, np.frombuffer(zlib.decompress(key_blob), dtype=np.uint8))
+        key_raw = self.decoded[1]
+        if delta_blob is None:
+            return frame, key_raw.tobytes()
+        delta = np.frombuffer(zlib.decompress(delta_blob), dtype=np.uint8)
+        return frame, np.bitwise_xor(key_raw, delta).tobytes()
+
+    def seek(self, frame):
+        """
+        Lleva el emulador al frame `frame` (dentro del buffer) reproduciendo
+        las entradas grabadas desde la captura anterior. Devuelve el frame
+        alcanzado. El buffer no cambia: se puede volver a saltar atrás o adelante.
+        """
+        if not self.entries:
+            raise ValueError("El buffer de rebobinado está vacío")
+        frames = [entry[0] for entry in self.entries]
+        index = max(0, bisect.bisect_right(frames, frame) - 1)
+        state_frame, state = self._state_bytes(index)
+        self.pyboy.load_state(io.BytesIO(state))
+        target = min(max(frame, state_frame), max(frames[-1], self.input_frame or 0))
+        if target > state_frame:
+            inputs = self._frame_inputs(state_frame + 1, target)
+            if inputs is None:
+                print(f"   ⚠️  Sin entradas grabadas para los frames {state_frame + 1}-{target}: "
+                      f"se muestra el frame capturado {state_frame}")
+                target = state_frame
+            else:
+                mask = read_joypad(self.pyboy)
+                for i, new_mask in enumerate(inputs):
+                    apply_joypad(self.pyboy, mask, new_mask)
+                    mask = new_mask
+                    self.pyboy.tick(1, i == len(inputs) - 1)
+        self.frame = target
+        return target
+
+
+def inspect_console(pyboy, rewind, show):
+    """
+    Consola mínima de rebobinado (tras Ctrl+C en un script de diagnóstico).
+    `show(pyboy)` imprime lo que interese del frame actual. Al salir se
+    restaura el presente y la emulación puede continuar.
+    """
+    rewind.capture(force=True)
+    present = rewind.frame
+    first, last = rewind.frames()
+    print(f"\n⏪ REBOBINADO: frames {first}-{last} ({rewind.nbytes() / 1024:.0f} KB en memoria)")
+    print("   Escribe un frame (p.ej. 5400), un salto relativo (-120, +30) o Enter para continuar.")
+    current = present
+    while True:
+        command = input(f"[frame {current}] > ").strip()
+        if not command:
+            break
+        try:
+            target = current + int(command) if command[0] in "+-" else int(command)
+        except ValueError:
+            print("   Frame no válido")
+            continue
+        start = time.perf_counter()
+        current = rewind.seek(target)
+        print(f"   Saltado a {current} en {(time.perf_counter() - start) * 1000:.1f} ms")
+        show(pyboy)
+    rewind.seek(present)
+    print("▶️  Continuando...")
@@ -0,0 +1,77 @@
+"""
+Observación por píxeles sin copias intermedias, con apilado de frames.
+
+El buffer de pantalla de PyBoy (`pyboy.screen.ndarray`, 144x160 RGBA) se
+toma como vista NumPy una sola vez. Cada paso, una vista con stride hace a la
+vez el recorte (se quita el marcador superior), el submuestreo y la
+conversión a escala de grises (la paleta DMG es gris: R == G == B, basta un
+canal). El único movimiento de datos es un np.copyto hacia un anillo
+preasignado.
+
+El anillo guarda cada frame dos veces (posiciones i e i + k), así los k
+frames más recientes son siempre un bloque contiguo y `stack` es una vista:
+el aprendiz lo lee sin ninguna asignación por paso.
+
+USO:
+    python3 screen_obs.py        # Benchmark del coste por paso
+"""
+
+import time
+
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+STACK_SIZE = 4        # Frames apilados
+CROP_TOP = 16         # Filas del marcador (MARIO / WORLD / TIME)
+CROP_BOTTOM = 144
+DOWNSAMPLE = 2        # 128x160 -> 64x80
+
+
+class ScreenObservation:
+    """Pila de los últimos `stack_size` frames en gris, recortados y submuestreados."""
+
+    def __init__(self, screen, stack_size=STACK_SIZE, crop=(CROP_TOP, CROP_BOTTOM), downsample=DOWNSAMPLE):
+        # Vista (sin copia) del canal R del buffer RGBA ya recortada y submuestreada
+        self.source = screen[crop[0]:crop[1]:downsample, ::downsample, 0]
+        self.stack_size = stack_size
+        self.ring = np.zeros((2 * stack_size,) + self.source.shape, dtype=np.uint8)
+        self.head = 0       # Próxima posición a escribir en [0, stack_size)
+
+    def push(self):
+        """Copia el frame actual de la pantalla al anillo."""
+        np.copyto(self.ring[self.head], self.source)
+        np.copyto(self.ring[self.head + self.stack_size], self.source)
+        self.head = (self.head + 1) % self.stack_size
+
+    def reset(self):
+        """Rellena la pila entera con el frame actual (inicio de episodio)."""
+        self.ring[:] = self.source
+
+    @property
+    def stack(self):
+        """Vista (stack_size, alto, ancho) del más antiguo al más reciente."""
+        return self.ring[self.head:self.head + self.stack_size]
+
+
+def main():
+    # Buffer con la misma forma y strides que pyboy.screen.ndarray
+    rng = np.random.default_rng(0)
+    screen = rng.integers(0, 256, (144, 160, 4), dtype=np.uint8)
+    obs = ScreenObservation(screen)
+    steps = 100000
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        obs.push()
+        obs.stack
+    elapsed = time.perf_counter() - start
+
+    print("=" * 70)
+    print("OBSERVACIÓN POR PÍXELES")
+    print("=" * 70)
+    print(f"Pila: {obs.stack.shape} uint8 | {elapsed / steps * 1e6:.2f} µs por paso ({steps / elapsed:,.0f} pasos/s)")
+    print(f"Vista sin copia de la pantalla: {np.shares_memory(obs.source, screen)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Q-table en memoria compartida para Q-Learning asíncrono (estilo Hogwild).
+
+Varios procesos MarioAgent, cada uno con su propio emulador headless y su
+propio epsilon, leen y escriben UNA misma Q-table alojada en
+multiprocessing.shared_memory. No hay aprendiz central: cada worker aplica
+sus actualizaciones de Bellman directamente sobre la tabla compartida, bien
+protegido por locks "a rayas" (un lock por grupo de estados) o sin locks.
+
+USO:
+    python3 shared_qtable.py [workers] [pasos_por_worker] [striped|lockfree]
+"""
+
+import os
+import sys
+import time
+import contextlib
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+ROM_PATH = "roms/super-mario-land.gb"
+N_STATES = (256 * 256) // 10 + 1   # get_state() = global_x // 10, con global_x < 256 páginas
+N_ACTIONS = 6                      # len(action_macros.DEFAULT_MACROS); ver table_shape para otras configuraciones
+N_STRIPES = 64                     # Locks "a rayas": estado % N_STRIPES
+WORKER_EPSILONS = [1.0, 0.7, 0.4, 0.2, 0.1, 0.05, 0.3, 0.5]
+
+NULL_LOCK = contextlib.nullcontext()
+
+
+class DenseQTable:
+    """
+    Q-table densa sobre un array NumPy (estado entero -> fila de Q-values).
+
+    Imita la interfaz del dict que usa MarioAgent: `state in q`, `q[state]`
+    (devuelve una vista de la fila, así `q[state][action] = v` escribe en el
+    array) y `q[state] = valores`. Todas las filas existen desde el inicio.
+    """
+
+    def __init__(self, n_states=N_STATES, n_actions=N_ACTIONS, array=None):
+        if array is None:
+            array = np.zeros((n_states, n_actions), dtype=np.float64)
+        self.array = array
+
+    def __contains__(self, state):
+        return 0 <= state < len(self.array)
+
+    def __getitem__(self, state):
+        return self.array[state]
+
+    def __setitem__(self, state, values):
+        self.array[state] = values
+
+    def __len__(self):
+        """Número de estados visitados (filas con algún Q-value distinto de cero)."""
+        return int(np.count_nonzero(self.array.any(axis=1)))
+
+    def lock(self, state):
+        """Contexto de exclusión para actualizar `state` (no-op en la tabla local)."""
+        return NULL_LOCK
+
+    def lock_states(self, states):
+        """Contexto de exclusión para actualizar varios estados a la vez (no-op en la tabla local)."""
+        return NULL_LOCK
+
+    def to_dict(self):
+        """Copia con las filas visitadas, en el formato dict de MarioAgent."""
+        rows = np.flatnonzero(self.array.any(axis=1))
+        return {int(s): self.array[s].tolist() for s in rows}
+
+
+class SharedQTable(DenseQTable):
+    """
+    DenseQTable cuyo array vive en multiprocessing.shared_memory.
+
+    Se puede pasar como argumento a un multiprocessing.Process: al
+    deserializarse en el hijo se vuelve a adjuntar al mismo bloque de memoria
+    (y a los mismos locks). Con `striped=False` las escrituras van sin lock
+    (Hogwild puro); cada Q-value es un float64 alineado.
+    """
+
+    def __init__(self, n_states=N_STATES, n_actions=N_ACTIONS, striped=True, n_stripes=N_STRIPES):
+        nbytes = n_states * n_actions * np.dtype(np.float64).itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.owner_pid = os.getpid()
+        self.locks = [mp.Lock() for _ in range(n_stripes)] if striped else None
+        array = np.ndarray((n_states, n_actions), dtype=np.float64, buffer=self.shm.buf)
+        array[:] = 0.0
+        super().__init__(array=array)
+
+    def __getstate__(self):
+        return {"name": self.shm.name, "shape": self.array.shape, "locks": self.locks}
+
+    def __setstate__(self, state):
+        self.shm = shared_memory.SharedMemory(name=state["name"])
+        self.owner_pid = None
+        self.locks = state["locks"]
+        self.array = np.ndarray(state["shape"], dtype=np.float64, buffer=self.shm.buf)
+
+    def lock(self, state):
+        if self.locks is None:
+            return NULL_LOCK
+        return self.locks[state % len(self.locks)]
+
+    @contextlib.contextmanager
+    def lock_states(self, states):
+        """
+        Toma los locks de todas las rayas de `states` en orden creciente: dos
+        workers que piden rayas solapadas nunca se esperan en ciclo.
+        """
+        if self.locks is None:
+            yield
+            return
+        with contextlib.ExitStack() as stack:
+            for stripe in sorted({int(state) % len(self.locks) for state in states}):
+                stack.enter_context(self.locks[stripe])
+            yield
+
+    def close(self):
+        """Suelta la vista y cierra el bloque; el proceso creador además lo libera."""
+        self.array = None
+        self.shm.close()
+        if self.owner_pid == os.getpid():
+            self.shm.unlink()
+
+
+def table_shape(enemy_aware=False, level_aware=False, actions=None, **_):
+    """(n_states, n_actions) que necesita un MarioAgent con esta configuración."""
+    from main import ENEMY_BUCKETS, N_LEVELS, STATES_PER_LEVEL
+    from action_macros import DEFAULT_MACROS
+    n_states = N_STATES * ENEMY_BUCKETS if enemy_aware else N_STATES
+    if level_aware:
+        n_states = STATES_PER_LEVEL * N_LEVELS
+    return n_states, len(actions if actions is not None else DEFAULT_MACROS)
+
+
+def make_shared_agent(rom_path, q_table, **kwargs):
+    """
+    Crea un MarioAgent headless que actualiza `q_table` bajo su lock por estado
+    (con trazas, bajo los locks de todos los estados con traza).
+    ValueError si la tabla no tiene sitio para los estados/acciones del agente.
+    """
+    from main import MarioAgent
+
+    n_states, n_actions = table_shape(**kwargs)
+    if len(q_table.array) < n_states or q_table.array.shape[1] != n_actions:
+        raise ValueError(f"La Q-table compartida es de {q_table.array.shape[0]}x{q_table.array.shape[1]} y el "
+                         f"agente necesita {n_states}x{n_actions} (estados x acciones): créala con "
+                         f"SharedQTable(*table_shape(**agent_kwargs))")
+
+    class SharedMarioAgent(MarioAgent):
+        def update_q_table(self, state, action, reward, next_state):
+            if self.traces is None:
+                with self.q_table.lock(state):
+                    super().update_q_table(state, action, reward, next_state)
+                return
+            # Q(λ) escribe en todas las filas con traza, no solo en la de `state`
+            with self.q_table.lock_states([state, *self.traces.active_states()]):
+                super().update_q_table(state, action, reward, next_state)
+
+    kwargs.setdefault("window", "null")
+    kwargs.setdefault("verbose", False)
+    return SharedMarioAgent(rom_path, q_table=q_table, **kwargs)
+
+
+def worker_main(q_table, worker_id, epsilon, max_steps, rom_path, results, telemetry=None):
+    """Proceso worker: su propio emulador y epsilon, la Q-table compartida."""
+    agent = make_shared_agent(rom_path, q_table, telemetry=telemetry)
+    agent.worker_id = worker_id
+    agent.epsilon = epsilon
+    agent.epsilon_min = min(agent.epsilon_min, epsilon)
+
+    start = time.perf_counter()
+    agent.run(max_steps=max_steps)
+    elapsed = time.perf_counter() - start
+
+    results.put({
+        "worker": worker_id,
+        "epsilon": epsilon,
+        "steps": agent.total_steps,
+        "frames": agent.pyboy.frame_count,
+        "generations": agent.generation,
+        "best_distance": agent.best_distance,
+        "elapsed": elapsed,
+    })
+    agent.pyboy.stop(save=False)
+    q_table.close()
+
+
+def train_parallel(n_workers, max_steps, rom_path=ROM_PATH, striped=True, q_table=None, telemetry=None):
+    """
+    Lanza `n_workers` procesos sobre una Q-table compartida y espera a que acaben.
+
+    Devuelve (q_table, resultados_por_worker). Si no se pasa `q_table` se crea
+    una nueva; el llamador es responsable de `q_table.close()`. Con `telemetry`
+    (telemetry.Telemetry de n_workers filas) cada worker publica sus contadores.
+    """
+    if q_table is None:
+        q_table = SharedQTable(*table_shape(), striped=striped)
+    results = mp.Queue()
+    procs = []
+    for worker_id in range(n_workers):
+        epsilon = WORKER_EPSILONS[worker_id % len(WORKER_EPSILONS)]
+        slot = telemetry.slot(worker_id) if telemetry is not None else None
+        p = mp.Process(target=worker_main, args=(q_table, worker_id, epsilon, max_steps, rom_path, results, slot))
+        p.start()
+        procs.append(p)
+
+    stats = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return q_table, sorted(stats, key=lambda r: r["worker"])
+
+
+def main():
+    n_workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    max_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    striped = (sys.argv[3] != "lockfree") if len(sys.argv) > 3 else True
+
+    print("=" * 70)
+    print(f"HOGWILD Q-LEARNING - {n_workers} workers x {max_steps} pasos ({'striped' if striped else 'lockfree'})")
+    print("=" * 70)
+
+    from telemetry import Telemetry
+    telemetry = Telemetry(n_workers)
+    address = telemetry.serve()
+    if address is not None:
+        print(f"Telemetría agregada en http://{address[0]}:{address[1]}/metrics")
+
+    start = time.perf_counter()
+    q_table, stats = train_parallel(n_workers, max_steps, striped=striped, telemetry=telemetry)
+    elapsed = time.perf_counter() - start
+    telemetry.close()
+
+    for r in stats:
+        print(f"Worker {r['worker']} | Epsilon: {r['epsilon']:.2f} | Pasos: {r['steps']} | "
+              f"Gens: {r['generations']} | Record: {r['best_distance']} | {r['steps'] / r['elapsed']:.0f} pasos/s")
+    total_steps = sum(r["steps"] for r in stats)
+    print(f"\nTotal: {total_steps} actualizaciones en {elapsed:.1f}s ({total_steps / elapsed:.0f}/s)")
+    print(f"Estados visitados: {len(q_table)} | Record global: {max(r['best_distance'] for r in stats)}")
+    q_table.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Telemetría local del entrenamiento en vivo (Prometheus y JSON).
+
+Cada proceso escribe sus contadores en una fila propia de un array en
+multiprocessing.shared_memory. El bucle caliente solo suma contadores: no
+toma locks, no formatea texto y no hace E/S. Un servidor HTTP en un hilo de
+fondo (solo en 127.0.0.1) lee todas las filas, agrega los workers y calcula
+las tasas por segundo:
+
+    GET /metrics       -> texto en formato Prometheus
+    GET /metrics.json  -> JSON
+
+En Prometheus cada métrica sale por worker (`mario_steps_total{worker="0"}`)
+y el agregado va con nombre propio (`mario_all_steps_total`), así un
+sum() sobre la métrica por worker no cuenta dos veces.
+
+Si el puerto está ocupado, serve() avisa y devuelve None: el entrenamiento
+sigue sin telemetría.
+
+USO:
+    telemetry = Telemetry(n_workers=4)
+    telemetry.serve()                          # http://127.0.0.1:9464/metrics (None si no pudo)
+    agent = MarioAgent(ROM_PATH, telemetry=telemetry.slot(0))
+"""
+
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+HOST = "127.0.0.1"
+PORT = 9464
+RATE_WINDOW = 1.0     # Segundos entre muestras para calcular tasas
+
+# Columnas de cada fila (una fila por worker)
+FIELDS = ["steps", "frames", "resets", "epsilon", "q_states", "best_distance", "generation", "updated"]
+STEPS, FRAMES, RESETS, EPSILON, Q_STATES, BEST_DISTANCE, GENERATION, UPDATED = range(len(FIELDS))
+
+# Cómo se agrega cada métrica entre workers
+COUNTERS = {"steps": STEPS, "frames": FRAMES, "resets": RESETS}
+GAUGES = {"epsilon": (EPSILON, np.mean), "q_states": (Q_STATES, np.max),
+          "best_distance": (BEST_DISTANCE, np.max), "generation": (GENERATION, np.sum)}
+
+
+class TelemetrySlot:
+    """Fila de contadores de un worker. Se puede pasar a otro proceso (se re-adjunta)."""
+
+    def __init__(self, name, n_workers, worker_id):
+        self.name = name
+        self.n_workers = n_workers
+        self.worker_id = worker_id
+        self.shm = shared_memory.SharedMemory(name=name)
+        self.row = np.ndarray((n_workers, len(FIELDS)), dtype=np.float64, buffer=self.shm.buf)[worker_id]
+
+    def __getstate__(self):
+        return (self.name, self.n_workers, self.worker_id)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def record_step(self, frame_count):
+        """Llamar en cada paso del agente (solo aritmética sobre la fila)."""
+        self.row[STEPS] += 1
+        self.row[FRAMES] = frame_count
+
+    def record_episode(self, epsilon, q_states, best_distance, generation):
+        """Llamar al terminar cada generación."""
+        row = self.row
+        row[RESETS] += 1
+        row[EPSILON] = epsilon
+        row[Q_STATES] = q_states
+        row[BEST_DISTANCE] = best_distance
+        row[GENERATION] = generation
+        row[UPDATED] = time.time()
+
+    def close(self):
+        self.row = None
+        self.shm.close()
+
+
+class Telemetry:
+    """Contadores compartidos de todos los workers + servidor HTTP de lectura."""
+
+    def __init__(self, n_workers=1):
+        self.n_workers = n_workers
+        nbytes = n_workers * len(FIELDS) * np.dtype(np.float64).itemsize
+        self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.table = np.ndarray((n_workers, len(FIELDS)), dtype=np.float64, buffer=self.shm.buf)
+        self.table[:] = 0.0
+        self.server = None
+        self.threads = []
+        self.rates = {name: 0.0 for name in COUNTERS}
+        self.stop_event = threading.Event()
+
+    def slot(self, worker_id=0):
+        return TelemetrySlot(self.shm.name, self.n_workers, worker_id)
+
+    def snapshot(self):
+        """Métricas agregadas entre workers y el detalle por worker."""
+        table = self.table.copy()
+        active = table[:, UPDATED] > 0
+        metrics = {name: float(table[:, column].sum()) for name, column in COUNTERS.items()}
+        for name, (column, reduce) in GAUGES.items():
+            values = table[active, column]
+            metrics[name] = float(reduce(values)) if len(values) else 0.0
+        metrics.update({f"{name}_per_second": rate for name, rate in self.rates.items()})
+        metrics["workers"] = [dict(zip(FIELDS, map(float, row))) for row in table]
+        return metrics
+
+    def prometheus(self):
+        """Texto en formato de exposición de Prometheus."""
+        snap = self.snapshot()
+        lines = []
+        for name in COUNTERS:
+            lines.append(f"# TYPE mario_{name}_total counter")
+            for worker, row in enumerate(snap["workers"]):
+                lines.append(f'mario_{name}_total{{worker="{worker}"}} {row[name]:.0f}')
+            lines.append(f"# TYPE mario_all_{name}_total counter")
+            lines.append(f"mario_all_{name}_total {snap[name]:.0f}")
+            lines.append(f"# TYPE mario_all_{name}_per_second gauge")
+            lines.append(f"mario_all_{name}_per_second {snap[name + '_per_second']:.2f}")
+        for name in GAUGES:
+            lines.append(f"# TYPE mario_{name} gauge")
+            for worker, row in enumerate(snap["workers"]):
+                lines.append(f'mario_{name}{{worker="{worker}"}} {row[name]:g}')
+            lines.append(f"# TYPE mario_all_{name} gauge")
+            lines.append(f"mario_all_{name} {snap[name]:g}")
+        return "\n".join(lines) + "\n"
+
+    def _sample_rates(self):
+        """Hilo de fondo: recalcula las tasas por segundo cada RATE_WINDOW."""
+        columns = list(COUNTERS.values())
+        previous = self.table[:, columns].sum(axis=0)
+        previous_time = time.perf_counter()
+        while not self.stop_event.wait(RATE_WINDOW):
+            current = self.table[:, columns].sum(axis=0)
+            now = time.perf_counter()
+            for name, delta in zip(COUNTERS, current - previous):
+                self.rates[name] = float(delta) / (now - previous_time)
+            previous, previous_time = current, now
+
+    def serve(self, host=HOST, port=PORT):
+        """
+        Arranca el servidor HTTP y el muestreador en hilos de fondo (daemon).
+        Devuelve (host, puerto), o None si no se pudo abrir el puerto.
+        """
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, content_type = telemetry.prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, content_type = json.dumps(telemetry.snapshot()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass  # Sin logs por petición: la terminal es para el entrenamiento
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as error:
+            print(f"⚠️  Telemetría desactivada: no se pudo abrir {host}:{port} ({error.strerror or error})")
+            return None
+        self.threads = [threading.Thread(target=self.server.serve_forever, daemon=True),
+                        threading.Thread(target=self._sample_rates, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+        return self.server.server_address
+
+    def close(self):
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        for thread in self.threads:
+            thread.join()   # El muestreador lee self.table: esperar antes de soltarla
+        self.table = None
+        self.shm.close()
+        self.shm.unlink()
@@ -0,0 +1,36 @@
+"""Fixtures comunes: ROM sintética para probar sin la ROM real del juego."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_test_rom():
+    """ROM de 32 KiB con cabecera válida cuyo programa es un bucle infinito."""
+    rom = bytearray(32768)
+    rom[0x100:0x104] = bytes([0x00, 0xC3, 0x50, 0x01])   # nop; jp 0x0150
+    rom[0x134:0x134 + 7] = b"TESTROM"
+    checksum = 0
+    for b in rom[0x134:0x14D]:
+        checksum = (checksum - b - 1) & 0xFF
+    rom[0x14D] = checksum
+    rom[0x150:0x153] = bytes([0xC3, 0x50, 0x01])         # jp 0x0150
+    return bytes(rom)
+
+
+@pytest.fixture(scope="session")
+def test_rom(tmp_path_factory):
+    path = tmp_path_factory.mktemp("rom") / "test.gb"
+    path.write_bytes(build_test_rom())
+    return str(path)
+
+
+@pytest.fixture
+def pyboy(test_rom):
+    from pyboy import PyBoy
+    emulator = PyBoy(test_rom, window="null", sound_emulated=False)
+    yield emulator
+    emulator.stop(save=False)
@@ -0,0 +1,28 @@
+import pytest
+
+from action_macros import DEFAULT_MACROS, FINE_MACROS, Macro
+
+
+@pytest.mark.parametrize("holds", [
+    [("A", 4, 4)],                       # Cero frames
+    [("A", 6, 2)],                       # Negativo
+    [("A", -1, 3)],
+    [("A", 0, 8), ("A", 4, 12)],         # Solapados
+    [("A", 0, 4), ("A", 4, 8)],          # Se pulsa el mismo frame en que se suelta
+    [("JUMP", 0, 4)],
+])
+def test_invalid_holds_are_rejected(holds):
+    with pytest.raises(ValueError):
+        Macro("bad", holds)
+
+
+def test_combo_rejects_zero_hold():
+    with pytest.raises(ValueError):
+        Macro.combo("bad", ["A"], hold=0)
+
+
+def test_valid_macros_compile():
+    macro = Macro("double_tap", [("A", 0, 4), ("A", 6, 10), ("RIGHT", 0, 10)])
+    assert macro.length == 11
+    assert sum(frames for _, frames in macro.segments) == macro.length
+    assert len(FINE_MACROS) == len(DEFAULT_MACROS) + 5
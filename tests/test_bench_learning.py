@@ -0,0 +1,49 @@
+from pyboy.utils import WindowEvent
+
+from bench_learning import AIR_STATES, TAKEOFF_AIR, BenchAgent, SyntheticGame, run_seed
+from main import ADDR_SCROLL_PAGE, ADDR_SCROLL_X, ADDR_STATUS
+
+
+def global_x(game):
+    return game.memory[ADDR_SCROLL_X] + game.memory[ADDR_SCROLL_PAGE] * 256
+
+
+def test_synthetic_game_pits_and_soft_reset():
+    game = SyntheticGame(pits=[(20, 8)])
+    game.send_input(WindowEvent.PRESS_ARROW_RIGHT)
+    game.tick(19)
+    assert global_x(game) == 19 and game.memory[ADDR_STATUS] == 0
+    game.tick(1)
+    assert game.memory[ADDR_STATUS] == 1
+
+    for event in (WindowEvent.PRESS_BUTTON_A, WindowEvent.PRESS_BUTTON_B,
+                  WindowEvent.PRESS_BUTTON_START, WindowEvent.PRESS_BUTTON_SELECT):
+        game.send_input(event)
+    game.tick(1)
+    assert global_x(game) == 0 and game.memory[ADDR_STATUS] == 0
+
+
+def test_synthetic_game_jump_clears_pit():
+    game = SyntheticGame(pits=[(20, 8)])
+    game.send_input(WindowEvent.PRESS_ARROW_RIGHT)
+    game.tick(15)
+    game.send_input(WindowEvent.PRESS_BUTTON_A)
+    game.tick(30)
+    assert global_x(game) == 45 and game.memory[ADDR_STATUS] == 0
+
+
+def test_synthetic_run_is_reproducible():
+    first = run_seed(3, 20000, None, {"lam": 0.9}, synthetic=True)
+    second = run_seed(3, 20000, None, {"lam": 0.9}, synthetic=True)
+    assert first["curve"] and [c[::2] for c in first["curve"]] == [c[::2] for c in second["curve"]]
+
+
+def test_air_state_encodes_frames_in_the_air():
+    game = SyntheticGame(pits=[])
+    agent = BenchAgent(None, verbose=False, emulator=game, air_state=True)
+    game.send_input(WindowEvent.PRESS_ARROW_RIGHT)
+    game.tick(25)
+    assert agent.get_state() == 2 * AIR_STATES
+    game.send_input(WindowEvent.PRESS_BUTTON_A)
+    game.tick(1)
+    assert agent.get_state() == 2 * AIR_STATES + TAKEOFF_AIR
@@ -0,0 +1,67 @@
+import types
+
+import pytest
+
+import dashboard
+from dashboard import STYLES, Dashboard
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(dashboard, "time", types.SimpleNamespace(perf_counter=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def dash(capsys):
+    dash = Dashboard("PRUEBA", ["a ", "b ", "c "], columns=3)
+    dash.stop_event.set()          # Sin hilo de refresco: el test llama a redraw()
+    dash.start()
+    dash.thread.join()
+    dash.redraw()                  # Primera pasada: limpia las líneas de estado
+    capsys.readouterr()
+    return dash
+
+
+def test_start_draws_every_cell(capsys):
+    dash = Dashboard("PRUEBA", ["a ", "b "], columns=2)
+    dash.stop_event.set()
+    dash.start()
+    out = capsys.readouterr().out
+    assert "PRUEBA" in out and dash._cell(0, 0, 0) in out and dash._cell(1, 0, 0) in out
+
+
+def test_redraw_only_rewrites_changed_cells(dash, clock, capsys):
+    dash.redraw()
+    assert capsys.readouterr().out == ""
+    dash.values[1] = 7
+    dash.redraw()
+    assert capsys.readouterr().out == dash._cell(1, 7, 2)
+    dash.redraw()
+    assert capsys.readouterr().out == ""
+
+
+def test_highlight_decays_then_stops_redrawing(dash, clock, capsys):
+    dash.values[2] = 42
+    dash.redraw()
+    assert STYLES[2] in capsys.readouterr().out
+    clock[0] += dashboard.HIGHLIGHT_DECAY[0] + 0.1
+    dash.redraw()
+    assert capsys.readouterr().out == dash._cell(2, 42, 1)
+    clock[0] += dashboard.HIGHLIGHT_DECAY[1]
+    dash.redraw()
+    assert capsys.readouterr().out == dash._cell(2, 42, 0)
+    dash.redraw()
+    assert capsys.readouterr().out == ""
+
+
+def test_status_lines_are_rewritten_and_cleared(dash, clock, capsys):
+    dash.status[1] = "aviso"
+    dash.redraw()
+    assert capsys.readouterr().out == dash._move(dash.rows + dashboard.HEADER_LINES + 3, 1) + "\x1b[2Kaviso"
+    dash.redraw()
+    assert capsys.readouterr().out == ""
+    dash.status[1] = ""
+    dash.redraw()
+    assert capsys.readouterr().out == dash._move(dash.rows + dashboard.HEADER_LINES + 3, 1) + "\x1b[2K"
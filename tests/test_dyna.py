@@ -0,0 +1,60 @@
+from dyna import DynaModel, PrioritizedSweeping
+
+
+def table(n_states=8, n_actions=2):
+    return {state: [0.0] * n_actions for state in range(n_states)}
+
+
+def test_model_averages_rewards_and_next_states():
+    model = DynaModel()
+    model.observe(0, 1, 10.0, 1)
+    model.observe(0, 1, 0.0, 2)
+    q_table = table()
+    q_table[1] = [4.0, 0.0]
+    assert model.expected_target(q_table, 0, 1, gamma=0.5) == (10.0 + 0.5 * 4.0) / 2
+    assert model.predecessors[1] == {(0, 1)} and model.predecessors[2] == {(0, 1)}
+
+
+def test_plan_pops_largest_bellman_error_first():
+    q_table = table()
+    planner = PrioritizedSweeping(q_table, alpha=0.5, gamma=0.9)
+    planner.observe(0, 0, 10.0, 1)
+    planner.observe(2, 0, 100.0, 3)
+    planner.observe(4, 1, 50.0, 5)
+    assert planner.plan(1) == 1
+    assert q_table[2][0] == 50.0 and q_table[4][1] == 0.0 and q_table[0][0] == 0.0
+    planner.plan(1)
+    assert q_table[4][1] == 25.0 and q_table[0][0] == 0.0
+
+
+def test_update_pushes_predecessors():
+    q_table = table()
+    planner = PrioritizedSweeping(q_table, alpha=0.5, gamma=0.9)
+    planner.observe(0, 0, 0.0, 1)     # Error 0: no se encola
+    planner.observe(1, 0, 10.0, 2)
+    assert list(planner.queued) == [(1, 0)]
+    planner.plan(1)
+    assert q_table[1][0] == 5.0
+    assert planner.queued == {(0, 0): 0.9 * 5.0}
+    planner.plan(1)
+    assert q_table[0][0] == 0.5 * 0.9 * 5.0
+
+
+def test_threshold_cuts_small_errors():
+    q_table = table()
+    planner = PrioritizedSweeping(q_table, alpha=0.5, gamma=0.9, threshold=1.0)
+    planner.observe(0, 0, 0.5, 1)
+    assert planner.plan(10) == 0 and q_table[0][0] == 0.0
+    planner.observe(2, 0, 2.0, 3)
+    assert planner.plan(10) == 1
+
+
+def test_plan_respects_step_budget():
+    q_table = table(n_states=12)
+    planner = PrioritizedSweeping(q_table, alpha=0.5, gamma=0.9)
+    for state in range(0, 10, 2):
+        planner.observe(state, 0, 10.0 + state, state + 1)
+    assert planner.plan(3) == 3
+    assert planner.updates == 3
+    assert sum(q_table[state][0] != 0.0 for state in range(0, 10, 2)) == 3
+    assert planner.plan(10) == 2 and planner.updates == 5
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pytest
+
+from episode_store import EpisodeStore, EPISODE_DTYPE
+
+
+def fill(store, n, start=0):
+    for i in range(start, start + n):
+        store.append(generation=i, max_distance=i * 10, dead=True, death_x=i)
+
+
+def test_reopen_truncates_columns_to_committed_rows(tmp_path):
+    store = EpisodeStore(str(tmp_path), batch_size=4)
+    fill(store, 8)
+    store.close()
+    # Volcado interrumpido: solo las primeras columnas recibieron el lote siguiente
+    for name in EPISODE_DTYPE.names[:3]:
+        with open(tmp_path / f"{name}.bin", "ab") as f:
+            f.write(np.zeros(4, dtype=EPISODE_DTYPE[name]).tobytes())
+
+    store = EpisodeStore(str(tmp_path), batch_size=4)
+    assert len(store) == 8
+    for name in EPISODE_DTYPE.names:
+        assert os.path.getsize(tmp_path / f"{name}.bin") == 8 * EPISODE_DTYPE[name].itemsize
+    fill(store, 4, start=8)
+    store.close()
+    assert len(store) == 12
+    assert list(store.column("generation")) == list(range(12))
+
+
+def test_writer_error_is_raised_on_next_append(tmp_path, monkeypatch):
+    store = EpisodeStore(str(tmp_path), batch_size=2)
+
+    def broken_commit(rows):
+        raise OSError("disco lleno")
+
+    monkeypatch.setattr(store, "_commit", broken_commit)
+    fill(store, 2)
+    store.writer.join(5)
+    with pytest.raises(RuntimeError, match="disco lleno"):
+        fill(store, 1)
+    with pytest.raises(RuntimeError, match="disco lleno"):
+        store.close()
@@ -0,0 +1,49 @@
+import io
+
+import pytest
+
+from action_macros import FINE_MACROS
+from bench_learning import SyntheticGame
+from evaluate import Evaluator, play_episode
+from main import ADDR_LEVEL, ADDR_WORLD, MarioAgent
+
+
+class LevelGame(SyntheticGame):
+    """Pasillo sin fosos: mundo/nivel basura en x 100-119 y el 1-2 a partir de x 300."""
+
+    def _write(self):
+        super()._write()
+        if 100 <= self.x < 120:
+            self.memory[ADDR_WORLD], self.memory[ADDR_LEVEL] = 0x39, 0
+        else:
+            self.memory[ADDR_WORLD], self.memory[ADDR_LEVEL] = 1, 2 if self.x >= 300 else 1
+
+
+@pytest.fixture
+def evaluator(test_rom):
+    evaluator = Evaluator(test_rom, processes=1, seed=0, agent_kwargs={"actions": FINE_MACROS, "enemy_aware": True})
+    yield evaluator
+    evaluator.close()
+
+
+def test_evaluator_uses_agent_kwargs(evaluator):
+    # Acción 10 solo existe con FINE_MACROS: con el agente por defecto daría IndexError
+    q_table = {state: [0.0] * 10 + [1.0] for state in range(0, 6554 * 6)}
+    summary = evaluator.evaluate(q_table, episodes=2)
+    assert summary["episodes"] == 2
+    assert evaluator.pending[-1].snapshot is None
+
+
+def test_evaluator_rejects_mismatched_table(evaluator):
+    with pytest.raises(ValueError, match="acciones"):
+        evaluator.submit({0: [0.0] * 6})
+
+
+def test_completion_uses_validated_level_changes():
+    game = LevelGame(pits=[])
+    agent = MarioAgent(None, verbose=False, emulator=game)
+    buffer = io.BytesIO()
+    game.save_state(buffer)
+    result = play_episode(agent, buffer.getvalue(), {}, 0)
+    assert result["completed"] and not result["dead"]
+    assert result["distance"] >= 300   # No cortó en los valores basura de x 100-119
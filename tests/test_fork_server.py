@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from fork_server import ForkServer, ping_task, train_task
+from shared_qtable import SharedQTable, table_shape
+
+
+def crash_task(agent):
+    raise RuntimeError("fallo a propósito")
+
+
+def hard_exit_task(agent):
+    os._exit(3)
+
+
+@pytest.fixture
+def shared_server(test_rom):
+    q_table = SharedQTable(*table_shape())
+    server = ForkServer(test_rom, q_table=q_table)
+    server.start()
+    yield server, q_table
+    server.close()
+    q_table.close()
+
+
+def test_spawn_ping_round_trip(test_rom):
+    server = ForkServer(test_rom)
+    server.start()
+    try:
+        handles = [server.spawn(ping_task, seed=i) for i in range(3)]
+        frames = [handle.result(timeout=30) for handle in handles]
+        assert len({handle.pid for handle in handles}) == 3
+        assert len(set(frames)) == 1 and frames[0] > 0   # Todos parten del mismo estado listo
+    finally:
+        server.close()
+
+
+def test_train_task_updates_the_shared_table(shared_server):
+    server, q_table = shared_server
+    assert len(q_table) == 0
+    # En la ROM de prueba no hay avance: a los 100 pasos quieto llega la penalización
+    stats = server.spawn(train_task, 0.5, 120, seed=1).result(timeout=60)
+    assert stats["steps"] == 120
+    assert len(q_table) > 0
+
+
+def test_train_task_without_shared_table_fails(test_rom):
+    server = ForkServer(test_rom)
+    server.start()
+    try:
+        with pytest.raises(RuntimeError, match="SharedQTable"):
+            server.spawn(train_task, 0.5, 10).result(timeout=30)
+    finally:
+        server.close()
+
+
+def test_crashed_child_is_reported(shared_server):
+    server, _ = shared_server
+    with pytest.raises(RuntimeError, match="fallo a propósito"):
+        server.spawn(crash_task).result(timeout=30)
+    with pytest.raises(RuntimeError, match="sin devolver resultado"):
+        server.spawn(hard_exit_task).result(timeout=30)
+    assert server.spawn(ping_task).result(timeout=30) > 0   # La plantilla sigue viva
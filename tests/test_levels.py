@@ -0,0 +1,148 @@
+import pickle
+import queue
+
+from pyboy.utils import WindowEvent
+
+from bench_learning import SyntheticGame
+from levels import LevelLibrary, level_worker
+from shared_qtable import SharedQTable, table_shape
+from main import (ADDR_LEVEL, ADDR_SCROLL_PAGE, ADDR_SCROLL_X, ADDR_WORLD, LEVEL_CONFIRM_STEPS,
+                  LEVEL_MIN_DISTANCE, MarioAgent, level_index)
+
+
+class RecordingStore:
+    def __init__(self):
+        self.rows = []
+
+    def append(self, **row):
+        self.rows.append(row)
+
+
+def test_chunk_boundary_closes_episode(test_rom):
+    store = RecordingStore()
+    agent = MarioAgent(test_rom, window="null", verbose=False, episode_store=store, lam=0.9)
+    agent.run(max_steps=20)
+    agent.stuck_frames = 50
+    agent.total_reward = 123.0
+    agent.abandon_episode()
+
+    assert [row["steps"] for row in store.rows] == [20]
+    assert store.rows[0]["dead"] is False
+    assert agent.generation == 2
+    assert (agent.stuck_frames, agent.total_reward, agent.max_distance) == (0, 0, 0)
+    assert len(agent.traces) == 0
+
+    agent.run(max_steps=10)
+    agent.abandon_episode()
+    assert [row["steps"] for row in store.rows] == [20, 10]
+    agent.pyboy.stop(save=False)
+
+
+def set_level(agent, world, level, x=0):
+    agent.memory[ADDR_WORLD] = world
+    agent.memory[ADDR_LEVEL] = level
+    agent.memory[ADDR_SCROLL_X] = x % 256
+    agent.memory[ADDR_SCROLL_PAGE] = x // 256
+
+
+def test_level_index_rejects_garbage():
+    assert level_index(1, 1) == 0
+    assert level_index(2, 3) == 5
+    assert level_index(0, 1) is None
+    assert level_index(5, 1) is None
+    assert level_index(1, 0xFF) is None
+
+
+def test_level_change_needs_progress_and_confirmation(test_rom, tmp_path):
+    library = LevelLibrary(str(tmp_path))
+    agent = MarioAgent(test_rom, window="null", verbose=False, level_aware=True, level_library=library)
+    set_level(agent, 1, 1)
+    agent.current_level = 0
+
+    # Salto a un nivel no consecutivo o sin haber avanzado: se ignora
+    set_level(agent, 3, 2)
+    agent.check_level()
+    set_level(agent, 1, 2)
+    agent.check_level()
+    assert agent.current_level == 0 and agent.pending_level is None
+
+    set_level(agent, 1, 1, x=LEVEL_MIN_DISTANCE)
+    agent.check_level()
+    # Cambio espurio que vuelve enseguida: ni completado ni save-state
+    set_level(agent, 1, 2)
+    for _ in range(LEVEL_CONFIRM_STEPS - 1):
+        agent.check_level()
+    set_level(agent, 1, 1, x=LEVEL_MIN_DISTANCE)
+    agent.check_level()
+    assert agent.level_completions == {} and library.levels() == []
+
+    set_level(agent, 1, 2)
+    for _ in range(LEVEL_CONFIRM_STEPS):
+        agent.check_level()
+    assert agent.current_level == 1
+    assert agent.level_completions == {0: 1}
+    assert library.levels() == [1]
+    agent.pyboy.stop(save=False)
+
+
+class TitleGame(SyntheticGame):
+    """SyntheticGame con pantalla de título (mundo/nivel 0) y pausa: START alterna como en el juego."""
+
+    def __init__(self):
+        self.mode = "title"
+        self.start_was_held = False
+        self.paused_frames = 0
+        super().__init__(pits=[])
+
+    def _restart(self):
+        super()._restart()
+        self.mode = "title"
+
+    def _write(self):
+        super()._write()
+        in_game = self.mode != "title"
+        self.memory[ADDR_WORLD], self.memory[ADDR_LEVEL] = (1, 1) if in_game else (0, 0)
+
+    def _frame(self):
+        start = "START" in self.held
+        if start and not self.start_was_held:
+            self.mode = {"title": "playing", "playing": "paused", "paused": "playing"}[self.mode]
+        self.start_was_held = start
+        if self.mode == "paused":
+            self.paused_frames += 1
+        if self.mode == "playing" or {"A", "B", "START", "SELECT"} <= self.held:
+            super()._frame()
+
+    def save_state(self, f):
+        pickle.dump((self.x, self.air, self.boost, self.a_was_held, self.dying, self.mode, self.start_was_held), f)
+
+    def load_state(self, f):
+        (self.x, self.air, self.boost, self.a_was_held, self.dying,
+         self.mode, self.start_was_held) = pickle.load(f)
+        self._write()
+
+
+def test_title_game_start_pauses_a_running_game():
+    game = TitleGame()
+    for mode in ("playing", "paused"):
+        game.send_input(WindowEvent.PRESS_BUTTON_START)
+        game.tick(2)
+        game.send_input(WindowEvent.RELEASE_BUTTON_START)
+        game.tick(2)
+        assert game.mode == mode
+
+
+def test_bootstrap_chunks_start_from_power_on(tmp_path):
+    game = TitleGame()
+    q_table = SharedQTable(*table_shape(level_aware=True))
+    tasks, results = queue.Queue(), queue.Queue()
+    for task in ((None, 20), (None, 20), None):
+        tasks.put(task)
+    level_worker(q_table, 0, 0.5, None, str(tmp_path), {"emulator": game}, tasks, results)
+
+    first, second = results.get(), results.get()
+    assert first["attempts"] == {0: 1} and second["attempts"] == {0: 1}
+    assert game.paused_frames == 0
+    library = LevelLibrary(str(tmp_path))
+    assert library.levels() == [0]
+    assert pickle.loads(library.load(0))[5] == "playing"
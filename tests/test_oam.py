@@ -0,0 +1,24 @@
+import numpy as np
+
+from oam import OAM_END, OAM_START, OAMReader
+from pacing import MemoryRegion, Snapshot
+
+
+def snapshot_with(sprites):
+    raw = np.zeros(OAM_END - OAM_START, dtype=np.uint8)
+    for slot, (x, y) in sprites.items():
+        raw[slot * 4:slot * 4 + 2] = (y, x)
+    return Snapshot(1, MemoryRegion(OAM_START, raw), 0.0)
+
+
+def test_player_position_and_enemies_share_the_oam_space():
+    oam = OAMReader(snapshot_with({0: (40, 100), 1: (48, 100), 2: (40, 108), 3: (48, 108), 7: (90, 104)}))
+    assert oam.player_position((0, 1, 2, 3)) == (40, 100)
+    others = oam.others(40, 100)
+    assert others["slot"].tolist() == [7]
+    assert oam.nearest_enemy_ahead(40, 100) == (50, 4)
+
+
+def test_player_not_visible():
+    oam = OAMReader(snapshot_with({7: (90, 104)}))
+    assert oam.player_position((0, 1, 2, 3)) is None
@@ -0,0 +1,40 @@
+import threading
+
+from pacing import PacedEmulator
+
+
+def failing_analysis(snapshot):
+    if snapshot.frame_count >= 4:
+        raise RuntimeError("fallo de análisis")
+
+
+def test_failing_consumer_does_not_block_emulation(pyboy):
+    paced = PacedEmulator(pyboy, speed=0, render=False)
+    consumer = paced.add_consumer(failing_analysis, 0xC000, 0xC010, maxsize=1, policy="block")
+    runner = threading.Thread(target=paced.run, args=(50,), daemon=True)
+    runner.start()
+    runner.join(10)
+    assert not runner.is_alive(), "el emulador se quedó esperando al consumidor"
+    stats = paced.close()
+    assert stats["frames"] == 50
+    assert consumer.thread.is_alive() is False
+    assert stats["consumers"][0]["processed"] == 50
+    assert stats["consumers"][0]["errors"] == 50 - 3
+
+
+def test_failing_consumer_keeps_analysing_with_drop_policy(pyboy):
+    seen = []
+
+    def flaky(snapshot):
+        seen.append(snapshot.frame_count)
+        if snapshot.frame_count % 2:
+            raise ValueError("impar")
+
+    paced = PacedEmulator(pyboy, speed=0, render=False)
+    paced.add_consumer(flaky, 0xC000, 0xC010, maxsize=64, policy="drop_newest")
+    paced.run(max_frames=20)
+    stats = paced.close()
+    consumer = stats["consumers"][0]
+    assert consumer["processed"] + consumer["dropped"] == 20
+    assert consumer["errors"] == sum(1 for frame in seen if frame % 2)
+    assert max(seen) == pyboy.frame_count
@@ -0,0 +1,88 @@
+import socket
+
+import numpy as np
+import pytest
+
+from bench_learning import SyntheticGame
+from param_server import (HELLO, OP_HELLO, OP_PUSH, PUSH_HEADER, REPLY_ERROR, REPLY_OK, VERSION, ParameterClient,
+                          ParameterServer, encode_entries, make_remote_agent, recv_exact)
+
+
+def test_single_update_is_pushed_once():
+    server = ParameterServer(n_states=16, n_actions=6)
+    host, port = server.serve(port=0)
+    client = ParameterClient(host, port, n_states=16, n_actions=6)
+    client.table[3][2] = 0.1 + 1e-12   # No representable en float32
+    pushes = []
+    for _ in range(4):
+        client.sync()
+        pushes.append(client.stats["pushes"])
+    assert pushes == [1, 1, 1, 1]
+    assert np.isclose(server.table[3][2], 0.1)
+    client.close()
+    server.close()
+
+
+def test_two_clients_combine_deltas():
+    server = ParameterServer(n_states=16, n_actions=6)
+    host, port = server.serve(port=0)
+    a = ParameterClient(host, port, n_states=16, n_actions=6)
+    b = ParameterClient(host, port, n_states=16, n_actions=6)
+    a.table[1][0] += 0.5
+    b.table[1][0] += 0.25
+    a.sync()
+    b.sync()
+    a.sync()
+    assert np.isclose(server.table[1][0], 0.75)
+    assert np.isclose(a.table[1][0], 0.75) and np.isclose(b.table[1][0], 0.75)
+    assert server.stats["bytes_in"] > 0 and server.stats["bytes_out"] > 0
+    a.close()
+    b.close()
+    server.close()
+
+
+def test_client_with_other_shape_is_rejected():
+    server = ParameterServer(n_states=16, n_actions=6)
+    host, port = server.serve(port=0)
+    with pytest.raises(ValueError, match="16, 6"):
+        ParameterClient(host, port, n_states=16, n_actions=11)
+    client = ParameterClient(host, port, n_states=16, n_actions=6)
+    client.close()
+    server.close()
+
+
+def test_remote_agent_needs_a_table_sized_for_its_states():
+    server = ParameterServer(n_states=16, n_actions=6)
+    host, port = server.serve(port=0)
+    client = ParameterClient(host, port, n_states=16, n_actions=6)
+    with pytest.raises(ValueError, match="table_shape"):
+        make_remote_agent(None, client, emulator=SyntheticGame())
+    client.close()
+    server.close()
+
+
+def test_malformed_push_is_rejected_and_table_untouched():
+    server = ParameterServer(n_states=16, n_actions=6)
+    with pytest.raises(ValueError, match="fuera de la tabla"):
+        server.push(0, np.array([3, 96]), np.array([1.0, 1.0]))
+    with pytest.raises(ValueError, match="deltas"):
+        server.push(0, np.array([3]), np.array([1.0, 2.0]))
+    with pytest.raises(ValueError, match="no finitos"):
+        server.push(0, np.array([3]), np.array([np.nan]))
+    assert not server.table.array.any() and server.version == 0
+
+    host, port = server.serve(port=0)
+    with socket.create_connection((host, port)) as sock:
+        sock.sendall(OP_HELLO + HELLO.pack(16, 6))
+        assert recv_exact(sock, 1 + HELLO.size)[:1] == REPLY_OK
+        bad = encode_entries(np.array([2, 10_000]), np.array([1.0, 1.0]))
+        sock.sendall(OP_PUSH + PUSH_HEADER.pack(0, 2) + bad)
+        assert recv_exact(sock, 1 + VERSION.size)[:1] == REPLY_ERROR
+    assert not server.table.array.any() and server.stats["rejected"] == 4
+
+    client = ParameterClient(host, port, n_states=16, n_actions=6)   # El servidor sigue sirviendo
+    client.table[1][0] = 0.5
+    client.sync()
+    assert np.isclose(server.table[1][0], 0.5)
+    client.close()
+    server.close()
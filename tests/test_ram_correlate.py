@@ -0,0 +1,50 @@
+import numpy as np
+
+from ram_correlate import ADDRESSES, rank_addresses
+
+FRAMES = 400
+
+
+def column(address):
+    return int(np.flatnonzero(ADDRESSES == address)[0])
+
+
+def noise_ram(seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (FRAMES, len(ADDRESSES)), dtype=np.uint8)
+
+
+def test_planted_byte_ranks_first():
+    rng = np.random.default_rng(1)
+    target = rng.integers(0, 200, FRAMES)
+    ram = noise_ram()
+    ram[:, column(0xC123)] = target + rng.integers(0, 8, FRAMES)
+    corr, address, kind = rank_addresses(ram, target, top=5)[0]
+    assert (address, kind) == (0xC123, "u8") and corr > 0.95
+
+
+def test_planted_bcd_score_beats_its_bytes():
+    score = np.cumsum(np.random.default_rng(2).integers(0, 40, FRAMES)) % 10000
+    ram = noise_ram()
+    ram[:, column(0xD000)] = (score // 1000) << 4 | (score // 100 % 10)
+    ram[:, column(0xD001)] = (score // 10 % 10) << 4 | (score % 10)
+    corr, address, kind = rank_addresses(ram, score, top=5)[0]
+    assert (address, kind) == (0xD000, "bcd") and corr > 0.999
+
+
+def test_planted_u16le_counter_in_delta_mode():
+    steps = np.random.default_rng(3).integers(0, 3, FRAMES)
+    position = np.cumsum(steps) + 200      # Cruza varias veces el límite de 256
+    ram = noise_ram()
+    ram[:, column(0xC200)] = position & 0xFF
+    ram[:, column(0xC201)] = position >> 8
+    corr, address, kind = rank_addresses(ram, steps, mode="delta", top=5)[0]
+    assert (address, kind) == (0xC200, "u16le") and corr > 0.999
+
+
+def test_pairs_do_not_span_wram_and_hram():
+    target = np.random.default_rng(4).integers(0, 256, FRAMES)
+    ram = noise_ram()
+    ram[:, column(0xDFFF)] = target >> 4
+    ram[:, column(0xFF80)] = target & 0x0F
+    results = rank_addresses(ram, target, top=20)
+    assert not [r for r in results if r[1] == 0xDFFF and r[2] != "u8"]
@@ -0,0 +1,35 @@
+from pyboy.utils import WindowEvent
+
+from rewind import RewindBuffer
+from trace_replay import read_joypad
+
+# (frame, evento): se pulsa y suelta entre capturas para que seek tenga que reproducirlo
+EVENTS = {35: WindowEvent.PRESS_ARROW_RIGHT, 42: WindowEvent.PRESS_BUTTON_A,
+          47: WindowEvent.RELEASE_ARROW_RIGHT, 70: WindowEvent.RELEASE_BUTTON_A}
+
+
+def test_seek_replays_recorded_inputs(pyboy):
+    rewind = RewindBuffer(pyboy, interval=30)
+    recorded = {}
+    for frame in range(1, 91):
+        if frame in EVENTS:
+            pyboy.send_input(EVENTS[frame])
+        pyboy.tick(1, False)
+        rewind.capture()
+        recorded[rewind.frame] = read_joypad(pyboy)
+
+    assert rewind.frames() == (30, 90)
+    for target in (38, 44, 50, 72, 33, 89):
+        assert rewind.seek(target) == target
+        assert read_joypad(pyboy) == recorded[target]
+
+
+def test_seek_without_inputs_snaps_to_capture(pyboy, capsys):
+    rewind = RewindBuffer(pyboy, interval=30)
+    for _ in range(60):
+        pyboy.tick(1, False)
+        rewind.capture()
+    rewind.inputs.clear()
+    first, _ = rewind.frames()
+    assert rewind.seek(first + 10) == first
+    assert "Sin entradas grabadas" in capsys.readouterr().out
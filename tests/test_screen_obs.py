@@ -0,0 +1,33 @@
+import numpy as np
+
+from screen_obs import ScreenObservation
+
+
+def test_source_is_a_cropped_view_of_the_screen():
+    screen = np.zeros((144, 160, 4), dtype=np.uint8)
+    obs = ScreenObservation(screen)
+    assert obs.source.shape == (64, 80)
+    assert np.shares_memory(obs.source, screen)
+    screen[16, 0, 0] = 9
+    assert obs.source[0, 0] == 9
+
+
+def test_stack_wraps_around_oldest_to_newest():
+    screen = np.zeros((144, 160, 4), dtype=np.uint8)
+    obs = ScreenObservation(screen, stack_size=3)
+    obs.reset()
+    for frame in range(1, 9):          # Más de dos vueltas del anillo
+        screen[:] = frame
+        obs.push()
+        expected = [max(0, f) for f in range(frame - 2, frame + 1)]
+        assert obs.stack[:, 0, 0].tolist() == expected
+        assert obs.stack.flags["C_CONTIGUOUS"] and np.shares_memory(obs.stack, obs.ring)
+
+
+def test_reset_fills_the_whole_stack():
+    screen = np.full((144, 160, 4), 5, dtype=np.uint8)
+    obs = ScreenObservation(screen, stack_size=4)
+    obs.push()
+    screen[:] = 7
+    obs.reset()
+    assert (obs.stack == 7).all()
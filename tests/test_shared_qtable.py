@@ -0,0 +1,31 @@
+import pytest
+
+from action_macros import FINE_MACROS
+from shared_qtable import SharedQTable, make_shared_agent, table_shape
+
+
+def test_table_shape_follows_agent_config():
+    n_states, n_actions = table_shape()
+    assert table_shape(enemy_aware=True)[0] > n_states
+    assert table_shape(level_aware=True)[0] > table_shape(enemy_aware=True)[0]
+    assert table_shape(actions=FINE_MACROS) == (n_states, len(FINE_MACROS))
+
+
+@pytest.mark.parametrize("kwargs", [{"enemy_aware": True}, {"actions": FINE_MACROS}])
+def test_undersized_table_is_rejected(test_rom, kwargs):
+    q_table = SharedQTable(*table_shape(), striped=False)
+    try:
+        with pytest.raises(ValueError, match="table_shape"):
+            make_shared_agent(test_rom, q_table, **kwargs)
+    finally:
+        q_table.close()
+
+
+def test_sized_table_trains(test_rom):
+    kwargs = {"enemy_aware": True, "actions": FINE_MACROS}
+    q_table = SharedQTable(*table_shape(**kwargs))
+    agent = make_shared_agent(test_rom, q_table, **kwargs)
+    agent.run(max_steps=20)
+    assert agent.total_steps == 20
+    agent.pyboy.stop(save=False)
+    q_table.close()
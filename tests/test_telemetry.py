@@ -0,0 +1,36 @@
+import socket
+
+from telemetry import Telemetry
+
+
+def test_busy_port_disables_telemetry():
+    with socket.socket() as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        telemetry = Telemetry()
+        assert telemetry.serve(port=busy.getsockname()[1]) is None
+        telemetry.close()
+
+
+def test_aggregates_do_not_share_the_per_worker_name():
+    telemetry = Telemetry(n_workers=2)
+    for worker, steps in enumerate((3, 4)):
+        slot = telemetry.slot(worker)
+        for _ in range(steps):
+            slot.record_step(100)
+        slot.record_episode(0.5, 10, 200, 1)
+        slot.close()
+    lines = telemetry.prometheus().splitlines()
+    assert 'mario_steps_total{worker="0"} 3' in lines
+    assert 'mario_steps_total{worker="1"} 4' in lines
+    assert "mario_all_steps_total 7" in lines
+    assert not [line for line in lines if line.startswith("mario_steps_total ")]
+    telemetry.close()
+
+
+def test_close_waits_for_the_sampler():
+    telemetry = Telemetry()
+    assert telemetry.serve(port=0) is not None
+    threads = list(telemetry.threads)
+    telemetry.close()
+    assert not any(thread.is_alive() for thread in threads)
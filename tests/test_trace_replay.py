@@ -0,0 +1,106 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+from pyboy import PyBoy
+
+from trace_replay import (ADDRESS_MAPS, SYNTHETIC_DYING, SYNTHETIC_RESTART_LIVES, check_semantics, count_deaths,
+                          lives_count, play_inputs, replay, rom_for)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRACES = sorted(glob.glob(os.path.join(ROOT, "input_traces", "*.npz")))
+
+
+def semantics(map_name, lives, score, status=None):
+    lives = np.array(lives)
+    status = np.zeros_like(lives) if status is None else np.array(status)
+    valid = np.ones_like(lives, dtype=bool)
+    return check_semantics(ADDRESS_MAPS[map_name], lives, np.array(score), valid, status)
+
+
+def test_traces_are_committed():
+    assert TRACES, "input_traces/ no tiene trazas"
+    # La traza sintética no depende de ninguna ROM externa: siempre se comprueba
+    assert "synthetic" in [str(np.load(path)["map"]) for path in TRACES]
+
+
+@pytest.mark.parametrize("path", TRACES, ids=os.path.basename)
+def test_trace_replays(path):
+    map_name = str(np.load(path)["map"])
+    rom = ADDRESS_MAPS[map_name]["rom"]
+    if rom is not None and not os.path.exists(os.path.join(ROOT, rom)):
+        pytest.skip(f"falta {rom}")
+    result = replay(path, os.path.join(ROOT, rom) if rom is not None else None)
+    assert result["status"] == "PASS", result["failures"][:10]
+    if map_name == "synthetic":
+        assert result["deaths"] > 10   # Más muertes que vidas iniciales: hubo al menos un Game Over
+
+
+def script(*steps):
+    """Máscaras de joypad por frame a partir de pares (máscara, frames)."""
+    return np.concatenate([np.full(frames, mask, dtype=np.uint8) for mask, frames in steps])
+
+
+@pytest.fixture
+def synthetic():
+    spec = ADDRESS_MAPS["synthetic"]
+    pyboy = PyBoy(rom_for(spec), window="null")
+    pyboy.tick(spec["boot_frames"], False)
+    yield pyboy, spec
+    pyboy.stop(save=False)
+
+
+def test_synthetic_rom_decodes_lives_score_and_status(synthetic):
+    pyboy, spec = synthetic
+    a, b = 0x10, 0x20
+    die = [(b, 2), (0, SYNTHETIC_DYING + 5)]
+    inputs = script((a, 2), (0, 2), (a, 2), (0, 2), *die * 11, (a, 2), (0, 2))
+    values = play_inputs(pyboy, spec, inputs)
+    lives, score, valid, status = values.T
+
+    assert lives[0] == 0x10 and score[7] == 50        # BCD: 0x10 = 10 vidas, 2 x 25 puntos
+    decoded = [lives_count(spec, int(raw)) for raw in lives]
+    changes = [now for before, now in zip(decoded, decoded[1:]) if now != before]
+    assert changes == list(range(9, -1, -1)) + [SYNTHETIC_RESTART_LIVES]
+    assert status.max() == 1 and status[-1] == 0
+    assert score[-1] == 25                             # Game Over: el score vuelve a 0 y suma un A
+    assert count_deaths(spec, lives) == 10
+    assert check_semantics(spec, lives, score, valid, status) == []
+
+    # La misma partida con el contador saltando de 10 a 7 vidas es un fallo de semántica
+    broken = np.where(lives == 0x09, 0x07, lives)
+    failures = check_semantics(spec, broken, score, valid, status)
+    assert failures and "saltan de 0x10 a 0x07" in failures[0][1]
+
+
+def test_bcd_lives_lost_across_ten():
+    # 0x10 -> 0x09 es 10 -> 9 vidas, no un salto de 7
+    lives = [0x10] * 5 + [0x09] * 5
+    status = [0, 0, 1, 1, 0, 0, 0, 0, 0, 0]
+    assert semantics("mario", lives, [100] * 10, status) == []
+    assert count_deaths(ADDRESS_MAPS["mario"], lives) == 1
+
+
+def test_bcd_lives_jump_is_reported():
+    failures = semantics("mario", [0x10] * 3 + [0x07] * 3, [100] * 6, [1] * 6)
+    assert len(failures) == 1 and "saltan" in failures[0][1]
+
+
+def test_mario_score_resets_after_game_over():
+    # Muere con 0 vidas, nueva partida con 2 vidas y score a cero
+    lives = [0x01, 0x01, 0x00, 0x00, 0x00, 0x00, 0x02, 0x02]
+    status = [0, 1, 0, 0, 1, 0, 0, 0]
+    score = [500, 500, 500, 500, 500, 500, 500, 0]
+    assert semantics("mario", lives, score, status) == []
+
+
+def test_mario_score_drop_without_game_over_fails():
+    failures = semantics("mario", [0x02] * 4, [500, 500, 400, 400])
+    assert failures == [(2, "score baja de 500 a 400")]
+
+
+def test_snow_bros_game_over_allows_reset():
+    lives = [1, 0, 0, 255, 255, 3, 3]
+    score = [900, 900, 900, 900, 900, 900, 0]
+    assert semantics("snow_bros", lives, score) == []
@@ -0,0 +1,102 @@
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from bench_learning import SyntheticGame
+from main import MarioAgent
+from shared_qtable import DenseQTable, SharedQTable, make_shared_agent, table_shape
+from traces import EligibilityTraces
+
+
+def test_decay_multiplies_by_gamma_lambda():
+    traces = EligibilityTraces(lam=0.5, gamma=0.8)
+    traces.visit(3, 1)
+    traces.decay()
+    traces.visit(4, 0)
+    assert traces.values[:2].tolist() == pytest.approx([0.4, 1.0])
+    traces.decay()
+    assert traces.values[:2].tolist() == pytest.approx([0.16, 0.4])
+
+
+def test_decay_prunes_below_min_trace():
+    traces = EligibilityTraces(lam=0.5, gamma=1.0, min_trace=0.2)
+    traces.visit(1, 0)
+    traces.decay()
+    traces.visit(2, 0)
+    traces.decay()
+    traces.decay()            # (1, 0): 0.125 < 0.2 -> podada; (2, 0): 0.25
+    assert len(traces) == 1
+    assert traces.active_states() == [2] and traces.values[0] == pytest.approx(0.25)
+
+
+def test_revisit_replaces_instead_of_adding():
+    traces = EligibilityTraces(lam=0.5, gamma=1.0)
+    traces.visit(1, 0)
+    traces.decay()
+    traces.visit(1, 0)
+    assert len(traces) == 1 and traces.values[0] == 1.0
+
+
+def test_full_capacity_evicts_weakest_trace():
+    traces = EligibilityTraces(lam=0.5, gamma=1.0, capacity=3, min_trace=0.0)
+    for state in (10, 11, 12):
+        traces.visit(state, 0)
+        traces.decay()
+    traces.visit(13, 1)       # 10 tiene la traza más débil (0.125)
+    assert len(traces) == 3
+    assert sorted(traces.active_states()) == [11, 12, 13]
+
+
+def test_apply_updates_every_traced_pair():
+    for q_table in ({1: [0.0, 0.0], 2: [0.0, 0.0]}, DenseQTable(4, 2)):
+        traces = EligibilityTraces(lam=0.5, gamma=1.0)
+        traces.visit(1, 0)
+        traces.decay()
+        traces.visit(2, 1)
+        traces.apply(q_table, delta=10.0, alpha=0.1)
+        assert list(q_table[1]) == pytest.approx([0.5, 0.0])
+        assert list(q_table[2]) == pytest.approx([0.0, 1.0])
+
+
+def test_exploratory_action_cuts_traces(monkeypatch):
+    agent = MarioAgent(None, verbose=False, emulator=SyntheticGame(), lam=0.9)
+    agent.q_table[0] = [0.0, 1.0] + [0.0] * (len(agent.actions) - 2)
+    agent.traces.visit(5, 0)
+    monkeypatch.setattr(random, "random", lambda: 0.0)   # Siempre explora (epsilon = 1)
+
+    monkeypatch.setattr(random, "randint", lambda a, b: 1)
+    assert agent.choose_action(0) == 1
+    assert len(agent.traces) == 1      # Aleatoria pero greedy: la traza sigue
+
+    monkeypatch.setattr(random, "randint", lambda a, b: 0)
+    assert agent.choose_action(0) == 0
+    assert len(agent.traces) == 0      # Exploratoria: corte de Watkins
+
+
+def test_shared_update_takes_the_locks_of_traced_states():
+    q_table = SharedQTable(*table_shape(), n_stripes=8)
+    agent = make_shared_agent(None, q_table, emulator=SyntheticGame(), lam=0.9)
+    agent.update_q_table(1, 0, 10.0, 2)
+    with q_table.lock(1):              # Raya del estado con traza, no del actual
+        worker = threading.Thread(target=agent.update_q_table, args=(2, 0, 10.0, 3))
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive()
+        assert q_table[2][0] == 0.0
+    worker.join(5)
+    assert not worker.is_alive()
+    assert q_table[2][0] == pytest.approx(2.0)
+    assert q_table[1][0] == pytest.approx(2.0 + 0.2 * 10.0 * 0.9 * 0.9)   # Traza de (1, 0) tras decaer
+    q_table.close()
+
+
+def test_lock_states_releases_every_stripe():
+    q_table = SharedQTable(16, 2, n_stripes=4)
+    with q_table.lock_states(np.array([1, 5, 2])):
+        pass
+    for lock in q_table.locks:
+        assert lock.acquire(block=False)
+        lock.release()
+    q_table.close()
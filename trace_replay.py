@@ -0,0 +1,462 @@
+"""
+Regresión headless de la semántica de direcciones RAM con trazas de entrada.
+
+verify_fixes.py y manual_check_lives.py comprueban 0xC699, 0xDA15, 0xFF99...
+con una persona jugando y mirando la terminal. Aquí se graba UNA vez una
+traza (save-state inicial + botones pulsados en cada frame) y después se
+reproduce sin ventana a velocidad ilimitada, comprobando en cada frame lo
+que cada mapa de direcciones promete:
+
+- Vidas: solo cambian de 1 en 1 (muerte o vida extra) o pasan al valor de
+  "display vacío" del Game Over. Si el contador es BCD (Mario) se compara
+  el valor decimal: 0x10 -> 0x09 es perder una vida, no un salto.
+- Game Over: display vacío ("lives_empty", Snow Bros) o morir con el
+  contador en "lives_last" (Mario: 0 vidas). Tras un Game Over la nueva
+  partida puede reiniciar las vidas y el score.
+- Score: cada byte es BCD válido (dos dígitos 0-9) y el score nunca baja
+  salvo tras un Game Over.
+- Estado: si el mapa tiene flag de estado, antes de perder una vida el flag
+  tiene que haber marcado "muriendo" en los últimos DEATH_WINDOW frames.
+- Determinismo: la reproducción da los mismos valores que la grabación.
+
+Los botones se leen del registro del joypad (0xFF00) seleccionando cada
+grupo y restaurando el valor del juego, así que se puede grabar jugando con
+teclado en la ventana SDL2 o con entradas aleatorias en modo headless.
+
+Si falta la ROM de una traza, esa traza se salta (no es un fallo). El mapa
+"synthetic" no necesita ROM: build_synthetic_rom genera un programa de Game
+Boy mínimo con la misma semántica que Mario (vidas BCD desde 10, flag de
+muerte, Game Over al morir con 0 vidas, score BCD) manejado por el joypad,
+así que su traza (input_traces/synthetic.npz) ejercita las comprobaciones
+también en una máquina sin las ROMs de los juegos.
+
+USO:
+    python3 trace_replay.py record mario input_traces/mario_muerte.npz
+    python3 trace_replay.py record snow_bros input_traces/sb.npz --random 3000
+    python3 trace_replay.py record synthetic input_traces/synthetic.npz --random 3000
+    python3 trace_replay.py check                  # todas las de input_traces/
+    python3 trace_replay.py check input_traces/sb.npz
+"""
+
+import io
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+import tempfile
+
+import numpy as np
+from pyboy import PyBoy
+from pyboy.utils import WindowEvent
+
+# --- CONFIGURACIÓN ---
+TRACE_DIR = "input_traces"
+DEATH_WINDOW = 180        # Frames antes de perder una vida en los que el flag debe marcar muerte
+RANDOM_HOLD = (4, 30)     # Frames que dura cada combinación en la grabación aleatoria
+
+# Mapas de direcciones que se verifican (los mismos valores que main.py y verify_fixes.py)
+ADDRESS_MAPS = {
+    "mario": {
+        "rom": "roms/super-mario-land.gb",
+        "lives": 0xDA15,
+        "score": [0xC0A0, 0xC0A1, 0xC0A2],
+        "status": 0xFF99,          # 00 = vivo, 01 = muriendo
+        "lives_bcd": True,         # El contador se muestra tal cual: 0x10 = 10 vidas
+        "lives_empty": None,
+        "lives_last": 0,           # Morir con 0 vidas = Game Over
+        "boot_frames": 0,          # Frames que se juegan sin grabar antes de empezar la traza
+    },
+    "snow_bros": {
+        "rom": "roms/snow-bros.gb",
+        "lives": 0xC699,
+        "score": [0xC601, 0xC602, 0xC603],
+        "status": None,
+        "lives_bcd": False,
+        "lives_empty": 255,        # Display de vidas vacío = Game Over
+        "lives_last": None,
+        "boot_frames": 0,
+    },
+    "synthetic": {
+        "rom": None,               # Se genera al vuelo (build_synthetic_rom)
+        "lives": 0xC000,
+        "score": [0xC001, 0xC002, 0xC003],
+        "status": 0xC004,          # 00 = vivo, 01 = muriendo
+        "lives_bcd": True,
+        "lives_empty": None,
+        "lives_last": 0,
+        "boot_frames": 90,         # Animación de arranque de PyBoy: el programa empieza en el frame ~65
+    },
+}
+
+# --- ROM SINTÉTICA ---
+SYNTHETIC_LIVES = 0x10    # Vidas iniciales (BCD): la primera muerte cruza 0x10 -> 0x09
+SYNTHETIC_RESTART_LIVES = 0x03
+SYNTHETIC_DYING = 30      # Frames con el flag de muerte antes de restar la vida
+SYNTHETIC_POINTS = 0x25   # Puntos (BCD) por pulsación de A
+
+# Máscara de joypad: nibble bajo = cruceta, nibble alto = botones
+BUTTONS = [
+    (WindowEvent.PRESS_ARROW_RIGHT, WindowEvent.RELEASE_ARROW_RIGHT),
+    (WindowEvent.PRESS_ARROW_LEFT, WindowEvent.RELEASE_ARROW_LEFT),
+    (WindowEvent.PRESS_ARROW_UP, WindowEvent.RELEASE_ARROW_UP),
+    (WindowEvent.PRESS_ARROW_DOWN, WindowEvent.RELEASE_ARROW_DOWN),
+    (WindowEvent.PRESS_BUTTON_A, WindowEvent.RELEASE_BUTTON_A),
+    (WindowEvent.PRESS_BUTTON_B, WindowEvent.RELEASE_BUTTON_B),
+    (WindowEvent.PRESS_BUTTON_SELECT, WindowEvent.RELEASE_BUTTON_SELECT),
+    (WindowEvent.PRESS_BUTTON_START, WindowEvent.RELEASE_BUTTON_START),
+]
+RANDOM_MASKS = [0x00, 0x01, 0x11, 0x21, 0x31, 0x10, 0x02, 0x20]   # Combinaciones para --random
+
+
+def _assemble(program, origin):
+    """Bytes de `program`: bytes sueltos, "etiqueta:" o (opcode_jr, "etiqueta") / ("jp", "etiqueta")."""
+    jump = lambda item: len(item) == 2 and isinstance(item[1], str)
+    labels, address = {}, origin
+    for item in program:
+        if isinstance(item, str):
+            labels[item.rstrip(":")] = address
+        else:
+            address += 3 if item[0] == "jp" else len(item)
+    code = bytearray()
+    for item in program:
+        if isinstance(item, str):
+            continue
+        if item[0] == "jp":
+            target = labels[item[1]]
+            code += bytes([0xC3, target & 0xFF, target >> 8])
+        elif jump(item):
+            offset = labels[item[1]] - (origin + len(code) + 2)
+            assert -128 <= offset < 128, f"salto relativo demasiado largo a {item[1]}"
+            code += bytes([item[0], offset & 0xFF])
+        else:
+            code += bytes(item)
+    return bytes(code)
+
+
+def build_synthetic_rom():
+    """
+    ROM de 32 KiB que, una vez por frame, lee A y B del joypad: pulsar A suma
+    SYNTHETIC_POINTS al score (C001-C003, BCD) y pulsar B pone el flag de
+    muerte (C004) durante SYNTHETIC_DYING frames y luego resta una vida
+    (C000, BCD). Morir con 0 vidas es Game Over: vuelven
+    SYNTHETIC_RESTART_LIVES vidas y el score a cero.
+    """
+    JR, JR_NZ, JR_Z = 0x18, 0x20, 0x28
+    store = lambda addr: (0xEA, addr & 0xFF, addr >> 8)   # ld [addr], a
+    load = lambda addr: (0xFA, addr & 0xFF, addr >> 8)    # ld a, [addr]
+    program = [
+        (0xF3,), (0x31, 0xFF, 0xDF),                       # di; ld sp, $DFFF
+        (0x3E, SYNTHETIC_LIVES), store(0xC000),
+        (0xAF,), store(0xC001), store(0xC002), store(0xC003),
+        store(0xC004), store(0xC005), store(0xC006),        # flag, contador de muerte, botones previos
+        "frame:",
+        (0xF0, 0x44), (0xFE, 0x90), (JR_Z, "frame"),        # Esperar a salir de LY = 144...
+        "vblank:",
+        (0xF0, 0x44), (0xFE, 0x90), (JR_NZ, "vblank"),      # ...y a volver a entrar: una vez por frame
+        (0x3E, 0x10), (0xE0, 0x00),                         # Seleccionar botones
+        (0xF0, 0x00), (0xF0, 0x00), (0x2F,), (0xE6, 0x03), (0x47,),   # b = A | B << 1 (1 = pulsado)
+        (0x3E, 0x30), (0xE0, 0x00),
+        load(0xC006), (0x2F,), (0xA0,), (0x4F,),            # c = recién pulsados
+        (0x78,), store(0xC006),
+        load(0xC005), (0xA7,), (JR_Z, "alive"),
+        (0x3D,), store(0xC005), (JR_NZ, "frame"),          # Sigue muriendo
+        (0xAF,), store(0xC004),
+        load(0xC000), (0xA7,), (JR_Z, "game_over"),
+        (0xD6, 0x01), (0x27,), store(0xC000),               # Vidas - 1 (BCD)
+        (JR, "frame"),
+        "game_over:",
+        (0x3E, SYNTHETIC_RESTART_LIVES), store(0xC000),
+        (0xAF,), store(0xC001), store(0xC002), store(0xC003),
+        (JR, "frame"),
+        "alive:",
+        (0xCB, 0x49), (JR_Z, "no_death"),                   # bit 1, c: B recién pulsado
+        (0x3E, 0x01), store(0xC004),
+        (0x3E, SYNTHETIC_DYING), store(0xC005),
+        ("jp", "frame"),
+        "no_death:",
+        (0xCB, 0x41), (JR_Z, "to_frame"),                   # bit 0, c: A recién pulsado
+        load(0xC003), (0xC6, SYNTHETIC_POINTS), (0x27,), store(0xC003),
+        load(0xC002), (0xCE, 0x00), (0x27,), store(0xC002),
+        load(0xC001), (0xCE, 0x00), (0x27,), store(0xC001),
+        "to_frame:",
+        ("jp", "frame"),
+    ]
+    rom = bytearray(32768)
+    rom[0x100:0x104] = bytes([0x00, 0xC3, 0x50, 0x01])   # nop; jp $0150
+    rom[0x134:0x134 + 9] = b"SYNTHETIC"
+    checksum = 0
+    for b in rom[0x134:0x14D]:
+        checksum = (checksum - b - 1) & 0xFF
+    rom[0x14D] = checksum
+    code = _assemble(program, 0x150)
+    rom[0x150:0x150 + len(code)] = code
+    return bytes(rom)
+
+
+def rom_for(spec):
+    """Ruta de la ROM de un mapa (la sintética se escribe en el directorio temporal)."""
+    if spec["rom"] is not None:
+        return spec["rom"]
+    path = os.path.join(tempfile.gettempdir(), "trace_replay_synthetic.gb")
+    with open(path, "wb") as f:
+        f.write(build_synthetic_rom())
+    return path
+
+
+def read_joypad(pyboy):
+    """Botones pulsados ahora mismo como máscara de 8 bits (1 = pulsado)."""
+    memory = pyboy.memory
+    original = memory[0xFF00] & 0x30
+    memory[0xFF00] = 0x20                 # Selecciona la cruceta
+    directions = ~memory[0xFF00] & 0x0F
+    memory[0xFF00] = 0x10                 # Selecciona los botones
+    buttons = ~memory[0xFF00] & 0x0F
+    memory[0xFF00] = original
+    return directions | (buttons << 4)
+
+
+def apply_joypad(pyboy, previous, mask):
+    """Envía solo las pulsaciones/liberaciones que cambian de `previous` a `mask`."""
+    changed = previous ^ mask
+    for bit, (press, release) in enumerate(BUTTONS):
+        if changed >> bit & 1:
+            pyboy.send_input(press if mask >> bit & 1 else release)
+
+
+def bcd_value(value):
+    """Byte BCD -> entero (0x10 -> 10)."""
+    return (value >> 4) * 10 + (value & 0x0F)
+
+
+def read_bcd(memory, addresses):
+    """Score BCD (big-endian) y si todos los bytes son BCD válido."""
+    score, valid = 0, True
+    for addr in addresses:
+        value = memory[addr]
+        high, low = value >> 4, value & 0x0F
+        valid = valid and high <= 9 and low <= 9
+        score = score * 100 + high * 10 + low
+    return score, valid
+
+
+def sample(pyboy, spec):
+    """(vidas, score, bcd_válido, estado) del frame actual."""
+    score, valid = read_bcd(pyboy.memory, spec["score"])
+    status = pyboy.memory[spec["status"]] if spec["status"] is not None else 0
+    return pyboy.memory[spec["lives"]], score, valid, status
+
+
+def record(map_name, out_path, rom_path=None, from_state=None, random_frames=0, seed=0):
+    """Graba una traza: jugando en la ventana (Ctrl+C para terminar) o aleatoria."""
+    spec = ADDRESS_MAPS[map_name]
+    rom_path = rom_path or rom_for(spec)
+    headless = random_frames > 0
+    pyboy = PyBoy(rom_path, window="null" if headless else "SDL2")
+    pyboy.set_emulation_speed(0 if headless else 1)
+    if from_state:
+        with open(from_state, "rb") as f:
+            pyboy.load_state(f)
+    else:
+        pyboy.tick(spec["boot_frames"], False)
+
+    buffer = io.BytesIO()
+    pyboy.save_state(buffer)
+    inputs, values = [], []
+    rng = random.Random(seed)
+    mask, hold = 0, 0
+
+    print("=" * 70)
+    print(f"GRABANDO TRAZA - {map_name} -> {out_path}")
+    print("=" * 70)
+    if not headless:
+        print("🎮 Juega en la ventana. Ctrl+C para terminar y guardar.")
+    try:
+        while not headless or len(inputs) < random_frames:
+            if headless:
+                if hold == 0:
+                    new_mask = rng.choice(RANDOM_MASKS)
+                    apply_joypad(pyboy, mask, new_mask)
+                    mask, hold = new_mask, rng.randint(*RANDOM_HOLD)
+                hold -= 1
+            else:
+                mask = read_joypad(pyboy)
+            # La entrada de este frame se aplica antes del tick
+            inputs.append(mask)
+            if not pyboy.tick(1, not headless):
+                break
+            values.append(sample(pyboy, spec))
+    except KeyboardInterrupt:
+        pass
+    if not headless:
+        # En la ventana la entrada llega durante el tick: se desplaza un frame
+        inputs = inputs[1:] + [read_joypad(pyboy)]
+    pyboy.stop(save=False)
+
+    values = np.array(values, dtype=np.int64).reshape(-1, 4)
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    np.savez_compressed(
+        out_path,
+        map=map_name,
+        state=np.frombuffer(buffer.getvalue(), dtype=np.uint8),
+        inputs=np.array(inputs, dtype=np.uint8),
+        lives=values[:, 0], score=values[:, 1], status=values[:, 3],
+    )
+    print(f"💾 {len(inputs)} frames guardados")
+
+
+def lives_count(spec, raw):
+    """Valor del contador de vidas como número (decodifica BCD si hace falta)."""
+    if spec["lives_bcd"] and raw != spec["lives_empty"]:
+        return bcd_value(raw)
+    return raw
+
+
+def count_deaths(spec, lives):
+    """Vidas perdidas de una en una a lo largo de la traza."""
+    counts = [lives_count(spec, int(raw)) for raw in lives]
+    return sum(1 for before, now in zip(counts, counts[1:]) if now == before - 1)
+
+
+def check_semantics(spec, lives, score, valid, status):
+    """Lista de fallos (frame, mensaje) según la semántica del mapa."""
+    failures = []
+    empty, last = spec["lives_empty"], spec["lives_last"]
+    has_status = spec["status"] is not None
+    game_over = False        # El score puede volver a empezar
+    new_game = False         # El siguiente cambio de vidas es el de la nueva partida
+    last_dying = -DEATH_WINDOW - 1
+    for frame in range(len(lives)):
+        if has_status and status[frame] != 0:
+            last_dying = frame
+            if last is not None and lives_count(spec, lives[frame]) == last:
+                game_over = new_game = True   # Muere sin vidas de reserva
+        if not valid[frame]:
+            failures.append((frame, f"score no es BCD válido ({score[frame]})"))
+        if frame == 0:
+            continue
+
+        before, now = lives[frame - 1], lives[frame]
+        if now != before:
+            delta = lives_count(spec, now) - lives_count(spec, before)
+            if empty is not None and now == empty:
+                game_over = new_game = True
+            elif new_game or (empty is not None and before == empty):
+                new_game = False   # Vidas iniciales de la nueva partida
+            elif last is not None and lives_count(spec, before) == last and delta != 1:
+                game_over = True   # Game Over sin flag: el juego reinicia (o desborda) el contador
+            elif abs(delta) != 1:
+                failures.append((frame, f"vidas saltan de 0x{before:02X} a 0x{now:02X}"))
+            elif delta < 0 and has_status and frame - last_dying > DEATH_WINDOW:
+                failures.append((frame, f"vida perdida (0x{before:02X}->0x{now:02X}) sin flag de muerte"))
+
+        if score[frame] < score[frame - 1]:
+            if not game_over:
+                failures.append((frame, f"score baja de {score[frame - 1]} a {score[frame]}"))
+            game_over = False
+    return failures
+
+
+def play_inputs(pyboy, spec, inputs):
+    """Aplica una máscara de joypad por frame y devuelve (vidas, score, bcd_válido, estado) de cada frame."""
+    values = np.zeros((len(inputs), 4), dtype=np.int64)
+    mask = 0
+    for frame, new_mask in enumerate(np.asarray(inputs).tolist()):
+        apply_joypad(pyboy, mask, new_mask)
+        mask = new_mask
+        pyboy.tick(1, False)
+        values[frame] = sample(pyboy, spec)
+    return values
+
+
+def replay(path, rom_path=None):
+    """Reproduce una traza. Devuelve un dict de resultado (status PASS/FAIL/SKIP)."""
+    trace = np.load(path)
+    map_name = str(trace["map"])
+    spec = ADDRESS_MAPS[map_name]
+    rom_path = rom_path or rom_for(spec)
+    if not os.path.exists(rom_path):
+        return {"status": "SKIP", "map": map_name, "reason": f"falta {rom_path}"}
+
+    inputs = trace["inputs"]
+    start = time.perf_counter()
+    pyboy = PyBoy(rom_path, window="null")
+    pyboy.set_emulation_speed(0)
+    pyboy.load_state(io.BytesIO(trace["state"].tobytes()))
+
+    values = play_inputs(pyboy, spec, inputs)
+    pyboy.stop(save=False)
+    elapsed = time.perf_counter() - start
+
+    lives, score, valid, status = values.T
+    failures = check_semantics(spec, lives, score, valid, status)
+    recorded = np.column_stack([trace["lives"], trace["score"], trace["status"]])
+    diverged = np.flatnonzero((recorded != values[:, [0, 1, 3]]).any(axis=1))
+    if len(diverged):
+        failures.insert(0, (int(diverged[0]), "la reproducción no coincide con la grabación"))
+
+    return {
+        "status": "FAIL" if failures else "PASS",
+        "map": map_name,
+        "frames": len(inputs),
+        "elapsed": elapsed,
+        "deaths": count_deaths(spec, lives),
+        "score_gain": int(score[-1] - score[0]) if len(score) else 0,
+        "failures": failures,
+    }
+
+
+def check(paths, rom_path=None):
+    """Reproduce todas las trazas e imprime el resultado. True si no hay fallos."""
+    print("=" * 70)
+    print(f"REGRESIÓN DE DIRECCIONES RAM - {len(paths)} trazas")
+    print("=" * 70)
+    ok = True
+    for path in paths:
+        result = replay(path, rom_path)
+        name = os.path.basename(path)
+        if result["status"] == "SKIP":
+            print(f"⏭️  {name} [{result['map']}]: saltada ({result['reason']})")
+            continue
+        fps = result["frames"] / result["elapsed"] if result["elapsed"] else 0.0
+        icon = "✅" if result["status"] == "PASS" else "❌"
+        print(f"{icon} {name} [{result['map']}]: {result['frames']} frames en {result['elapsed']:.2f}s "
+              f"({fps:.0f} fps) | muertes: {result['deaths']} | score: {result['score_gain']:+d}")
+        for frame, message in result["failures"][:10]:
+            print(f"     frame {frame}: {message}")
+        ok = ok and result["status"] == "PASS"
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graba y reproduce trazas de entrada para verificar direcciones RAM")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Grabar una traza")
+    rec.add_argument("map", choices=sorted(ADDRESS_MAPS))
+    rec.add_argument("out")
+    rec.add_argument("--rom", default=None, help="ROM (por defecto la del mapa)")
+    rec.add_argument("--from-state", default=None, help="Save-state desde el que empezar")
+    rec.add_argument("--random", type=int, default=0, metavar="FRAMES",
+                     help="Grabar sin ventana con entradas aleatorias durante FRAMES frames")
+    rec.add_argument("--seed", type=int, default=0)
+
+    chk = sub.add_parser("check", help="Reproducir trazas y verificar")
+    chk.add_argument("paths", nargs="*")
+    chk.add_argument("--rom", default=None, help="ROM para todas las trazas (por defecto la del mapa)")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.map, args.out, args.rom, args.from_state, args.random, args.seed)
+        return
+
+    paths = args.paths or sorted(glob.glob(os.path.join(TRACE_DIR, "*.npz")))
+    if not paths:
+        print(f"⏭️  No hay trazas en {TRACE_DIR}/ (graba una con 'record')")
+        return
+    sys.exit(0 if check(paths, args.rom) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Trazas de elegibilidad dispersas para Watkins Q(λ).
+
+Con actualizaciones de un paso, la penalización por muerte (-500) retrocede
+un solo estado por visita: hace falta morir muchas veces en el mismo foso
+para aprender a saltar antes. Con trazas, cada error de Bellman se reparte
+entre todos los pares (estado, acción) recientes, ponderado por su traza,
+que decae con gamma * lambda en cada paso.
+
+Solo unos pocos pares tienen traza no despreciable (con gamma * lambda = 0.81
+una traza baja de MIN_TRACE en ~20 pasos), así que se guardan en arrays
+NumPy paralelos (estado, acción, valor) de capacidad fija en vez de una
+traza por cada estado de la tabla. El decaimiento y la poda son operaciones
+vectorizadas sobre esos arrays. Si se llena, se descarta la traza más débil.
+
+Watkins: las trazas se cortan cuando la acción elegida no es la greedy,
+porque a partir de ahí la experiencia ya no sigue la política que se evalúa.
+
+apply() escribe en las filas de todos los estados con traza. Con una
+SharedQTable, make_shared_agent toma antes los locks de todas esas rayas
+(SharedQTable.lock_states), no solo la del estado actual.
+
+Desactivado por defecto (lam=0): en bench/lambda_synthetic.txt llega antes
+a 500 px pero menos semillas pasan de 1500. Las semillas que se estancan lo
+hacen en los fosos anchos (1290 y 1600 px). Explicación más probable: ahí
+cruzar suele requerir una acción exploratoria, que corta la traza, mientras
+que cada muerte tras acciones greedy reparte la penalización sobre las
+acciones de aproximación, que sí eran correctas. Con la recompensa densa
+por avance, el paso único ya informa bien de cada acción. Probados sin
+mejora: lambda 0.5, alpha 0.05-0.1, trazas de 2-6 pasos (MIN_TRACE
+0.3-0.6), sin corte de Watkins y con --air-state.
+"""
+
+import numpy as np
+
+# --- CONFIGURACIÓN ---
+LAMBDA = 0.9
+MAX_TRACES = 256      # Pares (estado, acción) con traza activa como máximo
+MIN_TRACE = 0.01      # Trazas más pequeñas se podan
+
+
+class EligibilityTraces:
+    """Trazas reemplazantes en arrays paralelos de tamaño acotado."""
+
+    def __init__(self, lam=LAMBDA, gamma=0.9, capacity=MAX_TRACES, min_trace=MIN_TRACE):
+        self.lam = lam
+        self.gamma = gamma
+        self.min_trace = min_trace
+        self.states = np.zeros(capacity, dtype=np.int64)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def active_states(self):
+        """Estados con traza activa (los que tocará apply())."""
+        return self.states[:self.size].tolist()
+
+    def visit(self, state, action):
+        """Traza reemplazante: e(s, a) = 1."""
+        n = self.size
+        found = np.flatnonzero((self.states[:n] == state) & (self.actions[:n] == action))
+        if len(found):
+            index = found[0]
+        elif n < len(self.values):
+            index = n
+            self.size += 1
+        else:
+            index = int(np.argmin(self.values))   # Lleno: se reemplaza la más débil
+        self.states[index] = state
+        self.actions[index] = action
+        self.values[index] = 1.0
+
+    def apply(self, q_table, delta, alpha):
+        """Q(s, a) += alpha * delta * e(s, a) para todas las trazas activas."""
+        n = self.size
+        step = alpha * delta * self.values[:n]
+        array = getattr(q_table, "array", None)
+        if array is not None:
+            # Tabla densa (DenseQTable / SharedQTable): una sola operación
+            np.add.at(array, (self.states[:n], self.actions[:n]), step)
+            return
+        for state, action, value in zip(self.states[:n].tolist(), self.actions[:n].tolist(), step.tolist()):
+            q_table[state][action] += value
+
+    def decay(self):
+        """Multiplica por gamma * lambda y poda las trazas despreciables."""
+        n = self.size
+        self.values[:n] *= self.gamma * self.lam
+        keep = np.flatnonzero(self.values[:n] >= self.min_trace)
+        if len(keep) < n:
+            k = len(keep)
+            self.states[:k] = self.states[keep]
+            self.actions[:k] = self.actions[keep]
+            self.values[:k] = self.values[keep]
+            self.size = k
+
+    def clear(self):
+        """Corte de Watkins (acción exploratoria) o fin de episodio."""
+        self.size = 0
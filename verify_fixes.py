@@ -12,9 +12,10 @@ Instrucciones:
 - Pierde todas las vidas y verifica que game over se detecta correctamente
 """
 
-import time
 from pyboy import PyBoy
 
+from pacing import PacedEmulator, print_stats
+
 ROM_PATH = "roms/snow-bros.gb"
 WINDOW_TYPE = "SDL2"
 
@@ -48,45 +49,50 @@ def main():
     print("  2. Puntos solo cuando score aumenta\n")
     
     pyboy = PyBoy(ROM_PATH, window=WINDOW_TYPE)
-    pyboy.set_emulation_speed(1)
+    paced = PacedEmulator(pyboy, speed=1)
     
     previous_score = 0
     previous_lives = 3
     
-    while True:
-        pyboy.tick()
+    def analyze(snapshot):
+        # Hilo propio con una copia de la memoria: el análisis no frena al juego
+        nonlocal previous_score, previous_lives
+        lives = snapshot.memory[ADDR_LIVES]
+        current_score = read_score_bcd(snapshot.memory)
+        px = snapshot.memory[ADDR_PLAYER_X]
+        py = snapshot.memory[ADDR_PLAYER_Y]
+        
+        # Mostrar estado general
+        print(f"\n[Estado] Lives: {lives:3d} | Score: {current_score:8d} | Pos: ({px:3d}, {py:3d})")
+        
+        # Verificar cambios de score
+        if current_score > previous_score:
+            gain = current_score - previous_score
+            print(f"  ✅ SCORE AUMENTÓ: +{gain} puntos")
+        elif current_score < previous_score:
+            print(f"  ⚠️  Score disminuyó (posible reset)")
         
-        if pyboy.frame_count % 30 == 0:  # Cada ~0.5 segundos
-            lives = pyboy.memory[ADDR_LIVES]
-            current_score = read_score_bcd(pyboy.memory)
-            px = pyboy.memory[ADDR_PLAYER_X]
-            py = pyboy.memory[ADDR_PLAYER_Y]
-            
-            # Mostrar estado general
-            print(f"\n[Estado] Lives: {lives:3d} | Score: {current_score:8d} | Pos: ({px:3d}, {py:3d})")
-            
-            # Verificar cambios de score
-            if current_score > previous_score:
-                gain = current_score - previous_score
-                print(f"  ✅ SCORE AUMENTÓ: +{gain} puntos")
-            elif current_score < previous_score:
-                print(f"  ⚠️  Score disminuyó (posible reset)")
-            
-            # Verificar cambios de vidas
-            if lives < previous_lives and lives >= 0 and lives <= 3:
-                print(f"  💔 VIDA PERDIDA: {previous_lives} -> {lives}")
-            
-            # Detectar posible Game Over
-            if lives == 255:
-                print(f"  🚨 DISPLAY VACÍO DETECTADO (lives=255) - GAME OVER!")
-            elif lives == 0:
-                print(f"  ⚠️  Lives=0 (puede ser temporal)")
-            
-            previous_score = current_score
-            if lives in [0, 1, 2, 3]:
-                previous_lives = lives
-            
-        time.sleep(0.001)
+        # Verificar cambios de vidas
+        if lives < previous_lives and lives >= 0 and lives <= 3:
+            print(f"  💔 VIDA PERDIDA: {previous_lives} -> {lives}")
+        
+        # Detectar posible Game Over
+        if lives == 255:
+            print(f"  🚨 DISPLAY VACÍO DETECTADO (lives=255) - GAME OVER!")
+        elif lives == 0:
+            print(f"  ⚠️  Lives=0 (puede ser temporal)")
+        
+        previous_score = current_score
+        if lives in [0, 1, 2, 3]:
+            previous_lives = lives
+    
+    paced.add_consumer(analyze, ADDR_PLAYER_X, 0xC700, every=30)  # Cada ~0.5 segundos
+    try:
+        paced.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print_stats(paced.close())
 
 if __name__ == "__main__":
     main()